@@ -17,13 +17,16 @@ from dotenv import load_dotenv
 from event_validator.utils.logging_config import setup_logging
 from event_validator.types import ValidationConfig
 from event_validator.orchestration.runner import process_submission
-from event_validator.validators.gemini_client import GeminiClient, set_rate_limit_callback
-from event_validator.validators.duplicate_validator import reset_batch_hash_tracker
+from event_validator.validators.gemini_client import GeminiClient, set_rate_limit_callback, get_gemini_stats
+from event_validator.utils.circuit_breaker import get_gemini_circuit_breaker
+from event_validator.utils.concurrency import get_concurrency_stats
+from event_validator.validators.duplicate_validator import BatchDedupState
 from event_validator.utils.downloader import (
     start_periodic_cleanup,
     stop_periodic_cleanup,
     cleanup_old_files,
     cleanup_all_files,
+    log_download_dir_info,
     FILE_MAX_AGE
 )
 from event_validator.utils.file_operations import (
@@ -92,6 +95,7 @@ async def startup_event():
     # Ensure outputs directory exists
     OUTPUT_DIR.mkdir(exist_ok=True)
     logger.info(f"Output directory: {OUTPUT_DIR.absolute()}")
+    log_download_dir_info()
     
     # Start periodic cleanup of downloaded files
     start_periodic_cleanup()
@@ -204,6 +208,17 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Gemini call/cache counters, circuit breaker and concurrency stats (JSON)."""
+    return {
+        "gemini": get_gemini_stats(),
+        "gemini_rpm": get_rate_limiter().get_current_rate(),
+        "circuit_breaker": get_gemini_circuit_breaker().get_stats(),
+        "concurrency": get_concurrency_stats()
+    }
+
+
 @app.post("/admin/cleanup")
 async def manual_cleanup(
     max_age_hours: Optional[int] = Query(None, description="Delete files older than this many hours. If not specified, uses default FILE_MAX_AGE."),
@@ -272,8 +287,8 @@ async def validate_batch(
         
         gemini_client = get_gemini_client()
         
-        # Reset batch hash tracker at start of new batch
-        reset_batch_hash_tracker()
+        # Fresh duplicate-detection state for this batch
+        dedup_state = BatchDedupState()
         
         # Check if rate limit was detected - if so, use sequential processing
         use_sequential = _rate_limit_detected.is_set()
@@ -289,7 +304,7 @@ async def validate_batch(
                     logger.info(f"Processing submission {i + 1}/{len(submissions)} (sequential mode)")
                     # Rate limiter will handle delays automatically in gemini_client
                     
-                    submission = process_submission(row, config, gemini_client)
+                    submission = process_submission(row, config, gemini_client, dedup_state)
                     
                     # Create result row (use original row data if available)
                     result_row = getattr(submission, '_original_row_data', row).copy()
@@ -319,7 +334,7 @@ async def validate_batch(
                     try:
                         logger.info(f"Processing submission {row_index + 1}/{len(submissions)}")
                         # No fixed delay - rate limiter handles timing automatically
-                        submission = process_submission(row_data, config, gemini_client)
+                        submission = process_submission(row_data, config, gemini_client, dedup_state)
                         
                         # Create result row (use original row data if available)
                         result_row = getattr(submission, '_original_row_data', row_data).copy()
@@ -12,7 +12,7 @@ except ImportError:
     GPSTAGS = None
 
 from event_validator.types import ImageData
-from event_validator.utils.hashing import compute_sha256, compute_phash
+from event_validator.utils.hashing import compute_sha256, compute_phash, phash_to_int
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +52,7 @@ def extract_image_metadata(image_path: Path) -> ImageData:
         path=image_path,
         sha256=sha256_hash,
         phash=phash_value,
+        phash_int=phash_to_int(phash_value),
         exif_data=exif_data,
         has_geotag=has_geotag
     )
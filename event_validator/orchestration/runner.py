@@ -11,17 +11,17 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from event_validator.types import EventSubmission, ValidationConfig, ValidationResult
 from event_validator.extractors.pdf_extractor import extract_pdf_text
 from event_validator.extractors.image_extractor import extract_images_from_paths
-from event_validator.validators.theme_validator import validate_theme
-from event_validator.validators.pdf_validator import validate_pdf
+from event_validator.validators.theme_validator import validate_theme, theme_alignment_inputs
+from event_validator.validators.pdf_validator import validate_pdf, pdf_validation_inputs
 from event_validator.validators.image_validator import validate_images
 from event_validator.validators.duplicate_validator import (
     validate_duplicates,
-    reset_batch_hash_tracker
+    BatchDedupState
 )
 from event_validator.validators.gemini_client import GeminiClient
 from event_validator.config.rules import ACCEPTANCE_THRESHOLD
 from event_validator.utils.column_mapper import map_row_to_standard_format
-from event_validator.utils.downloader import download_pdf, download_image, cleanup_all_files, DOWNLOAD_DIR
+from event_validator.utils.downloader import download_pdf, download_files_batch, cleanup_all_files, log_download_dir_info, DOWNLOAD_DIR
 from event_validator.utils.file_operations import read_csv_from_path
 
 logger = logging.getLogger(__name__)
@@ -97,10 +97,14 @@ def _calculate_heuristic_score(submission: EventSubmission) -> int:
 def process_submission(
     row_data: dict,
     config: ValidationConfig,
-    gemini_client: GeminiClient
+    gemini_client: GeminiClient,
+    dedup_state: Optional[BatchDedupState] = None
 ) -> EventSubmission:
     """
     Process a single event submission through the validation pipeline.
+    
+    dedup_state holds the batch's image hashes for duplicate detection; all
+    submissions of one batch should share the same instance.
     """
     # Map actual CSV columns to standard format
     mapped_data = map_row_to_standard_format(row_data)
@@ -159,24 +163,21 @@ def process_submission(
                 paths = [p.strip() for p in image_paths_str.split(sep)]
                 break
         
+        # Skip empty or invalid paths
+        invalid_paths = {'', '0', 'null', 'none', 'n/a'}
+        paths = [p.strip() for p in paths if p.strip() and p.strip().lower() not in invalid_paths]
+        
+        # Download all Azure Blob Storage URLs concurrently (results keep input order)
+        remote_urls = [p for p in paths if p.startswith('http')]
+        downloaded_paths = iter(download_files_batch(remote_urls))
+        
         # Handle both URLs and local paths
         image_paths = []
         temp_files = []  # Track temp files for cleanup
         
         for p in paths:
-            p = p.strip()
-            # Skip empty or invalid paths
-            invalid_paths = {'', '0', 'null', 'none', 'n/a'}
-            if not p or p.lower() in invalid_paths:
-                continue
-                
             if p.startswith('http'):
-                # Download from Azure Blob Storage URL with progressive probing
-                temp_image_path = download_image(
-                    p,
-                    event_driven=event_driven,
-                    academic_year=academic_year
-                )
+                temp_image_path = next(downloaded_paths)
                 if temp_image_path:
                     image_paths.append(temp_image_path)
                     temp_files.append(temp_image_path)
@@ -237,6 +238,14 @@ def process_submission(
     # Removed stagger delay - rate limiter handles spacing automatically
     # With 4 concurrent calls and 145 RPM, no need for additional delays
     
+    # Theme alignment and PDF checks share one combined Gemini call when both apply
+    event_checks = None
+    if budget.get_remaining_calls() >= 2:
+        theme_inputs = theme_alignment_inputs(submission)
+        pdf_inputs = pdf_validation_inputs(submission)
+        if theme_inputs is not None and pdf_inputs is not None:
+            event_checks = gemini_client.validate_event_all(**theme_inputs, **pdf_inputs)
+    
     # Theme validation
     logger.info("─" * 80)
     logger.info("THEME VALIDATION (33 points total - Year alignment disabled)")
@@ -255,7 +264,11 @@ def process_submission(
             message="Theme validation skipped: API call budget exhausted"
         )]
     else:
-        theme_results = validate_theme(submission, gemini_client)
+        theme_results = validate_theme(
+            submission,
+            gemini_client,
+            theme_aligned=event_checks["theme_aligned"] if event_checks else None
+        )
         # Record API call (theme validation makes 1 call)
         budget.record_call("theme_alignment", success=True)
     all_results.extend(theme_results)
@@ -290,7 +303,7 @@ def process_submission(
                     message="PDF validation skipped: API call budget exhausted"
                 ))
         else:
-            pdf_results = validate_pdf(submission, gemini_client)
+            pdf_results = validate_pdf(submission, gemini_client, validation_results=event_checks)
             # Record API call (PDF validation makes 1 unified call)
             budget.record_call("pdf_validation", success=True)
         all_results.extend(pdf_results)
@@ -379,7 +392,7 @@ def process_submission(
     logger.info("─" * 80)
     logger.info("DUPLICATE VALIDATION (15 points total)")
     logger.info("─" * 80)
-    duplicate_results = validate_duplicates(submission, config, submission_id)
+    duplicate_results = validate_duplicates(submission, config, submission_id, dedup_state)
     all_results.extend(duplicate_results)
     
     # Log duplicate validation results
@@ -484,6 +497,7 @@ def process_csv(
     csv_start_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     # Clear downloaded_files directory at the start of new processing
+    log_download_dir_info()
     logger.info("Clearing downloaded_files directory for new processing run...")
     deleted_count = cleanup_all_files()
     if deleted_count > 0:
@@ -523,8 +537,8 @@ def process_csv(
     logger.info(f"FILE PROCESSING STARTED | Input: {input_csv_path.name} | Rows: {len(rows)} | Start Time: {csv_start_datetime}")
     logger.info("=" * 80)
     
-    # Reset batch hash tracker at start of new batch
-    reset_batch_hash_tracker()
+    # Fresh duplicate-detection state for this batch
+    dedup_state = BatchDedupState()
     
     # Process rows in parallel for better performance
     # Optimized for 8-minute target: 12 workers × 6 concurrent Gemini calls = 72 concurrent API calls
@@ -538,7 +552,7 @@ def process_csv(
     def process_single_row(row_data: dict, index: int) -> tuple[int, dict]:
         """Process a single row and return its index and result."""
         try:
-            submission = process_submission(row_data, config, gemini_client)
+            submission = process_submission(row_data, config, gemini_client, dedup_state)
             
             # Create enriched row (use original row data)
             enriched_row = getattr(submission, '_original_row_data', row_data).copy()
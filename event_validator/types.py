@@ -27,6 +27,7 @@ class ImageData:
     path: Path
     sha256: Optional[str] = None
     phash: Optional[str] = None
+    phash_int: Optional[int] = None  # pHash parsed once for popcount comparisons
     exif_data: Optional[Dict[str, Any]] = None
     has_geotag: bool = False
 
@@ -0,0 +1,81 @@
+"""BK-tree for near-duplicate lookups under an integer metric (e.g. pHash Hamming distance)."""
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class _Node:
+    """Tree node: one key/value plus children indexed by distance to this key."""
+    __slots__ = ("key", "value", "children")
+    
+    def __init__(self, key: Any, value: Any):
+        self.key = key
+        self.value = value
+        self.children: dict = {}
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree.
+    
+    Keys are compared with a metric distance function (Hamming distance for
+    perceptual hashes). A range query only descends into children whose edge
+    distance lies within [d - max_distance, d + max_distance] of the query,
+    so a lookup visits a small fraction of the stored keys instead of all of them.
+    """
+    
+    def __init__(self, distance: Callable[[Any, Any], int]):
+        """
+        Args:
+            distance: Metric on keys (must satisfy the triangle inequality)
+        """
+        self._distance = distance
+        self._root: Optional[_Node] = None
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def add(self, key: Any, value: Any = None):
+        """Insert key with an associated value (duplicate keys are kept)."""
+        self._size += 1
+        if self._root is None:
+            self._root = _Node(key, value)
+            return
+        
+        node = self._root
+        while True:
+            d = self._distance(key, node.key)
+            child = node.children.get(d)
+            if child is None:
+                node.children[d] = _Node(key, value)
+                return
+            node = child
+    
+    def find(self, key: Any, max_distance: int) -> List[Tuple[int, Any]]:
+        """
+        Return (distance, value) for every stored key within max_distance of key.
+        
+        Results are in tree order, not sorted.
+        """
+        if self._root is None:
+            return []
+        
+        matches = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            d = self._distance(key, node.key)
+            if d <= max_distance:
+                matches.append((d, node.value))
+            
+            low = d - max_distance
+            high = d + max_distance
+            for edge, child in node.children.items():
+                if low <= edge <= high:
+                    stack.append(child)
+        
+        return matches
+    
+    def clear(self):
+        """Remove all keys."""
+        self._root = None
+        self._size = 0
@@ -1,13 +1,15 @@
 """Azure Blob Storage directory scanner for duplicate detection."""
 import logging
+import threading
 import requests
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 from io import BytesIO
 import xml.etree.ElementTree as ET
 
 from event_validator.utils.blob_path_resolver import EVENT_DRIVEN_BASE_PATH
-from event_validator.utils.hashing import compute_sha256, compute_phash, hamming_distance
+from event_validator.utils.bk_tree import BKTree
+from event_validator.utils.hashing import compute_sha256, compute_phash, hamming_distance_int, phash_to_int
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +23,61 @@ def get_base_path(event_driven: Optional[int]) -> str:
     return EVENT_DRIVEN_BASE_PATH[1]  # Default to type 1
 
 
-# Global cache for directory file hashes (lazy-loaded)
-_directory_hash_cache: Dict[str, Dict[str, Dict]] = {}
+class DirectoryHashIndex:
+    """
+    In-memory hash index for one (event_driven, academic_year) directory.
+    
+    Exact matches are a dict lookup by SHA256; near-duplicates are a BK-tree
+    range query over integer pHashes, so per-image checks don't walk every
+    file in the directory.
+    """
+    
+    def __init__(self):
+        self.files: Dict[str, Dict[str, Any]] = {}  # sha256 -> file info
+        self._phash_tree = BKTree(hamming_distance_int)  # values: (insertion order, sha256)
+        self._lock = threading.Lock()
+    
+    def add(self, sha256: str, phash: Optional[str], file_info: Dict[str, Any]):
+        """Add or update a file's hashes."""
+        with self._lock:
+            if sha256 not in self.files:
+                phash_int = phash_to_int(phash)
+                if phash_int is not None:
+                    self._phash_tree.add(phash_int, (len(self.files), sha256))
+            self.files[sha256] = file_info
+    
+    def match(
+        self,
+        sha256: str,
+        phash_int: Optional[int],
+        phash_threshold: int
+    ) -> List[Tuple[str, str, Optional[float]]]:
+        """
+        Find an exact (SHA256) or near-duplicate (pHash) file.
+        
+        Returns:
+            [] or a single (matched_file_path, match_type, similarity_score) tuple;
+            for near-duplicates the earliest-added file within the threshold wins.
+        """
+        with self._lock:
+            file_info = self.files.get(sha256)
+            if file_info is not None:
+                return [(file_info.get('path', 'unknown'), 'exact', None)]
+            
+            if phash_int is None:
+                return []
+            
+            hits = self._phash_tree.find(phash_int, phash_threshold)
+            if not hits:
+                return []
+            _, distance, matched_sha256 = min((order, d, sha) for d, (order, sha) in hits)
+            file_info = self.files[matched_sha256]
+            return [(file_info.get('path', 'unknown'), 'near-duplicate', float(distance))]
+
+
+# Global cache for directory file hashes (lazy-loaded): "{event_driven}_{academic_year}" -> index
+_directory_hash_cache: Dict[str, DirectoryHashIndex] = {}
+_directory_hash_cache_lock = threading.Lock()
 
 
 class BlobDirectoryScanner:
@@ -38,6 +93,20 @@ class BlobDirectoryScanner:
         self.phash_threshold = phash_threshold
         self._cache = {}  # Cache: {directory_path: {sha256: file_info}}
     
+    def get_index(self, event_driven: Optional[int], academic_year: Optional[str]) -> DirectoryHashIndex:
+        """
+        Get the hash index for a directory, creating an empty one if needed.
+        
+        Callers checking several images from the same submission should fetch
+        this once and query it per image.
+        """
+        cache_key = f"{event_driven}_{academic_year}"
+        index = _directory_hash_cache.get(cache_key)
+        if index is None:
+            with _directory_hash_cache_lock:
+                index = _directory_hash_cache.setdefault(cache_key, DirectoryHashIndex())
+        return index
+    
     def _list_blobs_in_directory(
         self,
         directory_path: str,
@@ -107,38 +176,8 @@ class BlobDirectoryScanner:
         """
         # For now, use batch-level detection as primary method
         # Directory scanning requires Azure SDK or public list access
-        
-        # Cache key for this directory
-        cache_key = f"{event_driven}_{academic_year}"
-        
-        # Check cache first
-        if cache_key in _directory_hash_cache:
-            cached_files = _directory_hash_cache[cache_key]
-            
-            # Check for exact match
-            if target_sha256 in cached_files:
-                file_info = cached_files[target_sha256]
-                return [(
-                    file_info.get('path', 'unknown'),
-                    'exact',
-                    None
-                )]
-            
-            # Check for near-duplicate (pHash)
-            if target_phash:
-                for cached_sha256, cached_info in cached_files.items():
-                    cached_phash = cached_info.get('phash')
-                    if cached_phash:
-                        distance = hamming_distance(target_phash, cached_phash)
-                        if distance <= self.phash_threshold:
-                            return [(
-                                cached_info.get('path', 'unknown'),
-                                'near-duplicate',
-                                float(distance)
-                            )]
-        
-        # No matches found
-        return []
+        index = self.get_index(event_driven, academic_year)
+        return index.match(target_sha256, phash_to_int(target_phash), self.phash_threshold)
     
     def add_file_to_cache(
         self,
@@ -160,17 +199,12 @@ class BlobDirectoryScanner:
             academic_year: Academic year
             submission_id: Submission ID
         """
-        cache_key = f"{event_driven}_{academic_year}"
-        
-        if cache_key not in _directory_hash_cache:
-            _directory_hash_cache[cache_key] = {}
-        
-        _directory_hash_cache[cache_key][sha256] = {
+        self.get_index(event_driven, academic_year).add(sha256, phash, {
             'phash': phash,
             'path': file_path,
             'submission_id': submission_id,
             'first_seen': submission_id  # Track first submission that saw this file
-        }
+        })
     
     def clear_cache(self, event_driven: Optional[int] = None, academic_year: Optional[str] = None):
         """Clear directory hash cache."""
@@ -2,10 +2,11 @@
 Circuit breaker for API rate limit protection.
 Prevents hammering APIs during sustained throttling periods.
 """
+import os
 import time
 import threading
 import logging
-from typing import Optional
+from typing import Dict, Optional
 from enum import Enum
 
 logger = logging.getLogger(__name__)
@@ -224,69 +225,69 @@ class CircuitBreaker:
             logger.info(f"Circuit breaker '{self.name}' manually reset")
 
 
-# Global circuit breaker instances
-_gemini_circuit_breaker: Optional[CircuitBreaker] = None
-_groq_circuit_breaker: Optional[CircuitBreaker] = None
+# Global circuit breaker registry, keyed by provider name ("gemini", "groq", ...)
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
 _circuit_breaker_lock = threading.Lock()
 
 
-def get_gemini_circuit_breaker() -> CircuitBreaker:
-    """Get or create global Gemini circuit breaker."""
-    global _gemini_circuit_breaker
+def _circuit_breaker_config(provider: str) -> dict:
+    """
+    Read circuit breaker settings for a provider from environment variables.
+    
+    Variables are prefixed with the upper-cased provider name, e.g.
+    GEMINI_CIRCUIT_BREAKER_THRESHOLD or GROQ_CIRCUIT_BREAKER_COOLDOWN.
+    """
+    prefix = provider.upper()
+    # VERY LENIENT defaults: 70% error rate, 10s cooldown, min 20 errors
+    return {
+        "error_threshold": float(os.getenv(f'{prefix}_CIRCUIT_BREAKER_THRESHOLD', '0.70')),
+        "window_duration": float(os.getenv(f'{prefix}_CIRCUIT_BREAKER_WINDOW', '30')),
+        "cooldown_duration": float(os.getenv(f'{prefix}_CIRCUIT_BREAKER_COOLDOWN', '10')),
+        "min_errors_to_open": int(os.getenv(f'{prefix}_CIRCUIT_BREAKER_MIN_ERRORS', '20')),
+    }
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    """
+    Get or create the global circuit breaker for a provider.
+    
+    The lookup is lock-free once the breaker exists; the lock is only taken
+    to create it on first use.
+    """
+    breaker = _circuit_breakers.get(provider)
+    if breaker is not None:
+        return breaker
     
     with _circuit_breaker_lock:
-        if _gemini_circuit_breaker is None:
-            import os
-            # VERY LENIENT defaults: 70% error rate, 10s cooldown, min 20 errors
-            error_threshold = float(os.getenv('GEMINI_CIRCUIT_BREAKER_THRESHOLD', '0.70'))
-            window_duration = float(os.getenv('GEMINI_CIRCUIT_BREAKER_WINDOW', '30'))
-            cooldown_duration = float(os.getenv('GEMINI_CIRCUIT_BREAKER_COOLDOWN', '10'))
-            min_errors = int(os.getenv('GEMINI_CIRCUIT_BREAKER_MIN_ERRORS', '20'))
-            
-            _gemini_circuit_breaker = CircuitBreaker(
-                error_threshold=error_threshold,
-                window_duration=window_duration,
-                cooldown_duration=cooldown_duration,
-                min_errors_to_open=min_errors,
-                name="gemini"
-            )
-        
-        return _gemini_circuit_breaker
+        breaker = _circuit_breakers.get(provider)
+        if breaker is None:
+            breaker = CircuitBreaker(name=provider, **_circuit_breaker_config(provider))
+            _circuit_breakers[provider] = breaker
+        return breaker
+
+
+def reset_circuit_breaker(provider: str):
+    """Reset a provider's circuit breaker if it has been created."""
+    breaker = _circuit_breakers.get(provider)
+    if breaker is not None:
+        breaker.reset()
+
+
+def get_gemini_circuit_breaker() -> CircuitBreaker:
+    """Get or create global Gemini circuit breaker."""
+    return get_circuit_breaker("gemini")
 
 
 def get_groq_circuit_breaker() -> CircuitBreaker:
     """Get or create global Groq circuit breaker."""
-    global _groq_circuit_breaker
-    
-    with _circuit_breaker_lock:
-        if _groq_circuit_breaker is None:
-            import os
-            # VERY LENIENT defaults: 70% error rate, 10s cooldown, min 20 errors
-            error_threshold = float(os.getenv('GROQ_CIRCUIT_BREAKER_THRESHOLD', '0.70'))
-            window_duration = float(os.getenv('GROQ_CIRCUIT_BREAKER_WINDOW', '30'))
-            cooldown_duration = float(os.getenv('GROQ_CIRCUIT_BREAKER_COOLDOWN', '10'))
-            min_errors = int(os.getenv('GROQ_CIRCUIT_BREAKER_MIN_ERRORS', '20'))
-            
-            _groq_circuit_breaker = CircuitBreaker(
-                error_threshold=error_threshold,
-                window_duration=window_duration,
-                cooldown_duration=cooldown_duration,
-                min_errors_to_open=min_errors,
-                name="groq"
-            )
-        
-        return _groq_circuit_breaker
+    return get_circuit_breaker("groq")
 
 
 def reset_gemini_circuit_breaker():
     """Reset Gemini circuit breaker."""
-    with _circuit_breaker_lock:
-        if _gemini_circuit_breaker:
-            _gemini_circuit_breaker.reset()
+    reset_circuit_breaker("gemini")
 
 
 def reset_groq_circuit_breaker():
     """Reset Groq circuit breaker."""
-    with _circuit_breaker_lock:
-        if _groq_circuit_breaker:
-            _groq_circuit_breaker.reset()
+    reset_circuit_breaker("groq")
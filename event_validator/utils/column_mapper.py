@@ -40,8 +40,57 @@ LEVEL_DEFINITIONS = {
     }
 }
 
+# Fixed string column renames: (standard column, CSV column, default value)
+STRING_FIELD_MAPPINGS = [
+    ('Title', 'activity_name', ''),
+    ('Objectives', 'Objective', ''),
+    ('Learning Outcomes', 'benefit_learning', ''),
+    ('Theme', 'event_theme', ''),
+    ('Event Type', 'event_type', ''),
+    ('Event Date', 'from_date', ''),
+    ('Year Type', 'financial_year', 'Financial'),
+    ('Event Mode', 'session_type', ''),
+]
 
-def map_row_to_standard_format(row_data: Dict[str, Any]) -> Dict[str, Any]:
+
+def _build_string_field_mapper(mappings):
+    """
+    Generate a straight-line mapper for the fixed string columns.
+
+    The schema never changes between rows, so the function body is built once
+    at import time as a single dict literal instead of looping over the table.
+    """
+    entries = ",\n        ".join(
+        f"{target!r}: str(row.get({source!r}, {default!r})).strip()"
+        for target, source, default in mappings
+    )
+    source_code = f"def _map_string_fields(row):\n    return {{\n        {entries}\n    }}\n"
+    namespace: Dict[str, Any] = {}
+    exec(compile(source_code, f"<{__name__}.string_field_mapper>", "exec"), namespace)
+    return namespace['_map_string_fields']
+
+
+_map_string_fields = _build_string_field_mapper(STRING_FIELD_MAPPINGS)
+
+
+def _to_int(value: Any) -> int:
+    """Coerce a count to int, skipping the conversion when it is already an int."""
+    if type(value) is int:
+        return value
+    return int(value) if value else 0
+
+
+def _to_float(value: Any) -> float:
+    """Coerce a duration to float, skipping the conversion when it is already a float."""
+    if type(value) is float:
+        return value
+    return float(value)
+
+
+def map_row_to_standard_format(
+    row_data: Dict[str, Any],
+    include_original: bool = False
+) -> Dict[str, Any]:
     """
     Map actual CSV columns to standard validation format.
     
@@ -59,25 +108,20 @@ def map_row_to_standard_format(row_data: Dict[str, Any]) -> Dict[str, Any]:
     - report -> PDF Path (with Azure Blob Storage base path)
     - photo1, photo2 -> Image Paths (with Azure Blob Storage base path)
     - event_driven -> Event Driven (for path resolution)
-    """
-    mapped = {}
-    
-    # Basic mappings
-    mapped['Title'] = str(row_data.get('activity_name', '')).strip()
-    mapped['Objectives'] = str(row_data.get('Objective', '')).strip()
-    mapped['Learning Outcomes'] = str(row_data.get('benefit_learning', '')).strip()
-    mapped['Theme'] = str(row_data.get('event_theme', '')).strip()
-    mapped['Event Type'] = str(row_data.get('event_type', '')).strip()
-    mapped['Event Date'] = str(row_data.get('from_date', '')).strip()
-    mapped['Year Type'] = str(row_data.get('financial_year', 'Financial')).strip()
-    mapped['Event Mode'] = str(row_data.get('session_type', '')).strip()
     
+    If include_original is True, the source row is kept under '_original_data'.
+    Callers normally hold on to the original row themselves, so it is omitted
+    by default to avoid keeping two dicts alive per row.
+    """
+    # Basic mappings (generated from STRING_FIELD_MAPPINGS)
+    mapped = _map_string_fields(row_data)
+
     # Duration mapping (activity_duration is in hours)
     activity_duration = row_data.get('activity_duration')
     duration_hours_float = None
     if activity_duration is not None:
         try:
-            duration_hours_float = float(activity_duration)
+            duration_hours_float = _to_float(activity_duration)
             mapped['Duration'] = f"{duration_hours_float}h"
         except (ValueError, TypeError):
             mapped['Duration'] = str(activity_duration) if activity_duration else ""
@@ -85,10 +129,10 @@ def map_row_to_standard_format(row_data: Dict[str, Any]) -> Dict[str, Any]:
         mapped['Duration'] = ""
     
     # Participants: sum of student and faculty
-    student_participants = row_data.get('student_participants', 0) or 0
-    faculty_participants = row_data.get('faculty_participants', 0) or 0
+    student_participants = row_data.get('student_participants', 0)
+    faculty_participants = row_data.get('faculty_participants', 0)
     try:
-        total_participants = int(student_participants) + int(faculty_participants)
+        total_participants = _to_int(student_participants) + _to_int(faculty_participants)
         mapped['Participants'] = str(total_participants)
     except (ValueError, TypeError):
         mapped['Participants'] = "0"
@@ -165,8 +209,9 @@ def map_row_to_standard_format(row_data: Dict[str, Any]) -> Dict[str, Any]:
     
     mapped['Image Paths'] = ",".join(image_paths) if image_paths else ""
     
-    # Keep original data for reference
-    mapped['_original_data'] = row_data
+    # Keep original data for reference (opt-in)
+    if include_original:
+        mapped['_original_data'] = row_data
     
     return mapped
 
@@ -9,7 +9,7 @@ import logging
 import os
 import random
 import time
-from typing import Optional
+from typing import Dict
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
@@ -20,80 +20,74 @@ logger = logging.getLogger(__name__)
 GEMINI_MAX_CONCURRENT = int(os.getenv('GEMINI_MAX_CONCURRENT', '6'))  # Increased from 4 to 6
 GROQ_MAX_CONCURRENT = int(os.getenv('GROQ_MAX_CONCURRENT', '1'))
 
-# Global semaphores (thread-safe)
-_gemini_semaphore: Optional[threading.Semaphore] = None
-_groq_semaphore: Optional[threading.Semaphore] = None
-_semaphore_lock = threading.Lock()
-
+# Per-provider concurrency limits
+PROVIDER_MAX_CONCURRENT: Dict[str, int] = {
+    "gemini": GEMINI_MAX_CONCURRENT,
+    "groq": GROQ_MAX_CONCURRENT,
+}
 
-def _get_gemini_semaphore() -> threading.Semaphore:
-    """Get or create Gemini semaphore."""
-    global _gemini_semaphore
-    with _semaphore_lock:
-        if _gemini_semaphore is None:
-            _gemini_semaphore = threading.Semaphore(GEMINI_MAX_CONCURRENT)
-            logger.info(f"Gemini concurrency semaphore initialized: max {GEMINI_MAX_CONCURRENT} concurrent calls")
-        return _gemini_semaphore
+# Global semaphore registry, keyed by provider name (thread-safe)
+_semaphores: Dict[str, threading.Semaphore] = {}
+_semaphore_lock = threading.Lock()
 
 
-def _get_groq_semaphore() -> threading.Semaphore:
-    """Get or create Groq semaphore."""
-    global _groq_semaphore
+def _get_semaphore(provider: str) -> threading.Semaphore:
+    """
+    Get or create the concurrency semaphore for a provider.
+    
+    The lookup is lock-free once the semaphore exists; the lock is only taken
+    to create it on first use.
+    """
+    semaphore = _semaphores.get(provider)
+    if semaphore is not None:
+        return semaphore
+    
     with _semaphore_lock:
-        if _groq_semaphore is None:
-            _groq_semaphore = threading.Semaphore(GROQ_MAX_CONCURRENT)
-            logger.info(f"Groq concurrency semaphore initialized: max {GROQ_MAX_CONCURRENT} concurrent calls")
-        return _groq_semaphore
+        semaphore = _semaphores.get(provider)
+        if semaphore is None:
+            max_concurrent = PROVIDER_MAX_CONCURRENT.get(provider, 1)
+            semaphore = threading.Semaphore(max_concurrent)
+            _semaphores[provider] = semaphore
+            logger.info(
+                f"{provider.capitalize()} concurrency semaphore initialized: "
+                f"max {max_concurrent} concurrent calls"
+            )
+        return semaphore
 
 
 @contextmanager
-def gemini_concurrency_guard():
+def concurrency_guard(provider: str):
     """
-    Context manager to limit concurrent Gemini API calls.
+    Context manager to limit concurrent API calls for a provider.
     
     Usage:
-        with gemini_concurrency_guard():
+        with concurrency_guard("gemini"):
             result = gemini_client.generate(...)
     
-    This ensures at most GEMINI_MAX_CONCURRENT calls are in flight at once.
+    This ensures at most PROVIDER_MAX_CONCURRENT[provider] calls are in flight at once.
     """
-    semaphore = _get_gemini_semaphore()
+    semaphore = _get_semaphore(provider)
     acquired = False
     try:
-        logger.debug("Acquiring Gemini concurrency semaphore...")
+        logger.debug(f"Acquiring {provider} concurrency semaphore...")
         semaphore.acquire()
         acquired = True
-        logger.debug("Gemini concurrency semaphore acquired")
+        logger.debug(f"{provider} concurrency semaphore acquired")
         yield
     finally:
         if acquired:
             semaphore.release()
-            logger.debug("Gemini concurrency semaphore released")
+            logger.debug(f"{provider} concurrency semaphore released")
+
+
+def gemini_concurrency_guard():
+    """Context manager to limit concurrent Gemini API calls (see concurrency_guard)."""
+    return concurrency_guard("gemini")
 
 
-@contextmanager
 def groq_concurrency_guard():
-    """
-    Context manager to limit concurrent Groq API calls.
-    
-    Usage:
-        with groq_concurrency_guard():
-            result = groq_client.generate(...)
-    
-    This ensures at most GROQ_MAX_CONCURRENT calls are in flight at once.
-    """
-    semaphore = _get_groq_semaphore()
-    acquired = False
-    try:
-        logger.debug("Acquiring Groq concurrency semaphore...")
-        semaphore.acquire()
-        acquired = True
-        logger.debug("Groq concurrency semaphore acquired")
-        yield
-    finally:
-        if acquired:
-            semaphore.release()
-            logger.debug("Groq concurrency semaphore released")
+    """Context manager to limit concurrent Groq API calls (see concurrency_guard)."""
+    return concurrency_guard("groq")
 
 
 def stagger_request(min_delay: float = 0.1, max_delay: float = 0.4):
@@ -114,23 +108,18 @@ def stagger_request(min_delay: float = 0.1, max_delay: float = 0.4):
 
 def get_concurrency_stats() -> dict:
     """Get current concurrency stats for monitoring."""
-    gemini_sem = _get_gemini_semaphore()
-    groq_sem = _get_groq_semaphore()
-    
-    # Note: _value is internal but useful for debugging
+    # Note: Semaphore._value is internal but useful for debugging
     # In production, track active calls separately
     return {
         "gemini_max_concurrent": GEMINI_MAX_CONCURRENT,
         "groq_max_concurrent": GROQ_MAX_CONCURRENT,
-        "gemini_semaphore_initialized": _gemini_semaphore is not None,
-        "groq_semaphore_initialized": _groq_semaphore is not None
+        "gemini_semaphore_initialized": "gemini" in _semaphores,
+        "groq_semaphore_initialized": "groq" in _semaphores
     }
 
 
 def reset_semaphores():
     """Reset semaphores (for testing)."""
-    global _gemini_semaphore, _groq_semaphore
     with _semaphore_lock:
-        _gemini_semaphore = None
-        _groq_semaphore = None
+        _semaphores.clear()
         logger.info("Concurrency semaphores reset")
@@ -1,26 +1,63 @@
 """Utilities for downloading files from URLs (Azure Blob Storage, etc.)."""
+import hashlib
 import logging
 import os
+import select
+import tempfile
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
-# Directory to save downloaded files (current working directory)
-DOWNLOAD_DIR = Path.cwd() / "downloaded_files"
-DOWNLOAD_DIR.mkdir(exist_ok=True)
+# Directory to save downloaded files (default: current working directory)
+# Downloads are transient, so it can point at tmpfs (e.g. /dev/shm/event_validator)
+# or another non-durable volume to keep writes and cleanup off the journal
+DOWNLOAD_DIR = Path(os.getenv("EVENT_VALIDATOR_DOWNLOAD_DIR", str(Path.cwd() / "downloaded_files")))
+DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 # Cleanup configuration (in seconds)
 CLEANUP_INTERVAL = int(os.getenv("CLEANUP_INTERVAL", "3600"))  # Default: 1 hour
 FILE_MAX_AGE = int(os.getenv("FILE_MAX_AGE", "86400"))  # Default: 24 hours (1 day)
 
-# Global cleanup thread
+# Cleanup deletes in batches, pausing briefly between them (in seconds)
+UNLINK_BATCH_SIZE = 64
+UNLINK_BATCH_PAUSE = 0.001
+
+# Permissions of downloaded files, whichever way their name was claimed
+DOWNLOAD_FILE_MODE = 0o644
+
+# Buffer size used when copying the response body to disk (in bytes)
+# Default: 1 MiB, never below 64 KiB so per-chunk overhead stays amortized
+DOWNLOAD_BUFFER_SIZE = max(64 * 1024, int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(1024 * 1024))))
+
+# Opt-in in-kernel copy (socket -> pipe -> file via splice) for plain-HTTP
+# downloads with a known Content-Length; HTTPS always uses the userspace loop
+DOWNLOAD_USE_SENDFILE = os.getenv("DOWNLOAD_USE_SENDFILE", "0") == "1"
+
+# Shared HTTP session so downloads from the same blob host reuse pooled
+# TCP/TLS connections instead of handshaking per file
+DOWNLOAD_POOL_CONNECTIONS = 32  # Number of hosts to keep pools for
+DOWNLOAD_POOL_MAXSIZE = 64  # Max pooled connections per host
+
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=DOWNLOAD_POOL_CONNECTIONS,
+    pool_maxsize=DOWNLOAD_POOL_MAXSIZE,
+    max_retries=0  # NO retries - a failed download is reported as missing
+)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)
+
+# Global cleanup thread (stopped by setting _cleanup_stop)
 _cleanup_thread: Optional[threading.Thread] = None
-_cleanup_running = False
+_cleanup_stop = threading.Event()
 
 
 def download_file(
@@ -55,6 +92,109 @@ def download_file(
         return None
 
 
+@lru_cache(maxsize=4096)
+def _filename_from_url(url: str) -> str:
+    """Derive the local filename for a URL (memoized; batches repeat URLs)."""
+    url_path = Path(urlparse(url).path)
+    filename = url_path.name or "downloaded_file"
+    
+    # If filename is empty or generic, use hash of URL
+    if not filename or filename == "downloaded_file":
+        url_hash = hashlib.blake2b(url.encode(), digest_size=4).hexdigest()
+        file_extension = url_path.suffix or '.tmp'
+        filename = f"event_validator_{url_hash}{file_extension}"
+    
+    return filename
+
+
+def _create_download_file(filename: str) -> Tuple[int, Path]:
+    """
+    Create a new, uniquely named file in DOWNLOAD_DIR and return (fd, path).
+    
+    The plain filename is claimed with O_EXCL when free; on a collision
+    mkstemp picks a unique "<stem>_<random><suffix>" name, so allocation costs
+    a constant number of syscalls however many files share the name.
+    """
+    download_path = DOWNLOAD_DIR / filename
+    try:
+        fd = os.open(download_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, DOWNLOAD_FILE_MODE)
+        return fd, download_path
+    except FileExistsError:
+        fd, path_str = tempfile.mkstemp(
+            dir=str(DOWNLOAD_DIR),
+            prefix=f"{download_path.stem}_",
+            suffix=download_path.suffix
+        )
+        # mkstemp creates files 0o600; give them the same mode as the O_EXCL path
+        if hasattr(os, "fchmod"):  # Not available on Windows before Python 3.13
+            os.fchmod(fd, DOWNLOAD_FILE_MODE)
+        return fd, Path(path_str)
+
+
+def _write_all(fd: int, data: bytes):
+    """Write data to fd, retrying on short writes."""
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _kernel_copy_length(response: requests.Response, url: str) -> Optional[int]:
+    """Return the body length if the response can be spliced to disk, else None."""
+    if not DOWNLOAD_USE_SENDFILE or not hasattr(os, 'splice'):
+        return None
+    if urlparse(url).scheme != 'http' or response.url.startswith('https://'):
+        return None
+    if response.headers.get('Content-Encoding') or response.headers.get('Transfer-Encoding'):
+        return None
+    content_length = response.headers.get('Content-Length', '')
+    if not content_length.isdigit():
+        return None
+    # urllib3/http.client internals: fail over to the normal path if they move
+    if getattr(getattr(response.raw, '_fp', None), 'fp', None) is None:
+        return None
+    if getattr(getattr(response.raw, '_connection', None), 'sock', None) is None:
+        return None
+    return int(content_length)
+
+
+def _splice_body(response: requests.Response, fd: int, content_length: int):
+    """
+    Copy the response body from its socket into fd without passing it through Python.
+    
+    Body bytes already buffered alongside the headers are written first; the
+    rest moves socket -> pipe -> file with os.splice.
+    """
+    sock = response.raw._connection.sock
+    sock_fd = sock.fileno()
+    timeout = sock.gettimeout()
+    
+    head = response.raw._fp.fp.read1(content_length) if content_length else b''
+    _write_all(fd, head)
+    remaining = content_length - len(head)
+    
+    pipe_read, pipe_write = os.pipe()
+    try:
+        while remaining:
+            try:
+                moved = os.splice(sock_fd, pipe_write, min(remaining, DOWNLOAD_BUFFER_SIZE))
+            except BlockingIOError:
+                # Socket has a timeout (non-blocking fd): wait for data like recv would
+                if not select.select([sock_fd], [], [], timeout)[0]:
+                    raise requests.exceptions.ReadTimeout(f"Read timed out after {timeout}s")
+                continue
+            if moved == 0:
+                raise requests.exceptions.ConnectionError(
+                    f"Connection closed with {remaining} of {content_length} bytes unread"
+                )
+            remaining -= moved
+            while moved:
+                moved -= os.splice(pipe_read, fd, moved)
+    finally:
+        os.close(pipe_read)
+        os.close(pipe_write)
+
+
 def _download_file_single(url: str, timeout: int = 30) -> Optional[Path]:
     """
     Single attempt to download a file from URL.
@@ -67,39 +207,32 @@ def _download_file_single(url: str, timeout: int = 30) -> Optional[Path]:
     try:
         logger.debug(f"Attempting download from URL: {url}")
         
-        # Download file
-        response = requests.get(url, timeout=timeout, stream=True)
-        response.raise_for_status()
-        
-        # Create filename from URL
-        parsed_url = urlparse(url)
-        url_path = Path(parsed_url.path)
-        filename = url_path.name or "downloaded_file"
-        
-        # If filename is empty or generic, use hash of URL
-        if not filename or filename == "downloaded_file":
-            import hashlib
-            url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
-            file_extension = url_path.suffix or '.tmp'
-            filename = f"event_validator_{url_hash}{file_extension}"
-        
-        # Ensure unique filename in download directory
-        download_path = DOWNLOAD_DIR / filename
-        counter = 1
-        while download_path.exists():
-            stem = download_path.stem
-            suffix = download_path.suffix
-            download_path = DOWNLOAD_DIR / f"{stem}_{counter}{suffix}"
-            counter += 1
-        
-        # Download and save file
-        with open(download_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-        
-        logger.debug(f"Successfully downloaded file to: {download_path}")
-        return download_path
+        # Download file (pooled session)
+        response = _session.get(url, timeout=timeout, stream=True)
+        # Close the response on every path so its connection returns to the pool
+        with response:
+            response.raise_for_status()
+            
+            # Create filename from URL
+            filename = _filename_from_url(url)
+            
+            # Ensure unique filename in download directory
+            fd, download_path = _create_download_file(filename)
+            
+            # Download and save file (large chunks written straight to the fd,
+            # skipping the BufferedWriter copy)
+            try:
+                content_length = _kernel_copy_length(response, url)
+                if content_length is not None:
+                    _splice_body(response, fd, content_length)
+                else:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_BUFFER_SIZE):
+                        _write_all(fd, chunk)
+            finally:
+                os.close(fd)
+            
+            logger.debug(f"Successfully downloaded file to: {download_path}")
+            return download_path
         
     except requests.exceptions.HTTPError as e:
         if e.response and e.response.status_code == 404:
@@ -133,6 +266,59 @@ def download_image(
     return download_file(url, event_driven=event_driven, academic_year=academic_year)
 
 
+def download_files_batch(
+    urls: List[str],
+    max_workers: int = 16,
+    timeout: int = 30
+) -> List[Optional[Path]]:
+    """
+    Download several URLs concurrently over the shared connection pool.
+    
+    Args:
+        urls: URLs to download
+        max_workers: Maximum parallel downloads (capped at the pool size)
+        timeout: Request timeout per download
+    
+    Returns:
+        List of downloaded Paths in the same order as urls (None for failures).
+    """
+    if not urls:
+        return []
+    
+    workers = min(len(urls), max_workers, DOWNLOAD_POOL_MAXSIZE)
+    if workers == 1:
+        return [download_file(url, timeout=timeout) for url in urls]
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda url: download_file(url, timeout=timeout), urls))
+
+
+def log_download_dir_info():
+    """Log the download directory and its filesystem block size / free space."""
+    try:
+        st = os.statvfs(DOWNLOAD_DIR)
+    except (AttributeError, OSError) as e:  # statvfs is POSIX-only
+        logger.info(f"Download directory: {DOWNLOAD_DIR} (filesystem info unavailable: {e})")
+        return
+    
+    free_gb = st.f_bavail * st.f_frsize / (1024 ** 3)
+    logger.info(
+        f"Download directory: {DOWNLOAD_DIR} "
+        f"(block size: {st.f_bsize} bytes, free: {free_gb:.1f} GB, write chunk: {DOWNLOAD_BUFFER_SIZE} bytes)"
+    )
+    if DOWNLOAD_BUFFER_SIZE % st.f_bsize:
+        logger.warning(
+            f"DOWNLOAD_CHUNK_SIZE ({DOWNLOAD_BUFFER_SIZE}) is not a multiple of the "
+            f"filesystem block size ({st.f_bsize})"
+        )
+
+
+def _throttle_unlinks(deleted_count: int):
+    """Pause briefly every UNLINK_BATCH_SIZE deletions to avoid an unlink storm."""
+    if deleted_count % UNLINK_BATCH_SIZE == 0:
+        time.sleep(UNLINK_BATCH_PAUSE)
+
+
 def cleanup_old_files(max_age_seconds: Optional[int] = None) -> int:
     """
     Delete files in DOWNLOAD_DIR that are older than max_age_seconds.
@@ -154,20 +340,23 @@ def cleanup_old_files(max_age_seconds: Optional[int] = None) -> int:
     total_size_freed = 0
     
     try:
-        for file_path in DOWNLOAD_DIR.iterdir():
-            if file_path.is_file():
+        with os.scandir(DOWNLOAD_DIR) as entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
                 try:
-                    # Get file modification time
-                    file_age = current_time - file_path.stat().st_mtime
+                    # Single stat for both age and size
+                    st = entry.stat(follow_symlinks=False)
+                    file_age = current_time - st.st_mtime
                     
                     if file_age > max_age_seconds:
-                        file_size = file_path.stat().st_size
-                        file_path.unlink()
+                        os.unlink(entry.path)
                         deleted_count += 1
-                        total_size_freed += file_size
-                        logger.debug(f"Deleted old file: {file_path.name} (age: {file_age/3600:.2f} hours)")
+                        total_size_freed += st.st_size
+                        logger.debug(f"Deleted old file: {entry.name} (age: {file_age/3600:.2f} hours)")
+                        _throttle_unlinks(deleted_count)
                 except OSError as e:
-                    logger.warning(f"Failed to delete file {file_path}: {e}")
+                    logger.warning(f"Failed to delete file {entry.path}: {e}")
         
         if deleted_count > 0:
             logger.info(
@@ -197,15 +386,18 @@ def cleanup_all_files() -> int:
     total_size_freed = 0
     
     try:
-        for file_path in DOWNLOAD_DIR.iterdir():
-            if file_path.is_file():
+        with os.scandir(DOWNLOAD_DIR) as entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
                 try:
-                    file_size = file_path.stat().st_size
-                    file_path.unlink()
+                    file_size = entry.stat(follow_symlinks=False).st_size
+                    os.unlink(entry.path)
                     deleted_count += 1
                     total_size_freed += file_size
+                    _throttle_unlinks(deleted_count)
                 except OSError as e:
-                    logger.warning(f"Failed to delete file {file_path}: {e}")
+                    logger.warning(f"Failed to delete file {entry.path}: {e}")
         
         if deleted_count > 0:
             logger.info(
@@ -221,35 +413,30 @@ def cleanup_all_files() -> int:
 
 def _periodic_cleanup_worker():
     """Background worker thread for periodic cleanup."""
-    global _cleanup_running
-    _cleanup_running = True
-    
     logger.info(f"Starting periodic cleanup worker (interval: {CLEANUP_INTERVAL}s, max age: {FILE_MAX_AGE}s)")
     
-    while _cleanup_running:
+    while not _cleanup_stop.is_set():
         try:
             cleanup_old_files()
         except Exception as e:
             logger.error(f"Error in periodic cleanup worker: {e}")
         
-        # Sleep in small intervals to allow for quick shutdown
-        for _ in range(CLEANUP_INTERVAL):
-            if not _cleanup_running:
-                break
-            time.sleep(1)
+        # Single wait per interval; returns immediately when stop is requested
+        if _cleanup_stop.wait(CLEANUP_INTERVAL):
+            break
     
     logger.info("Periodic cleanup worker stopped")
 
 
 def start_periodic_cleanup():
     """Start the periodic cleanup background thread."""
-    global _cleanup_thread, _cleanup_running
+    global _cleanup_thread
     
     if _cleanup_thread is not None and _cleanup_thread.is_alive():
         logger.warning("Periodic cleanup thread is already running")
         return
     
-    _cleanup_running = True
+    _cleanup_stop.clear()
     _cleanup_thread = threading.Thread(target=_periodic_cleanup_worker, daemon=True)
     _cleanup_thread.start()
     logger.info("Periodic cleanup started")
@@ -257,12 +444,10 @@ def start_periodic_cleanup():
 
 def stop_periodic_cleanup():
     """Stop the periodic cleanup background thread."""
-    global _cleanup_thread, _cleanup_running
-    
     if _cleanup_thread is None:
         return
     
-    _cleanup_running = False
+    _cleanup_stop.set()
     if _cleanup_thread.is_alive():
         _cleanup_thread.join(timeout=5)
         logger.info("Periodic cleanup stopped")
@@ -1,16 +1,87 @@
 """File operations utilities for reading and writing CSV files."""
+import codecs
 import logging
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
 import pandas as pd
 
+try:
+    from charset_normalizer import from_bytes as detect_charset
+except ImportError:
+    detect_charset = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
 logger = logging.getLogger(__name__)
 
 # Output directory for generated CSV files
 OUTPUT_DIR = Path("./outputs")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Bytes sampled from the start of a CSV to detect its encoding
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# Non-UTF-8 encodings accepted for CSV input
+LEGACY_CSV_ENCODINGS = ['cp1252', 'latin_1']
+
+
+def _detect_csv_encoding(path: Path) -> str:
+    """
+    Detect a CSV file's encoding from a prefix of its bytes.
+    
+    UTF-8 is checked first (strictly, tolerating a multi-byte character cut
+    off at the end of the sample); otherwise charset-normalizer picks between
+    the legacy single-byte encodings when available, falling back to latin-1,
+    which decodes any input.
+    """
+    with open(path, 'rb') as f:
+        prefix = f.read(ENCODING_SAMPLE_SIZE)
+    
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(prefix, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    
+    if detect_charset is not None:
+        best = detect_charset(prefix, cp_isolation=LEGACY_CSV_ENCODINGS).best()
+        if best is not None and best.encoding:
+            return best.encoding
+    
+    return 'latin-1'
+
+
+def _read_csv_arrow(path: Path, encoding: str) -> pd.DataFrame:
+    """
+    Parse a CSV with PyArrow's multithreaded reader.
+    
+    Only numeric and boolean columns keep Arrow's inferred type; everything
+    else is read as text so dates and times reach the validators exactly as
+    written, the same as with the pandas parser.
+    """
+    read_options = pacsv.ReadOptions(encoding=encoding)
+    with pacsv.open_csv(path, read_options=read_options) as reader:
+        inferred_schema = reader.schema
+    
+    column_types = {
+        field.name: pa.string()
+        for field in inferred_schema
+        if not (
+            pa.types.is_integer(field.type)
+            or pa.types.is_floating(field.type)
+            or pa.types.is_boolean(field.type)
+        )
+    }
+    convert_options = pacsv.ConvertOptions(column_types=column_types, strings_can_be_null=True)
+    table = pacsv.read_csv(path, read_options=read_options, convert_options=convert_options)
+    return table.to_pandas()
+
 
 def read_csv_from_path(file_path: str) -> pd.DataFrame:
     """
@@ -41,17 +112,22 @@ def read_csv_from_path(file_path: str) -> pd.DataFrame:
     
     try:
         if file_extension == '.csv':
-            # Try different encodings
-            for encoding in ['utf-8', 'latin-1', 'cp1252']:
+            # Detect the encoding once from a prefix, then parse a single time
+            encoding = _detect_csv_encoding(path)
+            df = None
+            if pacsv is not None:
+                try:
+                    df = _read_csv_arrow(path, encoding)
+                except (pa.ArrowInvalid, UnicodeDecodeError) as e:
+                    # e.g. a column's type changes after the first block; let pandas handle it
+                    logger.debug(f"PyArrow CSV read failed for {file_path}, using pandas parser: {e}")
+            if df is None:
                 try:
-                    df = pd.read_csv(path, encoding=encoding)
-                    if df.empty:
-                        raise ValueError(f"CSV file is empty: {file_path}")
-                    return df
+                    df = pd.read_csv(path, encoding=encoding, engine='c', low_memory=False)
                 except UnicodeDecodeError:
-                    continue
-            # If all encodings fail, use utf-8 with errors='ignore'
-            df = pd.read_csv(path, encoding='utf-8', errors='ignore')
+                    # Undecodable bytes past the sampled prefix; latin-1 accepts anything
+                    logger.warning(f"Encoding {encoding} failed beyond sampled prefix, re-reading {file_path} as latin-1")
+                    df = pd.read_csv(path, encoding='latin-1', engine='c', low_memory=False)
             if df.empty:
                 raise ValueError(f"CSV file is empty: {file_path}")
             return df
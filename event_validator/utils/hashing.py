@@ -1,8 +1,10 @@
 """Hashing utilities for duplicate detection."""
 import hashlib
 import io
+import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Union, List, Tuple
+from typing import Iterator, Optional, Union, List, Tuple
 import logging
 
 try:
@@ -15,26 +17,42 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+# Read size for hashing files on Python versions without hashlib.file_digest
+HASH_READ_SIZE = 1024 * 1024  # 1 MiB
+
+# pHash only looks at a 32x32 grayscale thumbnail, so JPEGs are decoded at a
+# reduced DCT scale (1/2 - 1/8) that still leaves at least this many pixels
+# per side for the antialiased downsample
+PHASH_DECODE_SIZE = 256
+
+
+def _file_sha256(f):
+    """Hash an open binary file, reading large blocks straight into OpenSSL."""
+    if hasattr(hashlib, "file_digest"):
+        # Python 3.11+: C-level read loop, no per-chunk Python round trips
+        return hashlib.file_digest(f, "sha256")
+    
+    hash_sha256 = hashlib.sha256()
+    buffer = bytearray(HASH_READ_SIZE)
+    view = memoryview(buffer)
+    while True:
+        size = f.readinto(buffer)
+        if not size:
+            break
+        hash_sha256.update(view[:size])
+    return hash_sha256
+
+
 def compute_sha256(file_path: Union[Path, io.BytesIO]) -> Optional[str]:
     """Compute SHA256 hash of a file or stream."""
     try:
-        hash_sha256 = hashlib.sha256()
-        
         if isinstance(file_path, io.BytesIO):
-            # Reset stream position
-            file_path.seek(0)
-            for chunk in iter(lambda: file_path.read(4096), b""):
-                if not chunk:
-                    break
-                hash_sha256.update(chunk)
-            file_path.seek(0)  # Reset for potential reuse
-        else:
-            # File path
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_sha256.update(chunk)
+            # Hash the in-memory buffer in one shot (no copy, position untouched)
+            return hashlib.sha256(file_path.getbuffer()).hexdigest()
         
-        return hash_sha256.hexdigest()
+        # File path
+        with open(file_path, "rb") as f:
+            return _file_sha256(f).hexdigest()
     except Exception as e:
         logger.error(f"Error computing SHA256: {e}")
         return None
@@ -54,6 +72,9 @@ def compute_phash(file_path: Union[Path, io.BytesIO]) -> Optional[str]:
         else:
             img = Image.open(file_path)
         
+        # Shrink-on-load: JPEG decoder skips full-resolution decode (no-op for other formats)
+        img.draft('L', (PHASH_DECODE_SIZE, PHASH_DECODE_SIZE))
+        
         phash = imagehash.phash(img)
         return str(phash)
     except Exception as e:
@@ -61,23 +82,99 @@ def compute_phash(file_path: Union[Path, io.BytesIO]) -> Optional[str]:
         return None
 
 
+# Population count: int.bit_count() is a C popcount on Python 3.10+
+if hasattr(int, "bit_count"):
+    _popcount = int.bit_count
+else:
+    def _popcount(value: int) -> int:
+        return bin(value).count("1")
+
+
+def phash_to_int(phash: Optional[str]) -> Optional[int]:
+    """Parse a hex pHash once so it can be compared with hamming_distance_int."""
+    if not phash:
+        return None
+    try:
+        return int(phash, 16)
+    except ValueError:
+        return None
+
+
+def hamming_distance_int(hash1: int, hash2: int) -> int:
+    """Bitwise Hamming distance between two integer hashes (one C-level popcount)."""
+    return _popcount(hash1 ^ hash2)
+
+
 def hamming_distance(hash1: str, hash2: str) -> int:
-    """Calculate Hamming distance between two hashes."""
+    """Calculate bitwise Hamming distance between two hex-encoded hashes."""
     if len(hash1) != len(hash2):
         return float('inf')
     
-    return sum(c1 != c2 for c1, c2 in zip(hash1, hash2))
+    try:
+        return _popcount(int(hash1, 16) ^ int(hash2, 16))
+    except ValueError:
+        # Not hex - fall back to comparing characters
+        return sum(c1 != c2 for c1, c2 in zip(hash1, hash2))
+
+
+# Memoized hashes for on-disk files, keyed by (path, size, mtime_ns) so a
+# changed file is re-hashed while repeated directory scans skip unchanged ones
+HASH_CACHE_SIZE = 100_000
+
+
+@lru_cache(maxsize=HASH_CACHE_SIZE)
+def _cached_sha256(path_str: str, size: int, mtime_ns: int) -> Optional[str]:
+    """SHA256 of a file, memoized on its path and stat signature."""
+    return compute_sha256(Path(path_str))
+
+
+@lru_cache(maxsize=HASH_CACHE_SIZE)
+def _cached_phash(path_str: str, size: int, mtime_ns: int) -> Optional[str]:
+    """pHash of an image file, memoized on its path and stat signature."""
+    return compute_phash(Path(path_str))
+
+
+def clear_hash_cache():
+    """Drop all memoized file hashes."""
+    _cached_sha256.cache_clear()
+    _cached_phash.cache_clear()
+
+
+def _iter_images(base_directory: Path, extensions: set) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    Walk base_directory with os.scandir, yielding (path, stat) for image files.
+    
+    DirEntry caches file type from the directory listing, so non-matching
+    entries cost no extra stat() call and no Path object is built.
+    """
+    stack = [os.fspath(base_directory)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif (entry.is_file(follow_symlinks=False)
+                          and os.path.splitext(entry.name)[1].lower() in extensions):
+                        yield entry.path, entry.stat(follow_symlinks=False)
+        except OSError as e:
+            logger.debug(f"Skipping unreadable directory {directory}: {e}")
 
 
 def find_duplicates_in_directory(
     target_hash: str,
     target_phash: Optional[str],
     base_directory: Path,
-    phash_threshold: int = 5
+    phash_threshold: int = 5,
+    target_size: Optional[int] = None
 ) -> List[Tuple[Path, str]]:
     """
     Find duplicate images in base directory.
     
+    If target_size (bytes) is given, only files of exactly that size are
+    SHA256-hashed, since an exact match must have the same size.
+    
     Returns list of (matched_file_path, match_type) tuples.
     Match types: 'exact' (SHA256) or 'similar' (pHash).
     """
@@ -89,24 +186,30 @@ def find_duplicates_in_directory(
     # Supported image extensions
     image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'}
     
+    # Convert the target pHash once so each comparison is a single XOR + popcount
+    target_phash_int = phash_to_int(target_phash)
+    
     try:
-        for file_path in base_directory.rglob('*'):
-            if file_path.suffix.lower() not in image_extensions:
-                continue
-            
-            # Check exact match (SHA256)
-            file_hash = compute_sha256(file_path)
-            if file_hash and file_hash == target_hash:
-                matches.append((file_path, 'exact'))
-                continue
+        for path_str, st in _iter_images(base_directory, image_extensions):
+            # Check exact match (SHA256) - only possible for same-size files
+            if target_size is None or st.st_size == target_size:
+                file_hash = _cached_sha256(path_str, st.st_size, st.st_mtime_ns)
+                if file_hash and file_hash == target_hash:
+                    matches.append((Path(path_str), 'exact'))
+                    continue
             
             # Check similar match (pHash) if available
             if target_phash:
-                file_phash = compute_phash(file_path)
+                file_phash = _cached_phash(path_str, st.st_size, st.st_mtime_ns)
                 if file_phash:
-                    distance = hamming_distance(target_phash, file_phash)
+                    file_phash_int = phash_to_int(file_phash)
+                    if target_phash_int is not None and file_phash_int is not None:
+                        distance = hamming_distance_int(target_phash_int, file_phash_int)
+                    else:
+                        # Non-hex hashes: compare characters
+                        distance = hamming_distance(target_phash, file_phash)
                     if distance <= phash_threshold:
-                        matches.append((file_path, 'similar'))
+                        matches.append((Path(path_str), 'similar'))
     
     except Exception as e:
         logger.error(f"Error scanning directory {base_directory}: {e}")
@@ -1,12 +1,27 @@
 """Logging configuration for the event validation system."""
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 from typing import Optional
 
+# Background listener that writes queued records to the real handlers
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
 
-def setup_logging(log_level: str = "INFO", log_file: Optional[Path] = None):
-    """Configure logging for the application."""
+
+def setup_logging(log_level: str = "INFO", log_file: Optional[Path] = None) -> logging.handlers.QueueListener:
+    """
+    Configure logging for the application.
+    
+    Logging calls only enqueue the record; a QueueListener thread formats it
+    and does the console/file writes, so worker threads never block on I/O.
+    The queue is drained at interpreter exit, or earlier via stop_logging().
+    """
+    global _queue_listener, _queue_handler
+    
     # Create formatter
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -20,14 +35,38 @@ def setup_logging(log_level: str = "INFO", log_file: Optional[Path] = None):
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
     
     # File handler (optional)
     if log_file:
         log_file.parent.mkdir(parents=True, exist_ok=True)
         file_handler = logging.FileHandler(log_file)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    # Replace any queue from a previous call so records aren't written twice
+    stop_logging()
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    logger.addHandler(_queue_handler)
+    _queue_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
     
-    return logger
+    return _queue_listener
+
+
+def stop_logging():
+    """Detach the queue handler and flush pending records through the listener."""
+    global _queue_listener, _queue_handler
+    
+    if _queue_listener is None:
+        return
+    
+    logging.getLogger().removeHandler(_queue_handler)
+    _queue_listener.stop()
+    _queue_listener = None
+    _queue_handler = None
+
 
+atexit.register(stop_logging)
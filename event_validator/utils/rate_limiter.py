@@ -3,20 +3,39 @@ Smart rate limiter using token bucket algorithm for API rate limit management.
 Tracks requests per minute and automatically adjusts delays to maximize throughput.
 Includes jitter to prevent burst synchronization.
 """
+import asyncio
+import bisect
+import os
 import time
 import threading
 import random
-from collections import deque
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Token estimation heuristic: ~4 characters per text token, flat cost per image
+CHARS_PER_TOKEN = 4
+IMAGE_TOKEN_ESTIMATE = 1000
+
+# Seconds of request history kept for get_current_rate (one counter per second)
+_RATE_WINDOW_SECONDS = 60
+
+# Delay multiplier tiers by estimated request size: <=1000 -> 1.0, <=2000 -> 1.1, >2000 -> 1.2
+_TOK_BOUNDARIES = (1000, 2000)
+_TOK_MULTS = (1.0, 1.1, 1.2)
+
 
 class TokenBucketRateLimiter:
     """
-    Token bucket rate limiter that tracks requests in a rolling window.
-    Automatically calculates delay needed to stay under rate limit.
+    Token bucket rate limiter: tokens refill continuously at RPM/60 per second
+    up to burst_size, and each request consumes one. Automatically calculates
+    delay needed to stay under rate limit.
+    
+    An optional second bucket enforces a tokens-per-minute (TPM) budget using
+    each request's estimated token count, and penalize() lets a server-provided
+    retry delay hold back every caller, not just the one that got the 429.
     
     For Gemini:
     - Free tier: ~15 RPM (requests per minute)
@@ -30,142 +49,264 @@ class TokenBucketRateLimiter:
         safety_factor: float = 0.9,  # Use 90% of limit to be safe
         jitter_enabled: bool = True,  # Enable jitter to prevent synchronization
         jitter_min: float = 0.9,  # Minimum spacing multiplier
-        jitter_max: float = 1.6  # Maximum spacing multiplier
+        jitter_max: float = 1.6,  # Maximum spacing multiplier
+        tokens_per_minute: int = 0  # 0 disables the TPM budget
     ):
         """
         Initialize rate limiter.
         
         Args:
             requests_per_minute: Maximum requests allowed per minute
-            burst_size: Maximum burst requests (defaults to requests_per_minute)
+            burst_size: Maximum burst requests (defaults to 1, i.e. strict 60/RPM spacing)
             safety_factor: Fraction of limit to use (0.9 = 90% of limit)
             jitter_enabled: Enable random jitter to prevent thread synchronization
             jitter_min: Minimum spacing multiplier (0.9 = 90% of calculated delay)
             jitter_max: Maximum spacing multiplier (1.6 = 160% of calculated delay)
+            tokens_per_minute: Model TPM limit (safety factor applied); 0 disables it
         """
         # For high-throughput mode, use minimal safety factor (0.95 = 95%)
         # This allows maximum utilization while staying safe
         effective_safety = min(safety_factor, 0.95)  # Cap at 95% to prevent going over limit
         self.requests_per_minute = int(requests_per_minute * effective_safety)  # Apply safety factor
-        self.burst_size = burst_size or self.requests_per_minute
+        # Default burst of 1 keeps requests evenly spaced; a larger bucket would let
+        # a burst plus a full minute of refill land inside one 60s provider window
+        self.burst_size = burst_size or 1
         self.safety_factor = safety_factor
         self.jitter_enabled = jitter_enabled
         self.jitter_min = jitter_min
         self.jitter_max = jitter_max
+        self._jitter_span = jitter_max - jitter_min
+        self._rand = random.random
         
-        # Track request timestamps in a rolling window (last 60 seconds)
-        self._request_times: deque = deque(maxlen=self.requests_per_minute * 2)
+        # Token bucket state (tokens go negative while slots are reserved ahead)
+        self._rate = self.requests_per_minute / 60.0  # Tokens per second
+        self._tokens: float = float(self.burst_size)
+        self._last_refill: float = time.monotonic()
         self._lock = threading.Lock()
         
-        # Track last request time for minimum spacing
-        self._last_request_time: float = 0.0
+        # TPM bucket: holds up to one minute of tokens and refills continuously
+        self.tokens_per_minute = int(tokens_per_minute * effective_safety)
+        self._tpm_rate = self.tokens_per_minute / 60.0
+        self._tpm_tokens: float = float(self.tokens_per_minute)
+        
+        # Requests per second over the last minute, for reporting only: slot
+        # second % 60 holds the count for that second (stale slots are skipped)
+        self._window_secs = [-1] * _RATE_WINDOW_SECONDS
+        self._window_counts = [0] * _RATE_WINDOW_SECONDS
         
         jitter_str = f"jitter: {jitter_min}-{jitter_max}x" if jitter_enabled else "no jitter"
         logger.info(
             f"Rate limiter initialized: {self.requests_per_minute} RPM "
             f"(safety: {safety_factor*100:.0f}%), burst: {self.burst_size}, {jitter_str}"
+            + (f", {self.tokens_per_minute} TPM" if self.tokens_per_minute else "")
+        )
+    
+    def _refill(self, now: float):
+        """Add tokens for the time elapsed since the last refill, capped at burst_size."""
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.burst_size, self._tokens + elapsed * self._rate)
+            if self._tpm_rate:
+                self._tpm_tokens = min(self.tokens_per_minute, self._tpm_tokens + elapsed * self._tpm_rate)
+            self._last_refill = now
+    
+    def _record_request(self, now: float):
+        """Count a request in the per-second window (call with lock held)."""
+        second = int(now)
+        slot = second % _RATE_WINDOW_SECONDS
+        if self._window_secs[slot] != second:
+            self._window_secs[slot] = second
+            self._window_counts[slot] = 0
+        self._window_counts[slot] += 1
+    
+    def _recent_requests(self, now: float) -> int:
+        """Requests reserved in the last _RATE_WINDOW_SECONDS seconds (call with lock held)."""
+        oldest = int(now) - _RATE_WINDOW_SECONDS
+        return sum(
+            count for second, count in zip(self._window_secs, self._window_counts)
+            if second > oldest
         )
     
+    def _reserve_tpm(self, estimated_tokens: Optional[int]) -> float:
+        """Consume estimated tokens from the TPM bucket; returns the wait until they are covered (call with lock held)."""
+        if not self._tpm_rate or not estimated_tokens:
+            return 0.0
+        # A single request larger than the whole budget waits for a full bucket
+        needed = min(estimated_tokens, self.tokens_per_minute)
+        delay = max(0.0, (needed - self._tpm_tokens) / self._tpm_rate)
+        self._tpm_tokens -= needed
+        return delay
+    
     def estimate_tokens(self, prompt: str, has_image: bool = False) -> int:
         """
         Rough token estimation (1 token ≈ 4 characters for text, images count as ~1000 tokens).
         This is a simple heuristic - actual tokenization may vary.
         """
-        text_tokens = len(prompt) // 4
-        image_tokens = 1000 if has_image else 0
+        text_tokens = len(prompt) // CHARS_PER_TOKEN
+        image_tokens = IMAGE_TOKEN_ESTIMATE if has_image else 0
         return text_tokens + image_tokens
     
-    def acquire(self, wait: bool = True, estimated_tokens: Optional[int] = None) -> float:
+    def estimate_tokens_batch(
+        self,
+        prompts: Sequence[str],
+        has_image_mask: Optional[Sequence[bool]] = None
+    ) -> List[int]:
         """
-        Acquire permission to make a request. Returns delay needed in seconds.
+        Estimate tokens for many prompts at once (same heuristic as estimate_tokens).
         
         Args:
-            wait: If True, wait for the calculated delay. If False, return delay but don't wait.
-            estimated_tokens: Optional token count for token-aware rate limiting.
-                           If provided, larger requests get slightly longer delays.
+            prompts: Prompt texts
+            has_image_mask: Optional per-prompt flags for attached images
         
         Returns:
-            Delay that was applied (or would be applied) in seconds
+            Estimated token count per prompt, in order. Use itertools.accumulate
+            on the result for a running token budget.
+        """
+        text_tokens = [length // CHARS_PER_TOKEN for length in map(len, prompts)]
+        if has_image_mask is None:
+            return text_tokens
+        return [
+            tokens + IMAGE_TOKEN_ESTIMATE if has_image else tokens
+            for tokens, has_image in zip(text_tokens, has_image_mask)
+        ]
+    
+    def _reserve(self, estimated_tokens: Optional[int] = None) -> float:
+        """
+        Compute the delay for the next request and reserve its slot.
+        
+        The token is consumed while the lock is held even if it has not
+        refilled yet (the bucket goes into debt), so concurrent callers
+        immediately queue their slots behind it. The caller does the actual
+        waiting with the lock released.
+        
+        Returns:
+            Delay the caller must wait before sending the request, in seconds
         """
         with self._lock:
-            now = time.time()
+            now = time.monotonic()
+            self._refill(now)
+            self._record_request(now)
             
-            # Remove requests older than 60 seconds
-            cutoff_time = now - 60.0
-            while self._request_times and self._request_times[0] < cutoff_time:
-                self._request_times.popleft()
+            tpm_delay = self._reserve_tpm(estimated_tokens)
             
-            # Calculate delay needed
-            delay = 0.0
+            # Token available: consume it and go immediately (unless the TPM budget is short)
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                if tpm_delay > 0:
+                    logger.debug(f"TPM budget short, waiting {tpm_delay:.2f}s (tokens: {estimated_tokens})")
+                return tpm_delay
             
             # Token-aware adjustment: larger requests get slightly longer delays
-            token_multiplier = 1.0
-            if estimated_tokens:
-                # For requests > 2000 tokens, add small delay multiplier
-                if estimated_tokens > 2000:
-                    token_multiplier = 1.2  # 20% longer delay for large requests
-                elif estimated_tokens > 1000:
-                    token_multiplier = 1.1  # 10% longer delay for medium requests
-                # Small requests (< 1000 tokens) get no multiplier (token_multiplier = 1.0)
+            token_multiplier = _TOK_MULTS[bisect.bisect_left(_TOK_BOUNDARIES, estimated_tokens)] if estimated_tokens else 1.0
+            
+            # Wait until our token has refilled (includes slots reserved by earlier callers)
+            queue_delay = (1.0 - self._tokens) / self._rate
             
-            # Check if we're at the limit
-            if len(self._request_times) >= self.requests_per_minute:
-                # Calculate how long to wait until oldest request expires
-                oldest_request = self._request_times[0]
-                time_until_oldest_expires = (oldest_request + 60.0) - now
-                delay = max(0.0, time_until_oldest_expires + 0.1) * token_multiplier  # Apply token multiplier
-                logger.debug(f"Rate limit reached ({len(self._request_times)}/{self.requests_per_minute}), waiting {delay:.2f}s (tokens: {estimated_tokens or 'unknown'})")
-            else:
-                # Not at limit, but ensure minimum spacing for burst protection
-                # Calculate minimum time between requests
-                min_interval = 60.0 / self.requests_per_minute
-                time_since_last = now - self._last_request_time
-                
-                if time_since_last < min_interval:
-                    delay = (min_interval - time_since_last) * token_multiplier
-                    # REMOVED 1-second cap - we need full spacing for Gemini
-                    # delay = min(delay, 1.0)  # REMOVED: This was preventing proper spacing
-                else:
-                    # No delay needed
-                    delay = 0.0
+            # Jitter/token multiplier only stretch the final spacing interval, so
+            # they never scale the time spent queued behind other callers
+            min_interval = 1.0 / self._rate
+            spacing = min(queue_delay, min_interval)
+            queued = queue_delay - spacing
+            spacing *= token_multiplier
             
             # Apply jitter to prevent thread synchronization
-            if self.jitter_enabled and delay > 0:
-                jitter_multiplier = random.uniform(self.jitter_min, self.jitter_max)
-                delay = delay * jitter_multiplier
-                logger.debug(f"Applied jitter: {jitter_multiplier:.2f}x → delay: {delay:.2f}s")
+            if self.jitter_enabled:
+                jitter_multiplier = self.jitter_min + self._jitter_span * self._rand()
+                spacing *= jitter_multiplier
+                logger.debug(f"Applied jitter: {jitter_multiplier:.2f}x → spacing: {spacing:.2f}s")
             
-            # Wait if requested
-            if wait and delay > 0:
-                time.sleep(delay)
+            delay = max(queued + spacing, tpm_delay)
+            logger.debug(f"Rate limit bucket empty ({self._tokens:.2f} tokens), waiting {delay:.2f}s (tokens: {estimated_tokens or 'unknown'})")
             
-            # Record this request
-            request_time = time.time()
-            self._request_times.append(request_time)
-            self._last_request_time = request_time
+            # Reserve: consume the token now, before it has refilled
+            self._tokens -= 1.0
             
             return delay
     
+    def acquire(self, wait: bool = True, estimated_tokens: Optional[int] = None) -> float:
+        """
+        Acquire permission to make a request. Returns delay needed in seconds.
+        
+        The wait happens outside the lock, so callers sleep in parallel on their
+        own reserved slots instead of queuing behind each other.
+        
+        Args:
+            wait: If True, wait for the calculated delay. If False, return delay but don't wait.
+            estimated_tokens: Optional token count for token-aware rate limiting.
+                           If provided, larger requests get slightly longer delays.
+        
+        Returns:
+            Delay that was applied (or would be applied) in seconds
+        """
+        delay = self._reserve(estimated_tokens)
+        
+        # Wait if requested (lock already released)
+        if wait and delay > 0:
+            time.sleep(delay)
+        
+        return delay
+    
+    async def acquire_async(self, estimated_tokens: Optional[int] = None) -> float:
+        """
+        Async variant of acquire() for event-loop callers.
+        
+        Reserves a slot the same way, then yields to the event loop with
+        asyncio.sleep instead of blocking the thread. If the task is cancelled
+        while waiting, the reserved token is handed back so later callers do
+        not wait for a request that was never sent.
+        
+        Returns:
+            Delay that was applied in seconds
+        """
+        delay = self._reserve(estimated_tokens)
+        
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self._release_reservation(estimated_tokens)
+                raise
+        
+        return delay
+    
+    def _release_reservation(self, estimated_tokens: Optional[int] = None):
+        """Return a reserved-but-unused token (and its TPM tokens) to the buckets."""
+        with self._lock:
+            self._tokens = min(self.burst_size, self._tokens + 1.0)
+            if self._tpm_rate and estimated_tokens:
+                self._tpm_tokens = min(self.tokens_per_minute, self._tpm_tokens + min(estimated_tokens, self.tokens_per_minute))
+    
+    def penalize(self, retry_delay: float):
+        """
+        Hold back all new requests for retry_delay seconds.
+        
+        Call this when the server rejects a request with an explicit retry
+        delay: the quota is exhausted for everyone, so the next slot is pushed
+        out instead of letting other callers discover the 429 themselves.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 1.0 - retry_delay * self._rate)
+            logger.debug(f"Rate limiter penalized: next request in >= {retry_delay:.1f}s")
+    
     def get_current_rate(self) -> float:
-        """Get current requests per minute based on recent requests."""
+        """Get current requests per minute (requests made in the last 60 seconds)."""
         with self._lock:
-            now = time.time()
-            cutoff_time = now - 60.0
-            
-            # Count requests in last 60 seconds
-            recent_requests = sum(1 for t in self._request_times if t >= cutoff_time)
-            return recent_requests
+            return float(self._recent_requests(time.monotonic()))
     
     def get_available_quota(self) -> int:
-        """Get number of requests available in current window."""
+        """Get number of requests still available in the current 60-second window."""
         with self._lock:
-            return max(0, self.requests_per_minute - len(self._request_times))
+            return max(0, self.requests_per_minute - self._recent_requests(time.monotonic()))
     
     def reset(self):
-        """Reset the rate limiter (clear request history)."""
+        """Reset the rate limiter (refill the bucket, dropping reserved slots)."""
         with self._lock:
-            self._request_times.clear()
-            self._last_request_time = 0.0
+            self._tokens = float(self.burst_size)
+            self._tpm_tokens = float(self.tokens_per_minute)
+            self._last_refill = time.monotonic()
+            self._window_secs = [-1] * _RATE_WINDOW_SECONDS
+            self._window_counts = [0] * _RATE_WINDOW_SECONDS
             logger.info("Rate limiter reset")
 
 
@@ -175,28 +316,68 @@ _global_groq_rate_limiter: Optional[TokenBucketRateLimiter] = None
 _rate_limiter_lock = threading.Lock()
 
 
+# (requests_per_minute, safety_factor, jitter_enabled, jitter_min, jitter_max, tokens_per_minute)
+RateLimiterConfig = Tuple[int, float, bool, float, float, int]
+
+
+@lru_cache(maxsize=1)
+def _load_gemini_config() -> RateLimiterConfig:
+    """Parse Gemini rate limiter settings from the environment (once)."""
+    # Default to 145 RPM (97% of Gemini's 150 RPM limit)
+    # Gemini-2.5-pro limits: 150 RPM, 2M TPM, 10K RPD
+    # Using 145 RPM for maximum throughput while staying safe
+    return (
+        int(os.getenv('GEMINI_RPM_LIMIT', '148')),
+        float(os.getenv('RATE_LIMIT_SAFETY_FACTOR', '0.98')),
+        os.getenv('GEMINI_JITTER_ENABLED', 'true').lower() == 'true',
+        float(os.getenv('GEMINI_JITTER_MIN', '0.9')),
+        float(os.getenv('GEMINI_JITTER_MAX', '1.6')),
+        int(os.getenv('GEMINI_TPM_LIMIT', '2000000')),
+    )
+
+
+@lru_cache(maxsize=1)
+def _load_groq_config() -> RateLimiterConfig:
+    """Parse Groq rate limiter settings from the environment (once)."""
+    # Default to 25 RPM for Groq free tier (very conservative to avoid hitting 30 RPM limit)
+    # Groq free tier has 30 RPM limit, so we use 25 to leave buffer
+    # Groq paid tiers can be higher (60+ RPM)
+    # Allow override via GROQ_RPM_LIMIT environment variable
+    return (
+        int(os.getenv('GROQ_RPM_LIMIT', '25')),
+        float(os.getenv('GROQ_RATE_LIMIT_SAFETY_FACTOR', '0.8')),  # Very conservative (80% of 25 = 20 RPM)
+        os.getenv('GROQ_JITTER_ENABLED', 'true').lower() == 'true',
+        float(os.getenv('GROQ_JITTER_MIN', '0.9')),
+        float(os.getenv('GROQ_JITTER_MAX', '1.6')),
+        int(os.getenv('GROQ_TPM_LIMIT', '0')),  # Model-dependent; disabled unless set
+    )
+
+
+def _create_rate_limiter(config: RateLimiterConfig) -> TokenBucketRateLimiter:
+    """Build a limiter from a parsed config tuple."""
+    requests_per_minute, safety_factor, jitter_enabled, jitter_min, jitter_max, tokens_per_minute = config
+    return TokenBucketRateLimiter(
+        requests_per_minute=requests_per_minute,
+        safety_factor=safety_factor,
+        jitter_enabled=jitter_enabled,
+        jitter_min=jitter_min,
+        jitter_max=jitter_max,
+        tokens_per_minute=tokens_per_minute
+    )
+
+
 def get_rate_limiter() -> TokenBucketRateLimiter:
     """Get or create global Gemini rate limiter instance."""
     global _global_rate_limiter
     
+    # Fast path: already created, no lock needed
+    if _global_rate_limiter is not None:
+        return _global_rate_limiter
+    
+    config = _load_gemini_config()
     with _rate_limiter_lock:
         if _global_rate_limiter is None:
-            import os
-            # Default to 145 RPM (97% of Gemini's 150 RPM limit)
-            # Gemini-2.5-pro limits: 150 RPM, 2M TPM, 10K RPD
-            # Using 145 RPM for maximum throughput while staying safe
-            requests_per_minute = int(os.getenv('GEMINI_RPM_LIMIT', '148'))
-            safety_factor = float(os.getenv('RATE_LIMIT_SAFETY_FACTOR', '0.98'))
-            jitter_enabled = os.getenv('GEMINI_JITTER_ENABLED', 'true').lower() == 'true'
-            jitter_min = float(os.getenv('GEMINI_JITTER_MIN', '0.9'))
-            jitter_max = float(os.getenv('GEMINI_JITTER_MAX', '1.6'))
-            _global_rate_limiter = TokenBucketRateLimiter(
-                requests_per_minute=requests_per_minute,
-                safety_factor=safety_factor,
-                jitter_enabled=jitter_enabled,
-                jitter_min=jitter_min,
-                jitter_max=jitter_max
-            )
+            _global_rate_limiter = _create_rate_limiter(config)
         
         return _global_rate_limiter
 
@@ -205,25 +386,15 @@ def get_groq_rate_limiter() -> TokenBucketRateLimiter:
     """Get or create global Groq rate limiter instance."""
     global _global_groq_rate_limiter
     
+    # Fast path: already created, no lock needed
+    if _global_groq_rate_limiter is not None:
+        return _global_groq_rate_limiter
+    
+    config = _load_groq_config()
     with _rate_limiter_lock:
         if _global_groq_rate_limiter is None:
-            import os
-            # Default to 25 RPM for Groq free tier (very conservative to avoid hitting 30 RPM limit)
-            # Groq free tier has 30 RPM limit, so we use 25 to leave buffer
-            # Groq paid tiers can be higher (60+ RPM)
-            # Allow override via GROQ_RPM_LIMIT environment variable
-            requests_per_minute = int(os.getenv('GROQ_RPM_LIMIT', '25'))
-            safety_factor = float(os.getenv('GROQ_RATE_LIMIT_SAFETY_FACTOR', '0.8'))  # Very conservative (80% of 25 = 20 RPM)
-            jitter_enabled = os.getenv('GROQ_JITTER_ENABLED', 'true').lower() == 'true'
-            jitter_min = float(os.getenv('GROQ_JITTER_MIN', '0.9'))
-            jitter_max = float(os.getenv('GROQ_JITTER_MAX', '1.6'))
-            _global_groq_rate_limiter = TokenBucketRateLimiter(
-                requests_per_minute=requests_per_minute,
-                safety_factor=safety_factor,
-                jitter_enabled=jitter_enabled,
-                jitter_min=jitter_min,
-                jitter_max=jitter_max
-            )
+            _global_groq_rate_limiter = _create_rate_limiter(config)
+            requests_per_minute, safety_factor = config[0], config[1]
             logger.info(f"Groq rate limiter: {_global_groq_rate_limiter.requests_per_minute} RPM (effective: {int(requests_per_minute * safety_factor)} RPM)")
         
         return _global_groq_rate_limiter
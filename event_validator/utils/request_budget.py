@@ -3,14 +3,22 @@ Request budget tracker to limit API calls per submission.
 Prevents regression to excessive API usage.
 """
 import logging
+import os
+import sys
 import threading
-from typing import Optional, Dict
+import time
+from collections import OrderedDict, deque
+from typing import Optional, Dict, List, Tuple
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
 
+# Budgets live for the whole run, so drop the per-instance __dict__ where
+# dataclasses support it (Python 3.10+)
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_DATACLASS_SLOTS)
 class RequestBudget:
     """
     Tracks API calls made for a single submission.
@@ -19,7 +27,11 @@ class RequestBudget:
     submission_id: str
     max_calls: int = 5  # Default: 5 calls per submission
     calls_used: int = 0
-    call_history: list = field(default_factory=list)
+    call_history: deque = field(default_factory=deque)
+    
+    def __post_init__(self):
+        # Calls stop at max_calls, so history never needs more slots than that
+        self.call_history = deque(self.call_history, maxlen=self.max_calls)
     
     def can_make_call(self, call_type: str = "unknown") -> bool:
         """
@@ -72,13 +84,38 @@ class RequestBudget:
             "calls_used": self.calls_used,
             "max_calls": self.max_calls,
             "remaining": self.get_remaining_calls(),
-            "call_history": self.call_history
+            "call_history": list(self.call_history)
         }
 
 
-# Global budget tracker (thread-safe)
-_budget_tracker: Dict[str, RequestBudget] = {}
-_budget_lock = threading.Lock()
+# Global budget tracker (thread-safe), bounded so a long-running service doesn't
+# keep a budget for every submission it has ever seen. Entries are kept in
+# least-recently-used order: submission_id -> (last access, budget).
+# Submissions are spread over independently locked shards so concurrent
+# lookups for different submissions rarely wait on each other.
+BUDGET_TRACKER_MAX = int(os.getenv('BUDGET_TRACKER_MAX', '10000'))
+BUDGET_TRACKER_TTL = float(os.getenv('BUDGET_TRACKER_TTL', '3600'))  # seconds since last access
+BUDGET_TRACKER_SHARDS = 32  # power of two (shard index is a bit mask)
+
+_SHARD_MASK = BUDGET_TRACKER_SHARDS - 1
+_shard_max = max(1, -(-BUDGET_TRACKER_MAX // BUDGET_TRACKER_SHARDS))
+_budget_shards: List[Tuple[threading.Lock, "OrderedDict[str, Tuple[float, RequestBudget]]"]] = [
+    (threading.Lock(), OrderedDict()) for _ in range(BUDGET_TRACKER_SHARDS)
+]
+
+
+def _get_shard(submission_id: str) -> Tuple[threading.Lock, "OrderedDict[str, Tuple[float, RequestBudget]]"]:
+    """Lock and budget map responsible for a submission."""
+    return _budget_shards[hash(submission_id) & _SHARD_MASK]
+
+
+def _evict_budgets(shard: "OrderedDict[str, Tuple[float, RequestBudget]]", now: float):
+    """Drop expired and over-capacity budgets from a shard (call with its lock held)."""
+    while shard:
+        last_used, _ = next(iter(shard.values()))
+        if now - last_used < BUDGET_TRACKER_TTL and len(shard) <= _shard_max:
+            break
+        shard.popitem(last=False)
 
 
 def get_budget(submission_id: str, max_calls: Optional[int] = None) -> RequestBudget:
@@ -92,19 +129,25 @@ def get_budget(submission_id: str, max_calls: Optional[int] = None) -> RequestBu
     Returns:
         RequestBudget instance
     """
-    import os
-    
     if max_calls is None:
         max_calls = int(os.getenv('MAX_API_CALLS_PER_SUBMISSION', '5'))
     
-    with _budget_lock:
-        if submission_id not in _budget_tracker:
-            _budget_tracker[submission_id] = RequestBudget(
+    now = time.monotonic()
+    lock, shard = _get_shard(submission_id)
+    with lock:
+        entry = shard.get(submission_id)
+        if entry is None or now - entry[0] >= BUDGET_TRACKER_TTL:
+            budget = RequestBudget(
                 submission_id=submission_id,
                 max_calls=max_calls
             )
+        else:
+            budget = entry[1]
         
-        return _budget_tracker[submission_id]
+        shard[submission_id] = (now, budget)
+        shard.move_to_end(submission_id)
+        _evict_budgets(shard, now)
+        return budget
 
 
 def reset_budget(submission_id: Optional[str] = None):
@@ -114,17 +157,25 @@ def reset_budget(submission_id: Optional[str] = None):
     Args:
         submission_id: If provided, reset only this submission. Otherwise reset all.
     """
-    with _budget_lock:
-        if submission_id:
-            if submission_id in _budget_tracker:
-                del _budget_tracker[submission_id]
+    if submission_id:
+        lock, shard = _get_shard(submission_id)
+        with lock:
+            if submission_id in shard:
+                del shard[submission_id]
                 logger.debug(f"Reset budget for submission {submission_id}")
-        else:
-            _budget_tracker.clear()
-            logger.debug("Reset all budgets")
+    else:
+        for lock, shard in _budget_shards:
+            with lock:
+                shard.clear()
+        logger.debug("Reset all budgets")
 
 
 def get_all_budgets() -> Dict[str, RequestBudget]:
     """Get all active budgets (for monitoring)."""
-    with _budget_lock:
-        return _budget_tracker.copy()
+    now = time.monotonic()
+    budgets = {}
+    for lock, shard in _budget_shards:
+        with lock:
+            _evict_budgets(shard, now)
+            budgets.update((submission_id, budget) for submission_id, (_, budget) in shard.items())
+    return budgets
@@ -0,0 +1,249 @@
+"""
+Persistent cache for LLM API responses, shared by the Gemini and Groq clients.
+Keeps identical prompts from re-hitting the paid API across runs.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Directory for the on-disk cache; set GEMINI_CACHE_DIR="" to keep responses in memory only
+RESPONSE_CACHE_DIR = os.getenv('GEMINI_CACHE_DIR', str(Path.home() / '.cache' / 'mic'))
+RESPONSE_CACHE_TTL = int(os.getenv('GEMINI_CACHE_TTL', str(7 * 86400)))  # seconds
+# Max responses kept in memory (least recently used are evicted; disk is unbounded)
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('GEMINI_CACHE_MAX_ENTRIES', '10000'))
+RESPONSE_CACHE_FILE = 'llm_responses.sqlite'
+# Delete expired rows from disk every this many writes (and once on open)
+RESPONSE_CACHE_PRUNE_INTERVAL = 500
+
+
+def content_digest(data) -> str:
+    """128-bit BLAKE2b hex digest of bytes-like data, used for cache keys."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory LRU whose entries expire after ttl seconds.
+    
+    Holds at most max_entries items; the least recently used are evicted first.
+    """
+    
+    def __init__(self, max_entries: int, ttl: float):
+        """
+        Args:
+            max_entries: Max items kept
+            ttl: Default lifetime of an item in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._items: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get an unexpired item (marking it recently used), or default."""
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.time():
+                del self._items[key]
+                return default
+            self._items.move_to_end(key)
+            return entry[1]
+    
+    def set(self, key: str, value: Any, expires_at: Optional[float] = None):
+        """Store an item, expiring at expires_at (default now + ttl)."""
+        if expires_at is None:
+            expires_at = time.time() + self.ttl
+        with self._lock:
+            self._items[key] = (expires_at, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+    
+    def clear(self):
+        """Drop all items."""
+        with self._lock:
+            self._items.clear()
+
+
+class ResponseCache:
+    """
+    Response text keyed by content hash: a bounded in-memory LRU in front of
+    an SQLite table.
+    
+    Entries expire after ttl seconds in both layers. If the database can't be
+    opened the cache silently works in memory only.
+    """
+    
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttl: int = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES
+    ):
+        """
+        Args:
+            path: SQLite file (None for memory only)
+            ttl: Lifetime of entries in seconds
+            max_entries: Max responses kept in memory
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memory = TTLCache(max_entries, ttl)
+        self._lock = threading.Lock()  # guards the SQLite connection
+        self._conn: Optional[sqlite3.Connection] = None
+        self._path = path
+        self._writes_since_prune = 0
+        # Lookup counters for get_stats
+        self._hits = {"memory": 0, "disk": 0}
+        self._misses = 0
+        self._stats_lock = threading.Lock()
+        
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # One connection shared by all threads; access is serialized by _lock
+                conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "created_at REAL NOT NULL DEFAULT 0, expires_at REAL NOT NULL)"
+                )
+                # Tables written by older versions have no created_at column
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(responses)")}
+                if 'created_at' not in columns:
+                    conn.execute("ALTER TABLE responses ADD COLUMN created_at REAL NOT NULL DEFAULT 0")
+                self._conn = conn
+                self._prune()
+                logger.debug(f"Response cache: {path}")
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Response cache disabled, could not open {path}: {e}")
+    
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None."""
+        value = self._memory.get(key)
+        if value is not None or self._conn is None:
+            self._record_lookup("memory" if value is not None else None)
+            return value
+        
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+                    (key, time.time())
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.debug(f"Response cache read failed: {e}")
+                row = None
+        
+        self._record_lookup("disk" if row is not None else None)
+        if row is None:
+            return None
+        self._memory.set(key, row[0], row[1])
+        return row[0]
+    
+    def _record_lookup(self, layer: Optional[str]):
+        """Count a hit in layer ("memory"/"disk"), or a miss for None."""
+        with self._stats_lock:
+            if layer is None:
+                self._misses += 1
+            else:
+                self._hits[layer] += 1
+    
+    def get_stats(self) -> dict:
+        """Get hit/miss counts and sizes for monitoring."""
+        with self._stats_lock:
+            stats = {
+                "memory_hits": self._hits["memory"],
+                "disk_hits": self._hits["disk"],
+                "misses": self._misses,
+            }
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (lookups - stats["misses"]) / lookups if lookups else 0.0
+        stats["memory_entries"] = len(self._memory)
+        stats["disk_bytes"] = None
+        if self._conn is not None:
+            try:
+                stats["disk_bytes"] = self._path.stat().st_size
+            except OSError:
+                pass
+        return stats
+    
+    def set(self, key: str, value: str):
+        """Cache a response in memory and on disk."""
+        now = time.time()
+        expires_at = now + self.ttl
+        self._memory.set(key, value, expires_at)
+        if self._conn is None:
+            return
+        
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now, expires_at)
+                )
+            except sqlite3.Error as e:
+                logger.debug(f"Response cache write failed: {e}")
+                return
+            self._writes_since_prune += 1
+            prune = self._writes_since_prune >= RESPONSE_CACHE_PRUNE_INTERVAL
+        
+        if prune:
+            self._prune()
+    
+    def _prune(self):
+        """Delete expired rows from disk."""
+        with self._lock:
+            self._writes_since_prune = 0
+            try:
+                deleted = self._conn.execute(
+                    "DELETE FROM responses WHERE expires_at <= ?", (time.time(),)
+                ).rowcount
+            except sqlite3.Error as e:
+                logger.debug(f"Response cache prune failed: {e}")
+                return
+        if deleted:
+            logger.debug(f"Response cache: pruned {deleted} expired entries")
+    
+    def clear(self):
+        """Drop all cached responses (memory and disk)."""
+        self._memory.clear()
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.execute("DELETE FROM responses")
+                except sqlite3.Error as e:
+                    logger.debug(f"Response cache clear failed: {e}")
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the shared response cache."""
+    global _response_cache
+    
+    if _response_cache is not None:
+        return _response_cache
+    
+    with _response_cache_lock:
+        if _response_cache is None:
+            path = Path(RESPONSE_CACHE_DIR).expanduser() / RESPONSE_CACHE_FILE if RESPONSE_CACHE_DIR else None
+            _response_cache = ResponseCache(path)
+        return _response_cache
@@ -0,0 +1,111 @@
+"""
+Parsers for `KEY: value` LLM answers, shared by the Gemini and Groq clients.
+Each parser makes one regex pass over the response.
+"""
+import re
+from typing import Any, Dict
+
+# First integer in a free-text count ("30", "**30** (approx.)", "about 30")
+_COUNT_RE = re.compile(r'\d+')
+
+
+def key_line_re(*keys: str) -> "re.Pattern":
+    """
+    Regex for `KEY: value` response lines. The key may follow markdown bullets/bold
+    and a list number ("1. KEY: YES", "- **KEY:** YES").
+    """
+    return re.compile(
+        r'^[^\w\n]*(?:\d+[.)][^\w\n]*)?(' + '|'.join(keys) + r')[*_`]*[^\S\n]*:[*_`]*[^\S\n]*(.*)$',
+        re.MULTILINE | re.IGNORECASE
+    )
+
+
+# Response line parsers, compiled once at import: YES/NO key -> result field,
+# plus a regex matching those keys and any free-text keys
+PDF_CONSISTENCY_FLAGS = {
+    "TITLE_MATCH": "title_match",
+    "OBJECTIVES_MATCH": "objectives_match",
+    "LEARNING_MATCH": "learning_match",
+    "PARTICIPANTS_VALID": "participants_valid",
+}
+_PDF_CONSISTENCY_RE = key_line_re(*PDF_CONSISTENCY_FLAGS)
+
+PDF_VALIDATION_FLAGS = {
+    "TITLE_MATCH": "title_match",
+    "EXPERT_DETAILS": "expert_details_present",
+    "LEARNING_OUTCOMES_ALIGN": "learning_outcomes_align",
+    "OBJECTIVES_MATCH": "objectives_match",
+    "PARTICIPANTS_VALID": "participants_valid",
+}
+_PDF_VALIDATION_RE = key_line_re(*PDF_VALIDATION_FLAGS, "REASONING")
+
+IMAGE_ANALYSIS_FLAGS = {
+    "HAS_BANNER": "has_banner",
+    "BANNER_TEXT_MATCHES": "banner_text_matches",
+    "IS_REAL_EVENT": "is_real_event",
+    "MODE_MATCHES": "mode_matches",
+    "HAS_15_PLUS_PARTICIPANTS": "has_15_plus_participants",
+}
+_IMAGE_ANALYSIS_RE = key_line_re(*IMAGE_ANALYSIS_FLAGS, "PARTICIPANT_COUNT", "REASONING")
+
+PDF_VISION_FLAGS = {
+    "TITLE_MATCH": "title_match",
+    "OBJECTIVES_MATCH": "objectives_match",
+    "LEARNING_MATCH": "learning_match",
+    "EXPERT_DETAILS": "expert_details_present",
+    "PARTICIPANTS_VALID": "participants_valid",
+    "THEME_ALIGNMENT": "theme_alignment",
+}
+_PDF_VISION_RE = key_line_re(*PDF_VISION_FLAGS, "REASONING")
+
+
+def parse_key_lines(
+    response: str,
+    pattern: "re.Pattern",
+    flags: Dict[str, str],
+    results: Dict[str, Any]
+) -> Dict[str, str]:
+    """
+    Set results[flags[KEY]] from each `KEY: YES/NO` line matched by pattern.
+    
+    Returns all matched keys mapped to their stripped values (last occurrence
+    wins), for keys the caller parses itself.
+    """
+    fields = {m.group(1).upper(): m.group(2).strip() for m in pattern.finditer(response)}
+    for key, name in flags.items():
+        if key in fields:
+            results[name] = "YES" in fields[key].upper()
+    return fields
+
+
+def parse_pdf_consistency(response: str, results: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill a PDF consistency result dict from the response; returns results."""
+    parse_key_lines(response, _PDF_CONSISTENCY_RE, PDF_CONSISTENCY_FLAGS, results)
+    return results
+
+
+def parse_pdf_validation(response: str, results: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill a comprehensive PDF validation result dict (flags and reasoning); returns results."""
+    fields = parse_key_lines(response, _PDF_VALIDATION_RE, PDF_VALIDATION_FLAGS, results)
+    if "REASONING" in fields:
+        results["reasoning"] = fields["REASONING"]
+    return results
+
+
+def parse_image_analysis(response: str, results: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill an image analysis result dict (flags, participant count, reasoning); returns results."""
+    fields = parse_key_lines(response, _IMAGE_ANALYSIS_RE, IMAGE_ANALYSIS_FLAGS, results)
+    count = _COUNT_RE.search(fields.get("PARTICIPANT_COUNT", ""))
+    if count:
+        results["participant_count_estimate"] = int(count.group())
+    if "REASONING" in fields:
+        results["detailed_reasoning"] = fields["REASONING"]
+    return results
+
+
+def parse_pdf_vision(response: str, results: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill a PDF vision analysis result dict (flags and reasoning); returns results."""
+    fields = parse_key_lines(response, _PDF_VISION_RE, PDF_VISION_FLAGS, results)
+    if "REASONING" in fields:
+        results["detailed_reasoning"] = fields["REASONING"]
+    return results
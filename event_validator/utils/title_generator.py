@@ -1,9 +1,38 @@
 """Event-driven title generation and validation logic."""
 import logging
-from typing import Optional, Dict, Any
+import re
+from functools import lru_cache
+from typing import Optional, Dict, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
+# First token after the first "Level" (stopping at any later "Level"), and
+# the stripped text after the first "-"
+_LEVEL_RE = re.compile(r'\s*((?:(?!Level)\S)+)')
+_CATEGORY_RE = re.compile(r'-\s*(.*?)\s*$', re.DOTALL)
+
+
+@lru_cache(maxsize=128)
+def _parse_event_type(event_type: str) -> Tuple[Optional[str], str]:
+    """
+    Split event_type into (level, category), e.g. "Level 1 - Expert Talk" -> ("Level 1", "Expert Talk").
+    
+    Cached: a batch only has a handful of distinct event types.
+    """
+    # Extract level from event_type if present
+    level = None
+    level_pos = event_type.find("Level")
+    if level_pos != -1:
+        match = _LEVEL_RE.match(event_type, level_pos + len("Level"))
+        if match:
+            level = f"Level {match.group(1)}"
+    
+    # Extract event category from event_type
+    match = _CATEGORY_RE.search(event_type)
+    category = match.group(1) if match else event_type
+    
+    return level, category
+
 
 def generate_canonical_title(
     event_type: Optional[str],
@@ -26,16 +55,7 @@ def generate_canonical_title(
     Returns:
         Canonical title string
     """
-    # Extract level from event_type if present
-    level = None
-    event_type_clean = event_type or ""
-    
-    if "Level" in event_type_clean:
-        try:
-            level_part = event_type_clean.split("Level")[1].strip().split()[0]
-            level = f"Level {level_part}"
-        except (IndexError, ValueError):
-            pass
+    level, category = _parse_event_type(event_type or "")
     
     # Build canonical title
     parts = []
@@ -43,12 +63,7 @@ def generate_canonical_title(
     if level:
         parts.append(level)
     
-    # Extract event category from event_type
-    if "-" in event_type_clean:
-        category = event_type_clean.split("-", 1)[1].strip()
-        parts.append(category)
-    else:
-        parts.append(event_type_clean)
+    parts.append(category)
     
     if theme:
         parts.append(f"on {theme}")
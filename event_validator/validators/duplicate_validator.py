@@ -1,30 +1,96 @@
 """Duplicate detection with directory-level scanning."""
 import logging
+import threading
 from typing import List, Dict, Optional, Any
 
+import numpy as np
+
 from event_validator.types import ValidationResult, EventSubmission
 from event_validator.config.rules import SIMILARITY_RULES
 from event_validator.types import ValidationConfig
 from event_validator.utils.blob_directory_scanner import get_directory_scanner
-from event_validator.utils.hashing import hamming_distance
+from event_validator.utils.hashing import phash_to_int
 
 logger = logging.getLogger(__name__)
 
 
-# Global in-memory hash tracker for current batch
-_batch_hash_tracker: Dict[str, Dict[str, Any]] = {}
+if hasattr(np, "bitwise_count"):
+    _popcount_u64 = np.bitwise_count  # NumPy 2.0+: SIMD popcount
+else:
+    def _popcount_u64(values: np.ndarray) -> np.ndarray:
+        return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+class BatchDedupState:
+    """
+    Hashes of the unique images seen so far in one batch.
+    
+    sha_map maps SHA256 -> image info. The pHashes of the same images are kept
+    as a uint64 array in insertion order, with the matching SHA256 per slot,
+    so one vectorized XOR + popcount checks the whole batch. Each batch gets
+    its own instance, so separate batches can be validated concurrently.
+    """
+    __slots__ = ("sha_map", "phash_arr", "phash_shas", "lock")
+    
+    INITIAL_CAPACITY = 1024
+    
+    def __init__(self):
+        self.sha_map: Dict[str, Dict[str, Any]] = {}
+        self.phash_arr = np.empty(self.INITIAL_CAPACITY, dtype=np.uint64)
+        self.phash_shas: List[str] = []
+        self.lock = threading.Lock()
+    
+    def reset(self):
+        """Forget all stored images."""
+        with self.lock:
+            self.sha_map = {}
+            self.phash_arr = np.empty(self.INITIAL_CAPACITY, dtype=np.uint64)
+            self.phash_shas = []
+    
+    def add(self, sha256: str, phash_int: Optional[int], info: Dict[str, Any]):
+        """Store an image, growing the pHash array (doubling) when full."""
+        with self.lock:
+            if phash_int is not None and sha256 not in self.sha_map:
+                count = len(self.phash_shas)
+                if count == len(self.phash_arr):
+                    self.phash_arr = np.concatenate([self.phash_arr, np.empty(count, dtype=np.uint64)])
+                self.phash_arr[count] = phash_int
+                self.phash_shas.append(sha256)
+            self.sha_map[sha256] = info
+    
+    def find_phash_match(self, phash_int: int, threshold: int) -> Optional[tuple]:
+        """
+        Find the earliest-stored image within threshold of phash_int.
+        
+        Images with an identical pHash are ignored, as in the original linear
+        scan. Returns (distance, image info) or None.
+        """
+        with self.lock:
+            count = len(self.phash_shas)
+            if not count:
+                return None
+            distances = _popcount_u64(self.phash_arr[:count] ^ np.uint64(phash_int))
+            hits = np.flatnonzero((distances <= threshold) & (distances != 0))
+            if not hits.size:
+                return None
+            first = hits[0]
+            return int(distances[first]), self.sha_map[self.phash_shas[first]]
+
+
+# Shared state for callers that don't pass their own BatchDedupState
+_default_state = BatchDedupState()
 
 
 def reset_batch_hash_tracker():
-    """Reset the batch hash tracker (call at start of new batch)."""
-    global _batch_hash_tracker
-    _batch_hash_tracker = {}
+    """Reset the shared batch hash tracker (call at start of new batch)."""
+    _default_state.reset()
 
 
 def validate_duplicate_detection(
     submission: EventSubmission,
     config: ValidationConfig,
-    submission_id: Optional[str] = None
+    submission_id: Optional[str] = None,
+    state: Optional[BatchDedupState] = None
 ) -> ValidationResult:
     """
     Check for duplicate images within current batch and directory-level scanning.
@@ -39,8 +105,10 @@ def validate_duplicate_detection(
         submission: Event submission to check
         config: Validation configuration
         submission_id: Unique identifier for this submission (for duplicate messages)
+        state: Batch duplicate state (defaults to the shared module-level state)
     """
-    global _batch_hash_tracker
+    if state is None:
+        state = _default_state
     
     rule_name, points = SIMILARITY_RULES[0]
     
@@ -55,22 +123,27 @@ def validate_duplicate_detection(
             message=""
         )
     
+    original_data = getattr(submission, '_original_row_data', submission.row_data)
+    
     # Generate submission ID if not provided
     if not submission_id:
-        original_data = getattr(submission, '_original_row_data', submission.row_data)
         submission_id = str(original_data.get('id', 'unknown'))
     
     # Get event_driven and academic_year for directory scanning
-    original_data = getattr(submission, '_original_row_data', submission.row_data)
     event_driven = original_data.get('event_driven')
     academic_year = original_data.get('acadmic_year') or original_data.get('financial_year')
     
-    # Initialize directory scanner
-    directory_scanner = get_directory_scanner(phash_threshold=config.duplicate_phash_threshold)
+    # Initialize directory scanner; all images in a submission share one directory index
+    phash_threshold = config.duplicate_phash_threshold
+    directory_scanner = get_directory_scanner(phash_threshold=phash_threshold)
+    directory_index = directory_scanner.get_index(event_driven, academic_year)
     
     logger.debug(f"  Submission ID: {submission_id}")
     logger.debug(f"  Images to check: {len(submission.images)}")
-    logger.debug(f"  Batch hash tracker size: {len(_batch_hash_tracker)}")
+    # Loop-invariant locals for the per-image checks below
+    tracker = state.sha_map
+    
+    logger.debug(f"  Batch hash tracker size: {len(tracker)}")
     logger.debug(f"  Event Driven: {event_driven}, Academic Year: {academic_year}")
     
     duplicate_found = False
@@ -82,13 +155,16 @@ def validate_duplicate_detection(
             logger.debug(f"  Image {i}: No SHA256 hash, skipping")
             continue
         
+        # Integer pHash for popcount distance (parsed at extraction; parse here if missing)
+        phash_int = img_data.phash_int if img_data.phash_int is not None else phash_to_int(img_data.phash)
+        
         logger.debug(f"  Image {i}: Checking SHA256 {img_data.sha256[:16]}...")
         
         # Step 1: Check batch-level duplicates
-        if img_data.sha256 in _batch_hash_tracker:
+        if img_data.sha256 in tracker:
             # Duplicate found in batch!
             duplicate_found = True
-            previous_submission = _batch_hash_tracker[img_data.sha256]
+            previous_submission = tracker[img_data.sha256]
             previous_id = previous_submission.get('submission_id', 'unknown')
             
             duplicate_messages.append(
@@ -99,76 +175,71 @@ def validate_duplicate_detection(
                 f"  DUPLICATE DETECTED (batch): Image {i} SHA256 {img_data.sha256[:16]}... "
                 f"matches submission {previous_id}"
             )
-        else:
-            # Step 2: Check directory-level duplicates
-            directory_matches = directory_scanner.scan_directory_for_duplicates(
-                target_sha256=img_data.sha256,
-                target_phash=img_data.phash,
-                event_driven=event_driven,
-                academic_year=academic_year,
-                submission_id=submission_id
-            )
-            
-            if directory_matches:
-                for match_path, match_type, similarity_score in directory_matches:
-                    if match_type == 'exact':
-                        duplicate_found = True
-                        duplicate_messages.append(
-                            f"Image identical to file in directory (SHA256 match): {match_path}"
-                        )
-                        logger.warning(
-                            f"  DUPLICATE DETECTED (directory): Image {i} matches {match_path} (exact)"
-                        )
-                    elif match_type == 'near-duplicate':
-                        duplicate_found = True
-                        score_str = f" (similarity score: {similarity_score:.1f})" if similarity_score is not None else ""
-                        duplicate_messages.append(
-                            f"Image similar to file in directory (pHash match{score_str}): {match_path}"
-                        )
-                        logger.warning(
-                            f"  NEAR-DUPLICATE DETECTED (directory): Image {i} similar to {match_path} "
-                            f"(distance: {similarity_score})"
-                        )
+            continue  # Already flagged; skip the remaining checks for this image
+        
+        # Step 2: Check directory-level duplicates
+        directory_matches = directory_index.match(
+            img_data.sha256,
+            phash_int,
+            phash_threshold
+        )
+        
+        if directory_matches:
+            for match_path, match_type, similarity_score in directory_matches:
+                if match_type == 'exact':
+                    duplicate_found = True
+                    duplicate_messages.append(
+                        f"Image identical to file in directory (SHA256 match): {match_path}"
+                    )
+                    logger.warning(
+                        f"  DUPLICATE DETECTED (directory): Image {i} matches {match_path} (exact)"
+                    )
+                elif match_type == 'near-duplicate':
+                    duplicate_found = True
+                    score_str = f" (similarity score: {similarity_score:.1f})" if similarity_score is not None else ""
+                    duplicate_messages.append(
+                        f"Image similar to file in directory (pHash match{score_str}): {match_path}"
+                    )
+                    logger.warning(
+                        f"  NEAR-DUPLICATE DETECTED (directory): Image {i} similar to {match_path} "
+                        f"(distance: {similarity_score})"
+                    )
+            continue
+        
+        # Step 3: Check pHash near-duplicates in batch (vectorized over all stored pHashes)
+        if phash_int is not None:
+            batch_match = state.find_phash_match(phash_int, phash_threshold)
+            if batch_match:
+                distance, existing_data = batch_match
+                previous_id = existing_data.get('submission_id', 'unknown')
+                duplicate_found = True
+                duplicate_messages.append(
+                    f"Image similar to submission {previous_id} "
+                    f"(pHash distance: {distance}, threshold: {phash_threshold})"
+                )
+                logger.warning(
+                    f"  NEAR-DUPLICATE (batch): Image {i} pHash distance {distance} "
+                    f"from submission {previous_id}"
+                )
+                continue
+        
+        # Step 4: Store in batch tracker and directory cache
+        if not duplicate_found:
+            state.add(img_data.sha256, phash_int, {
+                'submission_id': submission_id,
+                'phash': img_data.phash,
+                'path': str(img_data.path)
+            })
             
-            # Step 3: Check pHash near-duplicates in batch
-            if img_data.phash:
-                for existing_hash, existing_data in _batch_hash_tracker.items():
-                    existing_phash = existing_data.get('phash')
-                    if existing_phash and existing_phash != img_data.phash:
-                        # Calculate Hamming distance
-                        distance = hamming_distance(img_data.phash, existing_phash)
-                        if distance <= config.duplicate_phash_threshold:
-                            previous_id = existing_data.get('submission_id', 'unknown')
-                            duplicate_found = True
-                            duplicate_messages.append(
-                                f"Image similar to submission {previous_id} "
-                                f"(pHash distance: {distance}, threshold: {config.duplicate_phash_threshold})"
-                            )
-                            logger.warning(
-                                f"  NEAR-DUPLICATE (batch): Image {i} pHash distance {distance} "
-                                f"from submission {previous_id}"
-                            )
-                            break
+            # Add to directory cache
+            directory_index.add(img_data.sha256, img_data.phash, {
+                'phash': img_data.phash,
+                'path': str(img_data.path),
+                'submission_id': submission_id,
+                'first_seen': submission_id  # Track first submission that saw this file
+            })
             
-            # Step 4: Store in batch tracker and directory cache
-            if not duplicate_found:
-                _batch_hash_tracker[img_data.sha256] = {
-                    'submission_id': submission_id,
-                    'phash': img_data.phash,
-                    'path': str(img_data.path)
-                }
-                
-                # Add to directory cache
-                directory_scanner.add_file_to_cache(
-                    sha256=img_data.sha256,
-                    phash=img_data.phash,
-                    file_path=str(img_data.path),
-                    event_driven=event_driven,
-                    academic_year=academic_year,
-                    submission_id=submission_id
-                )
-                
-                logger.debug(f"  Image {i}: Unique (stored in batch tracker and directory cache)")
+            logger.debug(f"  Image {i}: Unique (stored in batch tracker and directory cache)")
     
     if duplicate_found:
         message = "Duplicate Check: " + "; ".join(duplicate_messages)
@@ -192,7 +263,8 @@ def validate_duplicate_detection(
 def validate_duplicates(
     submission: EventSubmission,
     config: ValidationConfig,
-    submission_id: Optional[str] = None
+    submission_id: Optional[str] = None,
+    state: Optional[BatchDedupState] = None
 ) -> List[ValidationResult]:
     """
     Run duplicate validation within current batch.
@@ -201,7 +273,8 @@ def validate_duplicates(
         submission: Event submission
         config: Validation configuration
         submission_id: Unique identifier for this submission
+        state: Batch duplicate state (defaults to the shared module-level state)
     """
     results = []
-    results.append(validate_duplicate_detection(submission, config, submission_id))
+    results.append(validate_duplicate_detection(submission, config, submission_id, state))
     return results
@@ -1,17 +1,34 @@
 """Gemini API client for semantic validation with vision support. Falls back to Groq on failure."""
+import asyncio
+import atexit
+import json
 import logging
-from typing import Optional, Dict, Any, Callable
+from typing import Optional, Dict, Any, Callable, List, Tuple, Union
 import os
+import random
 import time
 import re
-import hashlib
+import mmap
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed, Future
+import weakref
+from collections import Counter
+from contextlib import asynccontextmanager
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, Future, FIRST_COMPLETED, TimeoutError as FutureTimeoutError
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
-from event_validator.utils.rate_limiter import get_rate_limiter
+from event_validator.utils.rate_limiter import get_rate_limiter, CHARS_PER_TOKEN
 from event_validator.utils.circuit_breaker import get_gemini_circuit_breaker
-from event_validator.utils.concurrency import gemini_concurrency_guard
+from event_validator.utils.concurrency import gemini_concurrency_guard, GEMINI_MAX_CONCURRENT
+from event_validator.utils.response_cache import get_response_cache, content_digest, TTLCache
+from event_validator.utils.response_parsing import (
+    PDF_VALIDATION_FLAGS,
+    parse_image_analysis,
+    parse_pdf_consistency,
+    parse_pdf_validation,
+    parse_pdf_vision
+)
 
 # Load environment variables from .env file
 load_dotenv()
@@ -25,6 +42,12 @@ except ImportError:
     types = None
     GENAI_AVAILABLE = False
 
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
 # Import GroqClient for fallback
 try:
     from event_validator.validators.groq_client import GroqClient
@@ -35,11 +58,150 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-# Global cache for Gemini API responses (keyed by content hash)
-# Cache structure: {cache_key: response_text}
-_gemini_response_cache: Dict[str, str] = {}
-# Cache for parsed validation results (to avoid re-parsing)
-_gemini_parsed_cache: Dict[str, Dict[str, Any]] = {}
+# Cache for Gemini API responses (keyed by content hash), persisted across runs
+# and shared with the Groq client
+_gemini_response_cache = get_response_cache()
+# Cache for parsed validation results (to avoid re-parsing), bounded LRU with expiry
+PARSED_CACHE_MAX_ENTRIES = int(os.getenv('GEMINI_PARSED_CACHE_MAX_ENTRIES', '10000'))
+PARSED_CACHE_TTL = int(os.getenv('GEMINI_PARSED_CACHE_TTL', '3600'))  # seconds
+_gemini_parsed_cache = TTLCache(PARSED_CACHE_MAX_ENTRIES, PARSED_CACHE_TTL)
+
+# Retry backoff cap in seconds (full jitter: uniform(0, min(cap, base * 2^attempt)))
+RETRY_BACKOFF_CAP = 60.0
+
+# Images at least this large are memory-mapped for hashing, so a cache hit never
+# copies them into the Python heap (the upload itself still needs bytes)
+IMAGE_MMAP_THRESHOLD = 4 * 1024 * 1024
+
+# Images larger than this are downscaled to IMAGE_UPLOAD_MAX_SIDE and re-encoded as
+# JPEG before upload (Gemini tiles images at about this resolution anyway)
+IMAGE_DOWNSCALE_THRESHOLD = 1_500_000
+IMAGE_UPLOAD_MAX_SIDE = 1568
+IMAGE_UPLOAD_JPEG_QUALITY = 85
+
+# Largest image sent inline (Gemini rejects inline requests over 20 MB); bigger images
+# that can't be downscaled are never materialized in memory
+GEMINI_MAX_IMAGE_MB = float(os.getenv('GEMINI_MAX_IMAGE_MB', '20'))
+
+# Upload MIME type by image file extension (anything else is sent as JPEG)
+_IMAGE_MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp'
+}
+
+# Theme checks per prompt in check_theme_alignment_batch
+THEME_BATCH_SIZE = 10
+
+# PDF excerpt budgets in estimated tokens (CHARS_PER_TOKEN chars each)
+PDF_PROMPT_TOKENS = 750
+PDF_VALIDATION_PROMPT_TOKENS = 1000
+
+# Open the HTTPS connection in the background when the client is created, so the
+# first validation doesn't pay the TCP/TLS handshake
+GEMINI_WARMUP = os.getenv('GEMINI_WARMUP', 'true').lower() == 'true'
+
+# Max concurrent async vision calls (image requests are slower and hit tighter limits)
+GEMINI_MAX_VISION_CONCURRENT = int(os.getenv('GEMINI_MAX_VISION_CONCURRENT', '4'))
+
+# Start Groq alongside Gemini when image analysis takes longer than this many
+# seconds; the first usable answer wins (0 disables racing, Groq is then only
+# tried after Gemini fails)
+GEMINI_IMAGE_RACE_AFTER = float(os.getenv('GEMINI_IMAGE_RACE_AFTER', '0'))
+
+# Shared pool for racing Gemini against Groq (_theme_alignment_fallback and slow
+# image analyses; two tasks per race, so room for every concurrent Gemini slot)
+_FALLBACK_POOL = ThreadPoolExecutor(max_workers=2 * GEMINI_MAX_CONCURRENT, thread_name_prefix="gemini-fallback")
+atexit.register(_FALLBACK_POOL.shutdown, wait=False, cancel_futures=True)
+
+
+# Whitespace normalization for PDF excerpts: runs of spaces/tabs, and runs of blank lines
+_SPACE_RUN_RE = re.compile(r'[^\S\n]+')
+_BLANK_LINES_RE = re.compile(r'\n(?:[^\S\n]*\n)+')
+
+
+@lru_cache(maxsize=32)
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Collapse whitespace runs in text and cut it to about max_tokens, on a word
+    boundary where possible.
+    
+    Memoized, so the checks that share one PDF's text truncate it once.
+    """
+    text = _BLANK_LINES_RE.sub('\n\n', _SPACE_RUN_RE.sub(' ', text)).strip()
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    
+    cut = max(text.rfind(' ', 0, max_chars + 1), text.rfind('\n', 0, max_chars + 1))
+    if cut < max_chars // 2:
+        cut = max_chars  # No usable boundary (e.g. one long token)
+    return text[:cut].rstrip()
+
+
+def _downscale_image(image_data: Union[bytes, mmap.mmap]) -> Optional[bytes]:
+    """
+    Shrink an image to fit IMAGE_UPLOAD_MAX_SIDE and re-encode it as JPEG.
+    
+    Returns None if Pillow is unavailable, decoding fails, or the result
+    isn't smaller than the original.
+    """
+    if Image is None:
+        return None
+    try:
+        source = BytesIO(image_data) if isinstance(image_data, bytes) else image_data
+        source.seek(0)
+        with Image.open(source) as img:
+            # JPEG decoders can downscale while decoding (much cheaper than a full decode)
+            img.draft('RGB', (IMAGE_UPLOAD_MAX_SIDE, IMAGE_UPLOAD_MAX_SIDE))
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((IMAGE_UPLOAD_MAX_SIDE, IMAGE_UPLOAD_MAX_SIDE), Image.LANCZOS)
+            out = BytesIO()
+            img.convert('RGB').save(out, format='JPEG', quality=IMAGE_UPLOAD_JPEG_QUALITY, optimize=True)
+    except Exception as e:
+        logger.debug(f"Could not downscale image, uploading original: {e}")
+        return None
+    
+    data = out.getvalue()
+    return data if len(data) < len(image_data) else None
+
+
+# JSON schema Gemini is held to for validate_pdf_comprehensive (fields as in the result dict)
+_PDF_VALIDATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        **{name: {"type": "boolean"} for name in PDF_VALIDATION_FLAGS.values()},
+        "reasoning": {"type": "string"},
+    },
+    "required": [*PDF_VALIDATION_FLAGS.values(), "reasoning"],
+}
+# validate_event_all: the PDF validation fields plus the theme check
+_EVENT_ALL_SCHEMA = {
+    "type": "object",
+    "properties": {"theme_aligned": {"type": "boolean"}, **_PDF_VALIDATION_SCHEMA["properties"]},
+    "required": ["theme_aligned", *_PDF_VALIDATION_SCHEMA["required"]],
+}
+
+# Outermost {...} in a response (JSON answers may come wrapped in markdown fences)
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# "N: YES" / "N) NO" lines in batched theme alignment responses
+_THEME_BATCH_RE = re.compile(r'^\s*(\d+)\s*[:).\-]\s*(YES|NO)\b', re.MULTILINE | re.IGNORECASE)
+# Dotted/hyphenated single-letter acronyms ("A.I.", "U-S-A") whose separators are
+# dropped when matching theme checks; other symbols ("C++", "C#", ".NET") are kept
+_MATCH_ACRONYM_RE = re.compile(r'\b[^\W\d_](?:[.\-][^\W\d_])+\.?(?!\w)')
+_MATCH_ACRONYM_SEP_RE = re.compile(r'[.\-]')
+
+# Retry delay hints in API error messages, e.g. "retry_delay { seconds: 49 }" or "retry in 49.42s"
+# One alternation so the error string is scanned once; exactly one group is set per match
+_RETRY_DELAY_RE = re.compile(
+    r'retry_delay\s*\{\s*seconds:\s*(\d+)'
+    r'|retry (?:in|after) (\d+\.?\d*)\s*s'
+    r'|wait (\d+\.?\d*)\s*seconds?',
+    re.IGNORECASE
+)
 
 # Callback function to signal rate limit detection (set by app.py)
 _rate_limit_callback: Optional[Callable[[], None]] = None
@@ -50,11 +212,90 @@ def set_rate_limit_callback(callback: Callable[[], None]):
     _rate_limit_callback = callback
 
 
+# Call counters for monitoring, shared by all clients (see get_gemini_stats)
+_gemini_stats: Counter = Counter()
+_gemini_stats_lock = threading.Lock()
+
+
+def _count_call(event: str):
+    """Increment a _gemini_stats counter."""
+    with _gemini_stats_lock:
+        _gemini_stats[event] += 1
+
+
+def get_gemini_stats() -> dict:
+    """
+    Get Gemini call counters and response cache stats for monitoring.
+    
+    Counters: cache_hit, cache_miss, inflight_joined, api_call, rate_limit_429,
+    circuit_open_skip (missing keys are 0).
+    """
+    with _gemini_stats_lock:
+        stats = dict(_gemini_stats)
+    lookups = stats.get("cache_hit", 0) + stats.get("cache_miss", 0)
+    stats["cache_hit_rate"] = stats.get("cache_hit", 0) / lookups if lookups else 0.0
+    stats["response_cache"] = _gemini_response_cache.get_stats()
+    return stats
+
+
 class GeminiClient:
     """Client for interacting with Gemini models - optimized for performance and cost."""
     
-    def __init__(self, api_key: Optional[str] = None, groq_api_key: Optional[str] = None):
-        """Initialize Gemini client with optimal models. Falls back to Groq if Gemini fails."""
+    # Static instructions lead the vision prompts and per-event values follow, so
+    # identical prompt prefixes can hit Gemini's implicit context cache
+    _IMAGE_PROMPT_PREFIX = """You are analyzing an event photograph for validation purposes. The event context is given at the end.
+
+Task: Analyze the image and determine:
+1. Does the image show a banner or poster with text? If yes, does the banner text match the event title/theme?
+2. Does the image depict a real event/activity (not stock photo, not staged, not just a poster)?
+3. Does the event mode (online/offline) match what's visible in the image?
+   - Online: screens, video calls, virtual backgrounds, remote participants
+   - Offline: physical venue, in-person attendees, physical setup
+4. How many participants are visible? Provide an estimate.
+5. Is this clearly a real event scene with actual activity?
+
+Respond in this exact format:
+HAS_BANNER: YES or NO
+BANNER_TEXT_MATCHES: YES or NO
+IS_REAL_EVENT: YES or NO
+MODE_MATCHES: YES or NO
+PARTICIPANT_COUNT: <number>
+HAS_15_PLUS_PARTICIPANTS: YES or NO
+REASONING: <brief explanation>"""
+    
+    _PDF_PROMPT_PREFIX = """You are validating a PDF report for an event submission. The expected context and the PDF content are given at the end.
+
+Task: Validate the PDF content and determine:
+1. Does the PDF title match the expected title (fuzzy match acceptable)?
+2. Do the PDF objectives align with expected objectives?
+3. Do the PDF learning outcomes align with expected learning outcomes?
+4. Are expert details present (name, designation, affiliation)?
+5. Does the PDF contain participant information indicating 15+ participants?
+6. Does the overall content align with the declared theme?
+
+Respond in this exact format:
+TITLE_MATCH: YES or NO
+OBJECTIVES_MATCH: YES or NO
+LEARNING_MATCH: YES or NO
+EXPERT_DETAILS: YES or NO
+PARTICIPANTS_VALID: YES or NO
+THEME_ALIGNMENT: YES or NO
+REASONING: <detailed explanation>"""
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        groq_api_key: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        max_vision_concurrency: Optional[int] = None
+    ):
+        """
+        Initialize Gemini client with optimal models. Falls back to Groq if Gemini fails.
+        
+        max_concurrency / max_vision_concurrency cap in-flight async requests
+        (defaults: GEMINI_MAX_CONCURRENT and GEMINI_MAX_VISION_CONCURRENT).
+        Vision requests count against both limits.
+        """
         # Initialize model names first (always set, even if client fails)
         # Using gemini-2.5-pro for both text and vision (150 RPM, 10K RPD - much higher capacity)
         # gemini-2.0-flash-exp has only 10 RPM and 500 RPD limit (bottleneck for large batches)
@@ -78,6 +319,22 @@ class GeminiClient:
                 logger.error(f"Failed to initialize Gemini client: {e}")
                 self.client = None
         
+        # Async client for event-loop callers (shares the sync client's configuration)
+        self.aclient = self.client.aio if self.client is not None else None
+        self.max_concurrency = max_concurrency or GEMINI_MAX_CONCURRENT
+        self.max_vision_concurrency = min(max_vision_concurrency or GEMINI_MAX_VISION_CONCURRENT, self.max_concurrency)
+        # (semaphore, vision semaphore) per event loop, created on the loop's first
+        # async call; asyncio primitives can't be shared across loops, and the client
+        # outlives any one asyncio.run()
+        self._loop_sems: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[asyncio.Semaphore, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+        # Async requests in flight, by cache key (see _call_gemini_async)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Sync requests in flight from worker threads, by cache key (see _call_gemini)
+        self._inflight_threads: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        # Seconds before a slow Gemini image analysis is raced against Groq (0 = off)
+        self.image_race_after = GEMINI_IMAGE_RACE_AFTER
+        
         # Initialize Groq client as fallback
         self.groq_client = None
         if GROQ_AVAILABLE and GroqClient:
@@ -96,6 +353,22 @@ class GeminiClient:
                 logger.debug("Groq API key not provided for fallback")
         else:
             logger.debug("Groq package not available for fallback")
+        
+        if self.client is not None and GEMINI_WARMUP:
+            threading.Thread(target=self._warm_up_connection, name="gemini-warmup", daemon=True).start()
+    
+    def _warm_up_connection(self):
+        """Make a cheap metadata request so the connection pool is ready (best effort)."""
+        try:
+            self.client.models.get(model=self.text_model)
+            logger.debug("Gemini connection warmed up")
+        except Exception as e:
+            logger.debug(f"Gemini connection warmup failed: {e}")
+    
+    def clear_cache(self):
+        """Drop all cached Gemini/Groq responses (memory and disk) and parsed results."""
+        _gemini_response_cache.clear()
+        _gemini_parsed_cache.clear()
     
     def _get_cache_key(self, prompt: str, model: Optional[str] = None, image_hash: Optional[str] = None, pdf_hash: Optional[str] = None) -> str:
         """Generate cache key for prompt, model, and optionally image/pdf hash."""
@@ -104,7 +377,202 @@ class GeminiClient:
             content += f":img:{image_hash}"
         if pdf_hash:
             content += f":pdf:{pdf_hash}"
-        return hashlib.sha256(content.encode()).hexdigest()
+        return content_digest(content.encode())
+    
+    @staticmethod
+    def _read_image(image_path: Optional[Path]) -> Optional[Union[bytes, mmap.mmap]]:
+        """
+        Open an image once for both the cache key and the upload.
+        
+        Large files are memory-mapped instead of read; pass the result through
+        _prepare_upload() before uploading.
+        """
+        if not image_path:
+            return None
+        try:
+            with open(image_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size >= IMAGE_MMAP_THRESHOLD:
+                    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                return f.read()
+        except (OSError, ValueError) as e:
+            logger.debug(f"Could not read image {image_path}: {e}")
+            return None
+    
+    @staticmethod
+    def _prepare_upload(
+        image_path: Optional[Path],
+        image_data: Optional[Union[bytes, mmap.mmap]]
+    ) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        Turn the image from _read_image into upload bytes and their MIME type.
+        
+        Images over IMAGE_DOWNSCALE_THRESHOLD bytes are downscaled to JPEG; a
+        mapped image is materialized as bytes (google-genai requires bytes) and
+        unmapped. Returns (None, None) without an image.
+        
+        Raises:
+            ValueError: If the upload would exceed GEMINI_MAX_IMAGE_MB
+        """
+        if image_data is None:
+            return None, None
+        
+        try:
+            if len(image_data) > IMAGE_DOWNSCALE_THRESHOLD:
+                downscaled = _downscale_image(image_data)
+                if downscaled is not None:
+                    logger.debug(f"Downscaled {image_path.name} for upload: {len(image_data)} -> {len(downscaled)} bytes")
+                    return downscaled, 'image/jpeg'
+            if len(image_data) > GEMINI_MAX_IMAGE_MB * 1024 * 1024:
+                raise ValueError(f"{image_path.name} is {len(image_data)} bytes, over the {GEMINI_MAX_IMAGE_MB:g} MB upload limit")
+            data = bytes(image_data) if isinstance(image_data, mmap.mmap) else image_data
+        finally:
+            if isinstance(image_data, mmap.mmap):
+                image_data.close()
+        
+        return data, _IMAGE_MIME_TYPES.get(image_path.suffix.lower(), 'image/jpeg')
+    
+    @staticmethod
+    def _compute_image_hash(image_data: Optional[Union[bytes, mmap.mmap]]) -> Optional[str]:
+        """Content hash of an image for cache keys."""
+        if image_data is None:
+            return None
+        return content_digest(image_data)
+    
+    def _response_cache_key(
+        self,
+        prompt: str,
+        model: str,
+        image_path: Optional[Path],
+        image_data: Optional[Union[bytes, mmap.mmap]]
+    ) -> Optional[str]:
+        """
+        Cache key for a call, used for both the lookup and the store.
+        
+        None when an image was requested but couldn't be read, so such calls
+        are never cached under the text-only key.
+        """
+        if image_path and image_data is None:
+            return None
+        return self._get_cache_key(prompt, model, self._compute_image_hash(image_data))
+    
+    def _get_cached_response(self, cache_key: Optional[str], model: str, is_image: bool) -> Optional[str]:
+        """Look up a cached response by the key from _response_cache_key."""
+        if cache_key is None:
+            return None
+        cached_response = _gemini_response_cache.get(cache_key)
+        if cached_response is not None:
+            _count_call("cache_hit")
+            logger.debug(f"Cache hit for {'image analysis' if is_image else 'text prompt'} (model: {model})")
+        else:
+            _count_call("cache_miss")
+        return cached_response
+    
+    def _build_contents(self, prompt: str, image_data: Optional[bytes], mime_type: Optional[str]) -> list:
+        """Build the request contents: prompt text plus the image bytes, if any."""
+        parts = [types.Part.from_text(text=prompt)]
+        
+        # Add image if provided
+        if image_data is not None:
+            parts.append(types.Part.from_bytes(data=image_data, mime_type=mime_type))
+        
+        return [types.Content(role="user", parts=parts)]
+    
+    @staticmethod
+    def _extract_response_text(response: Any) -> str:
+        """Extract the text from a generate_content response ("" if there is none)."""
+        if response_text := getattr(response, 'text', None):
+            return response_text
+        try:
+            return response.candidates[0].content.parts[0].text or ""
+        except (AttributeError, IndexError, TypeError):
+            return ""
+    
+    @staticmethod
+    def _is_rate_limit_error(error_str: str) -> bool:
+        """Check for rate limit errors (429 or quota exceeded)."""
+        error_lower = error_str.lower()
+        return (
+            '429' in error_str or
+            'quota' in error_lower or
+            'rate limit' in error_lower or
+            'retry' in error_lower or
+            'resource_exhausted' in error_lower
+        )
+    
+    def _notify_rate_limit(self):
+        """Signal rate limit detection to app.py."""
+        if _rate_limit_callback:
+            try:
+                _rate_limit_callback()
+            except Exception as cb_error:
+                logger.warning(f"Rate limit callback failed: {cb_error}")
+    
+    @staticmethod
+    def _full_jitter_backoff(attempt: int, base_delay: float) -> float:
+        """Exponential backoff with full jitter, so concurrent workers don't retry in lockstep."""
+        return random.uniform(0, min(RETRY_BACKOFF_CAP, base_delay * (2 ** attempt)))
+    
+    def _rate_limit_backoff(self, error: Exception, attempt: int, max_retries: int) -> float:
+        """Delay before retrying after a rate limit error."""
+        # Server-suggested delay: structured error fields first, error message as a fallback
+        retry_delay = self._structured_retry_delay(error) or self._extract_retry_delay(str(error))
+        if retry_delay:
+            # Use extracted delay, but ensure minimum 5 seconds
+            delay = max(retry_delay, 5.0)
+            # The quota is shared: hold back other callers too instead of letting them hit 429
+            get_rate_limiter().penalize(delay)
+            # Workers quoting the same server delay would otherwise retry in lockstep
+            delay += random.uniform(0, 0.25 * delay)
+        else:
+            delay = self._full_jitter_backoff(attempt, base_delay=2.0)  # Start at 2s for Gemini
+        if attempt < max_retries - 1:
+            logger.warning(
+                f"Rate limit hit. Waiting {delay:.1f}s before retry "
+                f"(attempt {attempt + 1}/{max_retries})"
+            )
+        else:
+            logger.warning(f"Rate limit hit on final attempt ({max_retries}/{max_retries})")
+        return delay
+    
+    def _groq_text_fallback(self, prompt: str, use_cache: bool, reason: Optional[str] = None) -> Optional[str]:
+        """Text-only Groq fallback used when the circuit breaker blocks Gemini."""
+        if self.groq_client and hasattr(self.groq_client, '_call_groq'):
+            if reason:
+                logger.info(f"Attempting Groq fallback due to {reason}")
+            groq_response = self.groq_client._call_groq(prompt, use_cache=use_cache)
+            if groq_response:
+                return groq_response
+        return None
+    
+    def _groq_last_resort(self, prompt: str, image_path: Optional[Path], use_cache: bool) -> Optional[str]:
+        """Try Groq after all Gemini retries failed."""
+        logger.warning("All Gemini API retry attempts failed, trying Groq as last resort...")
+        # Fallback to Groq ONLY if Gemini completely fails
+        if self.groq_client and hasattr(self.groq_client, 'client') and self.groq_client.client:
+            logger.info("Falling back to Groq API as last resort")
+            # For image analysis, Groq uses a different approach (text-based for now)
+            if image_path:
+                logger.warning("Groq fallback for image analysis may have limited capabilities")
+                try:
+                    groq_response = self.groq_client._call_groq(prompt, model=self.groq_client.image_model, use_cache=use_cache)
+                    if groq_response:
+                        logger.info("Groq fallback succeeded for image analysis")
+                        return groq_response
+                except Exception as e:
+                    logger.warning(f"Groq fallback for image analysis failed: {e}")
+            else:
+                # Text-based call with Groq
+                try:
+                    groq_response = self.groq_client._call_groq(prompt, model=self.groq_client.text_model, use_cache=use_cache)
+                    if groq_response:
+                        logger.info("Groq fallback succeeded for text call")
+                        return groq_response
+                except Exception as e:
+                    logger.warning(f"Groq fallback for text call failed: {e}")
+        
+        logger.error("Both Gemini and Groq API calls failed")
+        return None
     
     def _call_gemini(
         self,
@@ -112,7 +580,8 @@ class GeminiClient:
         model: Optional[str] = None,
         image_path: Optional[Path] = None,
         max_retries: int = 3,
-        use_cache: bool = True
+        use_cache: bool = True,
+        response_schema: Optional[Dict[str, Any]] = None
     ) -> Optional[str]:
         """
         Call Gemini API with retry logic, rate limit handling, and caching.
@@ -124,6 +593,8 @@ class GeminiClient:
             image_path: Optional path to image file for vision tasks
             max_retries: Maximum retry attempts
             use_cache: Whether to use response cache
+            response_schema: JSON schema for a structured JSON response (Gemini
+                only; the prompt should ask for the same JSON for the Groq fallback)
         
         Returns:
             Response text or None if failed
@@ -147,47 +618,143 @@ class GeminiClient:
         else:
             model = model or self.text_model
         
-        # Check cache first (with content hash for deterministic caching)
-        image_hash = None
-        if image_path and image_path.exists():
-            # Compute image hash for cache key (use SHA256 for better cache hits)
-            try:
-                from event_validator.utils.hashing import compute_sha256
-                image_hash = compute_sha256(image_path)
-            except Exception as e:
-                logger.debug(f"Could not compute image hash for caching: {e}")
-                # Fallback to MD5 if SHA256 fails
-                try:
-                    with open(image_path, 'rb') as f:
-                        image_data = f.read()
-                        image_hash = hashlib.md5(image_data).hexdigest()
-                except Exception:
-                    pass
-        
-        if use_cache and image_hash:
-            cache_key = self._get_cache_key(prompt, model, image_hash=image_hash[:16])
-            if cache_key in _gemini_response_cache:
-                logger.debug(f"Cache hit for image analysis (model: {model})")
-                return _gemini_response_cache[cache_key]
-        elif use_cache and not image_path:
-            # Text-only call, check cache
-            cache_key = self._get_cache_key(prompt, model)
-            if cache_key in _gemini_response_cache:
-                logger.debug(f"Cache hit for text prompt (model: {model})")
-                return _gemini_response_cache[cache_key]
-        
-        # Check circuit breaker before making request
-        circuit_breaker = get_gemini_circuit_breaker()
-        if not circuit_breaker.can_proceed():
+        # Check cache first (with content hash for deterministic caching); the key
+        # is computed once and reused to store the response
+        image_data = self._read_image(image_path)
+        cache_key = self._response_cache_key(prompt, model, image_path, image_data) if use_cache else None
+        cached_response = self._get_cached_response(cache_key, model, image_path is not None)
+        if cached_response is not None:
+            if isinstance(image_data, mmap.mmap):
+                image_data.close()
+            return cached_response
+        
+        if cache_key is None:
+            return self._send_gemini(
+                prompt, model, image_path, image_data, cache_key, max_retries, use_cache, response_schema
+            )
+        
+        # Identical requests already in flight from other threads share one API call
+        with self._inflight_lock:
+            inflight = self._inflight_threads.get(cache_key)
+            if inflight is None:
+                future = Future()
+                self._inflight_threads[cache_key] = future
+        if inflight is not None:
+            if isinstance(image_data, mmap.mmap):
+                image_data.close()
+            _count_call("inflight_joined")
+            logger.debug(f"Joining in-flight request with key: {cache_key[:16]}...")
+            return inflight.result()
+        
+        try:
+            response_text = self._send_gemini(
+                prompt, model, image_path, image_data, cache_key, max_retries, use_cache, response_schema
+            )
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(response_text)
+        finally:
+            with self._inflight_lock:
+                if self._inflight_threads.get(cache_key) is future:
+                    del self._inflight_threads[cache_key]
+        return response_text
+    
+    def _circuit_block_reason(self, circuit_breaker, attempt: int) -> Optional[str]:
+        """Groq fallback reason if the circuit breaker blocks this attempt, else None."""
+        if circuit_breaker.can_proceed():
+            return None
+        _count_call("circuit_open_skip")
+        if attempt == 0:
             logger.warning("Circuit breaker OPEN: Gemini API temporarily unavailable")
-            # Try Groq fallback if available
-            if self.groq_client and hasattr(self.groq_client, '_call_groq') and not image_path:
-                logger.info("Attempting Groq fallback due to Gemini circuit breaker")
-                groq_response = self.groq_client._call_groq(prompt, use_cache=use_cache)
-                if groq_response:
-                    return groq_response
+            return "Gemini circuit breaker"
+        # CIRCUIT-AWARE RETRY: abort retries instead of waiting out the backoff
+        logger.warning(f"Circuit breaker OPEN during retry - aborting Gemini retries")
+        return "circuit breaker (mid-retry)"
+    
+    def _circuit_fallback(self, prompt: str, image_path: Optional[Path], use_cache: bool, reason: Optional[str] = None) -> Optional[str]:
+        """Groq fallback while the Gemini circuit breaker is open (text calls only)."""
+        if image_path:
+            return None
+        return self._groq_text_fallback(prompt, use_cache, reason)
+    
+    def _accept_response(self, response: Any, circuit_breaker, cache_key: Optional[str]) -> Optional[str]:
+        """Extract, cache and return the text of a successful Gemini response."""
+        response_text = self._extract_response_text(response)
+        if not response_text:
             return None
         
+        response_text = response_text.strip()
+        # Record success in circuit breaker
+        circuit_breaker.record_success()
+        # Cache response
+        if cache_key is not None:
+            _gemini_response_cache.set(cache_key, response_text)
+            logger.debug(f"Cached response with key: {cache_key[:16]}...")
+        return response_text
+    
+    def _attempt_failed(self, e: Exception, attempt: int, max_retries: int, circuit_breaker) -> Tuple[str, float]:
+        """
+        Record a failed Gemini attempt and choose what to do next.
+        
+        Returns:
+            ("retry", backoff delay), ("circuit_fallback", 0) if a 429 just opened
+            the circuit breaker, or ("last_resort", 0) after the final attempt
+        """
+        if self._is_rate_limit_error(str(e)):
+            _count_call("rate_limit_429")
+            # Record error in circuit breaker
+            circuit_breaker.record_error(is_rate_limit=True)
+            
+            # CIRCUIT-AWARE: If circuit just opened, don't retry - fallback immediately
+            if not circuit_breaker.can_proceed():
+                _count_call("circuit_open_skip")
+                logger.warning("Circuit breaker OPEN after 429 - skipping retries, falling back")
+                return "circuit_fallback", 0.0
+            
+            self._notify_rate_limit()
+            delay = self._rate_limit_backoff(e, attempt, max_retries)
+        else:
+            logger.warning(f"Gemini API call failed (attempt {attempt + 1}/{max_retries}): {e}")
+            # Small delay before retry for non-rate-limit errors
+            delay = self._full_jitter_backoff(attempt, base_delay=1.0)
+        
+        # Only try Groq as LAST RESORT after all Gemini retries fail (no backoff first)
+        if attempt == max_retries - 1:
+            return "last_resort", 0.0
+        return "retry", delay
+    
+    @staticmethod
+    def _request_config(response_schema: Optional[Dict[str, Any]]) -> Optional["types.GenerateContentConfig"]:
+        """generate_content config asking for JSON matching response_schema, if given."""
+        if response_schema is None:
+            return None
+        return types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=response_schema
+        )
+    
+    def _send_gemini(
+        self,
+        prompt: str,
+        model: str,
+        image_path: Optional[Path],
+        image_data: Optional[Union[bytes, mmap.mmap]],
+        cache_key: Optional[str],
+        max_retries: int,
+        use_cache: bool,
+        response_schema: Optional[Dict[str, Any]]
+    ) -> Optional[str]:
+        """Make the Gemini request for _call_gemini (after the cache lookup)."""
+        try:
+            image_data, mime_type = self._prepare_upload(image_path, image_data)
+        except ValueError as e:
+            logger.warning(f"Skipping Gemini vision call: {e}")
+            return None
+        
+        circuit_breaker = get_gemini_circuit_breaker()
+        
         # Note: Removed fixed 5-second delay - rate limiter handles spacing automatically
         # With 120 RPM (80% of 150), rate limiter enforces proper spacing (0.5s minimum between requests)
         
@@ -195,190 +762,301 @@ class GeminiClient:
         # This calculates the exact delay needed based on recent request history and token count
         rate_limiter = get_rate_limiter()
         estimated_tokens = rate_limiter.estimate_tokens(prompt, has_image=(image_path is not None))
-        delay = rate_limiter.acquire(wait=True, estimated_tokens=estimated_tokens)
-        if delay > 0:
-            logger.debug(f"Rate limiter applied additional {delay:.2f}s delay (current rate: {rate_limiter.get_current_rate():.1f} RPM, tokens: ~{estimated_tokens})")
+        
+        # Request contents are identical on every attempt
+        contents = self._build_contents(prompt, image_data, mime_type)
+        config = self._request_config(response_schema)
         
         for attempt in range(max_retries):
-            # CIRCUIT-AWARE RETRY: Check circuit breaker before each retry attempt
-            if attempt > 0 and not circuit_breaker.can_proceed():
-                logger.warning(f"Circuit breaker OPEN during retry - aborting Gemini retries")
-                # Try Groq fallback immediately instead of retrying
-                if self.groq_client and hasattr(self.groq_client, '_call_groq') and not image_path:
-                    logger.info("Attempting Groq fallback due to circuit breaker (mid-retry)")
-                    groq_response = self.groq_client._call_groq(prompt, use_cache=use_cache)
-                    if groq_response:
-                        return groq_response
-                return None
+            # Check circuit breaker before each attempt; Groq instead when it's open
+            reason = self._circuit_block_reason(circuit_breaker, attempt)
+            if reason:
+                return self._circuit_fallback(prompt, image_path, use_cache, reason)
+            
+            # Every attempt is a request, so each one takes exactly one rate limiter slot
+            delay = rate_limiter.acquire(wait=True, estimated_tokens=estimated_tokens)
+            if delay > 0:
+                logger.debug(f"Rate limiter applied additional {delay:.2f}s delay (current rate: {rate_limiter.get_current_rate():.1f} RPM, tokens: ~{estimated_tokens})")
             
             try:
                 # CRITICAL: Use concurrency semaphore to limit parallel Gemini calls
                 # This prevents burst 429s even with multiple workers
                 with gemini_concurrency_guard():
                     # No additional delay needed here - already applied before rate limiter
-                    
-                    # Prepare content parts
-                    parts = [types.Part.from_text(text=prompt)]
-                    
-                    # Add image if provided
-                    if image_path and image_path.exists():
-                        with open(image_path, 'rb') as image_file:
-                            image_data = image_file.read()
-                        
-                        # Determine MIME type from file extension
-                        image_ext = image_path.suffix.lower()
-                        mime_type_map = {
-                            '.jpg': 'image/jpeg',
-                            '.jpeg': 'image/jpeg',
-                            '.png': 'image/png',
-                            '.gif': 'image/gif',
-                            '.webp': 'image/webp'
-                        }
-                        mime_type = mime_type_map.get(image_ext, 'image/jpeg')
-                        
-                        parts.append(types.Part.from_bytes(data=image_data, mime_type=mime_type))
-                    
-                    contents = [types.Content(role="user", parts=parts)]
-                    
+                    _count_call("api_call")
                     response = self.client.models.generate_content(
                         model=model,
                         contents=contents,
+                        config=config,
                     )
                 
                 # Extract text from response (outside semaphore)
-                response_text = ""
-                if hasattr(response, 'text'):
-                    response_text = response.text
-                elif hasattr(response, 'candidates') and response.candidates:
-                    candidate = response.candidates[0]
-                    if hasattr(candidate, 'content') and hasattr(candidate.content, 'parts'):
-                        response_parts = candidate.content.parts
-                        if response_parts and hasattr(response_parts[0], 'text'):
-                            response_text = response_parts[0].text
-                
-                if response_text:
-                    response_text = response_text.strip()
-                    # Record success in circuit breaker
-                    circuit_breaker.record_success()
-                    # Cache response
-                    if use_cache:
-                        cache_key = self._get_cache_key(prompt, model, image_hash)
-                        _gemini_response_cache[cache_key] = response_text
-                        logger.debug(f"Cached response with key: {cache_key[:16]}...")
-                    return response_text
-                
-                return None
+                return self._accept_response(response, circuit_breaker, cache_key)
                 
             except Exception as e:
-                error_str = str(e)
-                
-                # Check for rate limit errors (429 or quota exceeded)
-                is_rate_limit = (
-                    '429' in error_str or 
-                    'quota' in error_str.lower() or 
-                    'rate limit' in error_str.lower() or
-                    'retry' in error_str.lower() or
-                    'resource_exhausted' in error_str.lower()
-                )
+                action, delay = self._attempt_failed(e, attempt, max_retries, circuit_breaker)
+                if action == "circuit_fallback":
+                    return self._circuit_fallback(prompt, image_path, use_cache)
+                if action == "last_resort":
+                    return self._groq_last_resort(prompt, image_path, use_cache)
+                time.sleep(delay)
+        
+        return None
+    
+    @asynccontextmanager
+    async def _async_concurrency_guard(self, vision: bool):
+        """Limit concurrent async Gemini requests (vision requests hold both semaphores)."""
+        loop = asyncio.get_running_loop()
+        sems = self._loop_sems.get(loop)
+        if sems is None:
+            sems = (asyncio.Semaphore(self.max_concurrency), asyncio.Semaphore(self.max_vision_concurrency))
+            self._loop_sems[loop] = sems
+        sem, vision_sem = sems
+        
+        if vision:
+            async with vision_sem:
+                async with sem:
+                    yield
+        else:
+            async with sem:
+                yield
+    
+    async def _call_gemini_async(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        image_path: Optional[Path] = None,
+        max_retries: int = 3,
+        use_cache: bool = True,
+        response_schema: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        Async variant of _call_gemini using the google-genai async client.
+        
+        Same caching, rate limiting, circuit breaker and retry behaviour, but
+        waits yield to the event loop, so many calls can be in flight from a
+        single thread (see run_batch). Groq fallbacks are synchronous and run
+        in a worker thread.
+        
+        With use_cache, concurrent calls for the same prompt/model/image are
+        coalesced: later callers await the first caller's request instead of
+        sending their own.
+        """
+        if not self.aclient:
+            return await asyncio.to_thread(
+                self._call_gemini, prompt, model, image_path, max_retries, use_cache, response_schema
+            )
+        
+        # Determine model based on whether image is provided
+        if image_path:
+            model = model or self.vision_model
+        else:
+            model = model or self.text_model
+        
+        # Check cache first (with content hash for deterministic caching); the key
+        # is computed once and reused to store the response
+        image_data = self._read_image(image_path)
+        cache_key = self._response_cache_key(prompt, model, image_path, image_data) if use_cache else None
+        cached_response = self._get_cached_response(cache_key, model, image_path is not None)
+        if cached_response is not None:
+            if isinstance(image_data, mmap.mmap):
+                image_data.close()
+            return cached_response
+        
+        if cache_key is None:
+            return await self._send_gemini_async(
+                prompt, model, image_path, image_data, cache_key, max_retries, use_cache, response_schema
+            )
+        
+        # Identical requests already in flight on this loop share one API call
+        loop = asyncio.get_running_loop()
+        while True:
+            inflight = self._inflight.get(cache_key)
+            if inflight is None or inflight.get_loop() is not loop:
+                break
+            if isinstance(image_data, mmap.mmap):
+                image_data.close()
+            _count_call("inflight_joined")
+            logger.debug(f"Joining in-flight request with key: {cache_key[:16]}...")
+            try:
+                # Shielded so one waiter's cancellation doesn't cancel the shared request
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+            # The owning caller was cancelled; its cancellation isn't ours, so send (or join) again
+            logger.debug(f"In-flight request was cancelled, retrying with key: {cache_key[:16]}...")
+            image_data = self._read_image(image_path)
+        
+        future = loop.create_future()
+        self._inflight[cache_key] = future
+        try:
+            response_text = await self._send_gemini_async(
+                prompt, model, image_path, image_data, cache_key, max_retries, use_cache, response_schema
+            )
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved, in case no caller joined
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            if self._inflight.get(cache_key) is future:
+                del self._inflight[cache_key]
+        future.set_result(response_text)
+        return response_text
+    
+    async def _send_gemini_async(
+        self,
+        prompt: str,
+        model: str,
+        image_path: Optional[Path],
+        image_data: Optional[Union[bytes, mmap.mmap]],
+        cache_key: Optional[str],
+        max_retries: int,
+        use_cache: bool,
+        response_schema: Optional[Dict[str, Any]]
+    ) -> Optional[str]:
+        """
+        Make the Gemini request for _call_gemini_async (after the cache lookup).
+        
+        Same per-attempt handling as _send_gemini; Groq fallbacks run in a worker thread.
+        """
+        mime_type = None
+        if image_data is not None:
+            try:
+                # Decoding/downscaling is CPU work, keep it off the event loop
+                image_data, mime_type = await asyncio.to_thread(self._prepare_upload, image_path, image_data)
+            except ValueError as e:
+                logger.warning(f"Skipping Gemini vision call: {e}")
+                return None
+        
+        circuit_breaker = get_gemini_circuit_breaker()
+        rate_limiter = get_rate_limiter()
+        estimated_tokens = rate_limiter.estimate_tokens(prompt, has_image=(image_path is not None))
+        
+        # Request contents are identical on every attempt
+        contents = self._build_contents(prompt, image_data, mime_type)
+        config = self._request_config(response_schema)
+        
+        for attempt in range(max_retries):
+            # Check circuit breaker before each attempt; Groq instead when it's open
+            reason = self._circuit_block_reason(circuit_breaker, attempt)
+            if reason:
+                return await asyncio.to_thread(self._circuit_fallback, prompt, image_path, use_cache, reason)
+            
+            # Every attempt is a request, so each one takes exactly one rate limiter slot
+            delay = await rate_limiter.acquire_async(estimated_tokens=estimated_tokens)
+            if delay > 0:
+                logger.debug(f"Rate limiter applied additional {delay:.2f}s delay (current rate: {rate_limiter.get_current_rate():.1f} RPM, tokens: ~{estimated_tokens})")
+            
+            try:
+                # Only the request itself holds a concurrency slot, not backoff waits
+                async with self._async_concurrency_guard(vision=image_path is not None):
+                    _count_call("api_call")
+                    response = await self.aclient.models.generate_content(
+                        model=model,
+                        contents=contents,
+                        config=config,
+                    )
                 
-                if is_rate_limit:
-                    # Record error in circuit breaker
-                    circuit_breaker.record_error(is_rate_limit=True)
-                    
-                    # CIRCUIT-AWARE: If circuit just opened, don't retry - fallback immediately
-                    if not circuit_breaker.can_proceed():
-                        logger.warning("Circuit breaker OPEN after 429 - skipping retries, falling back")
-                        if self.groq_client and hasattr(self.groq_client, '_call_groq') and not image_path:
-                            groq_response = self.groq_client._call_groq(prompt, use_cache=use_cache)
-                            if groq_response:
-                                return groq_response
-                        return None
-                    
-                    # Signal rate limit detection to app.py
-                    if _rate_limit_callback:
-                        try:
-                            _rate_limit_callback()
-                        except Exception as cb_error:
-                            logger.warning(f"Rate limit callback failed: {cb_error}")
-                    
-                    # Extract retry delay from error message if available
-                    retry_delay = self._extract_retry_delay(error_str)
-                    if retry_delay:
-                        # Use extracted delay, but ensure minimum 5 seconds
-                        delay = max(retry_delay, 5.0)
-                        logger.warning(
-                            f"Rate limit hit. Waiting {delay:.1f}s before retry "
-                            f"(attempt {attempt + 1}/{max_retries})"
-                        )
-                        time.sleep(delay)
-                    else:
-                        # Exponential backoff: base * (2^attempt), max 60 seconds
-                        base_delay = 2.0  # Start at 2s for Gemini
-                        delay = min(base_delay * (2 ** attempt), 60)
-                        logger.warning(
-                            f"Rate limit hit. Waiting {delay:.1f}s before retry "
-                            f"(attempt {attempt + 1}/{max_retries})"
-                        )
-                        time.sleep(delay)
-                    
-                    # Re-acquire rate limiter after waiting
-                    rate_limiter.acquire(wait=True, estimated_tokens=estimated_tokens)
-                else:
-                    logger.warning(f"Gemini API call failed (attempt {attempt + 1}/{max_retries}): {e}")
-                    # Small delay before retry for non-rate-limit errors
-                    time.sleep(1)
+                return self._accept_response(response, circuit_breaker, cache_key)
                 
-                # Only try Groq as LAST RESORT after all Gemini retries fail
-                if attempt == max_retries - 1:
-                    logger.warning("All Gemini API retry attempts failed, trying Groq as last resort...")
-                    # Fallback to Groq ONLY if Gemini completely fails
-                    if self.groq_client and hasattr(self.groq_client, 'client') and self.groq_client.client:
-                        logger.info("Falling back to Groq API as last resort")
-                        # For image analysis, Groq uses a different approach (text-based for now)
-                        if image_path:
-                            logger.warning("Groq fallback for image analysis may have limited capabilities")
-                            try:
-                                groq_response = self.groq_client._call_groq(prompt, model=self.groq_client.image_model, use_cache=use_cache)
-                                if groq_response:
-                                    logger.info("Groq fallback succeeded for image analysis")
-                                    return groq_response
-                            except Exception as e:
-                                logger.warning(f"Groq fallback for image analysis failed: {e}")
-                        else:
-                            # Text-based call with Groq
-                            try:
-                                groq_response = self.groq_client._call_groq(prompt, model=self.groq_client.text_model, use_cache=use_cache)
-                                if groq_response:
-                                    logger.info("Groq fallback succeeded for text call")
-                                    return groq_response
-                            except Exception as e:
-                                logger.warning(f"Groq fallback for text call failed: {e}")
-                    
-                    logger.error("Both Gemini and Groq API calls failed")
-                    return None
+            except Exception as e:
+                action, delay = self._attempt_failed(e, attempt, max_retries, circuit_breaker)
+                if action == "circuit_fallback":
+                    return await asyncio.to_thread(self._circuit_fallback, prompt, image_path, use_cache)
+                if action == "last_resort":
+                    return await asyncio.to_thread(self._groq_last_resort, prompt, image_path, use_cache)
+                await asyncio.sleep(delay)
         
         return None
     
-    def _extract_retry_delay(self, error_str: str) -> Optional[float]:
-        """Extract retry delay from error message."""
-        # Look for patterns like "retry_delay { seconds: 49 }" or "retry in 49.42s"
-        patterns = [
-            r'retry_delay\s*\{\s*seconds:\s*(\d+)',
-            r'retry in (\d+\.?\d*)\s*s',
-            r'wait (\d+\.?\d*)\s*seconds?',
-            r'retry after (\d+\.?\d*)\s*s',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, error_str, re.IGNORECASE)
-            if match:
-                try:
-                    return float(match.group(1))
-                except (ValueError, IndexError):
-                    continue
+    async def run_batch(
+        self,
+        prompts: List[str],
+        image_paths: Optional[List[Optional[Path]]] = None,
+        use_cache: bool = True
+    ) -> List[Optional[str]]:
+        """
+        Run several prompts concurrently; results are in prompt order.
         
+        Args:
+            prompts: Prompt texts
+            image_paths: Optional image per prompt (None entries for text-only prompts)
+            use_cache: Whether to use response cache
+        """
+        if image_paths is None:
+            image_paths = [None] * len(prompts)
+        return await asyncio.gather(*[
+            self._call_gemini_async(prompt, image_path=image_path, use_cache=use_cache)
+            for prompt, image_path in zip(prompts, image_paths)
+        ])
+    
+    @staticmethod
+    def _structured_retry_delay(error: Exception) -> Optional[float]:
+        """
+        Retry delay from a google-genai APIError: the RetryInfo detail in the
+        error body (e.g. "retryDelay": "49s"), else the Retry-After header.
+        """
+        details = getattr(error, 'details', None)
+        if isinstance(details, dict):
+            error_body = details.get('error', details)
+            for detail in error_body.get('details') or ():
+                if isinstance(detail, dict) and str(detail.get('@type', '')).endswith('RetryInfo'):
+                    try:
+                        return float(str(detail.get('retryDelay', '')).rstrip('s'))
+                    except ValueError:
+                        break
+        
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+        if headers is not None:
+            try:
+                return float(headers.get('Retry-After'))
+            except (TypeError, ValueError):
+                pass  # Missing, or an HTTP date
         return None
     
+    def _extract_retry_delay(self, error_str: str) -> Optional[float]:
+        """Extract retry delay from error message."""
+        match = _RETRY_DELAY_RE.search(error_str)
+        if not match:
+            return None
+        return float(next(group for group in match.groups() if group))
+    
+    @staticmethod
+    def _theme_alignment_prompt(title: str, objectives: str, learning_outcomes: str, theme: str) -> str:
+        """Prompt for check_theme_alignment."""
+        return f"""You are a validation system. Determine if the following event details align with the specified theme.
+
+Theme: {theme}
+
+Event Title: {title}
+Objectives: {objectives}
+Learning Outcomes: {learning_outcomes}
+
+Task: Determine if the title, objectives, and learning outcomes are semantically aligned with the theme.
+
+Respond with ONLY one word: "YES" if aligned, "NO" if not aligned."""
+    
+    def _theme_alignment_match_key(self, title: str, objectives: str, learning_outcomes: str, theme: str) -> str:
+        """
+        Cache key for a theme check that ignores case, spacing and acronym dots,
+        so rephrasings like "A.I. in Healthcare" / "AI in  healthcare" share an answer.
+        """
+        normalized = "\x1f".join(
+            " ".join(self._strip_acronym_dots(field or "").casefold().split())
+            for field in (theme, title, objectives, learning_outcomes)
+        )
+        # v2: keys from the earlier all-punctuation-stripping normalization are not reused
+        return self._get_cache_key(f"theme_alignment_match_v2:{normalized}", self.text_model)
+    
+    @staticmethod
+    def _strip_acronym_dots(text: str) -> str:
+        """Drop the separators inside dotted/hyphenated acronyms ("A.I." -> "AI")."""
+        return _MATCH_ACRONYM_RE.sub(lambda m: _MATCH_ACRONYM_SEP_RE.sub("", m.group()), text)
+    
     def check_theme_alignment(
         self,
         title: str,
@@ -394,23 +1072,121 @@ class GeminiClient:
         OPTIMIZED: Uses Gemini by default (150 RPM) for better throughput.
         Parallel fallback: If Gemini fails, tries both Gemini retry and Groq simultaneously.
         """
-        prompt = f"""You are a validation system. Determine if the following event details align with the specified theme.
-
+        return self.check_theme_alignment_batch([(title, objectives, learning_outcomes, theme)])[0]
+    
+    def check_theme_alignment_batch(
+        self,
+        items: List[Tuple[str, str, str, str]],
+        batch_size: int = THEME_BATCH_SIZE
+    ) -> List[bool]:
+        """
+        Check theme alignment for many events with one Gemini call per batch_size items.
+        
+        Args:
+            items: (title, objectives, learning_outcomes, theme) per event
+            batch_size: Max events per prompt
+        
+        Returns:
+            Alignment per item, in order. Each result is cached under the item's
+            single-check prompt and its normalized match key, so cached items
+            never go into a batch prompt and check_theme_alignment shares the
+            same cache entries.
+        """
+        results: List[Optional[bool]] = [None] * len(items)
+        pending = []  # (index, single-item prompt, cache key, normalized match key)
+        for i, item in enumerate(items):
+            prompt = self._theme_alignment_prompt(*item)
+            cache_key = self._get_cache_key(prompt, self.text_model)
+            match_key = self._theme_alignment_match_key(*item)
+            cached_response = _gemini_response_cache.get(cache_key) or _gemini_response_cache.get(match_key)
+            if cached_response is not None:
+                results[i] = "YES" in cached_response.upper()
+            else:
+                pending.append((i, prompt, cache_key, match_key))
+        
+        for start in range(0, len(pending), max(batch_size, 1)):
+            chunk = pending[start:start + batch_size]
+            answers = self._theme_alignment_batch_call([items[i] for i, _, _, _ in chunk]) if len(chunk) > 1 else {}
+            
+            for number, (i, prompt, cache_key, match_key) in enumerate(chunk, 1):
+                if number in answers:
+                    results[i] = answers[number]
+                    _gemini_response_cache.set(cache_key, "YES" if answers[number] else "NO")
+                    _gemini_response_cache.set(match_key, "YES" if answers[number] else "NO")
+                    continue
+                
+                # Single item, or missing from the batch answer: regular check with fallbacks
+                response = self._call_gemini(prompt, use_cache=True)
+                if response:
+                    results[i] = "YES" in response.upper()
+                    _gemini_response_cache.set(match_key, "YES" if results[i] else "NO")
+                else:
+                    results[i] = self._theme_alignment_fallback(prompt, *items[i])
+        
+        return results
+    
+    def _theme_alignment_batch_call(self, items: List[Tuple[str, str, str, str]]) -> Dict[int, bool]:
+        """One Gemini call for several theme checks; returns {item number (1-based): aligned}."""
+        sections = "\n\n".join(
+            f"""{number})
 Theme: {theme}
-
 Event Title: {title}
 Objectives: {objectives}
-Learning Outcomes: {learning_outcomes}
+Learning Outcomes: {learning_outcomes}"""
+            for number, (title, objectives, learning_outcomes, theme) in enumerate(items, 1)
+        )
+        prompt = f"""You are a validation system. For each numbered event below, determine if its title, objectives, and learning outcomes are semantically aligned with its theme.
 
-Task: Determine if the title, objectives, and learning outcomes are semantically aligned with the theme.
+{sections}
 
-Respond with ONLY one word: "YES" if aligned, "NO" if not aligned."""
+Respond with exactly one line per event, in order, and nothing else:
+1: YES or NO
+2: YES or NO
+..."""
         
-        # Primary: Try Gemini first
         response = self._call_gemini(prompt, use_cache=True)
+        if not response:
+            logger.warning(f"Batched theme alignment failed for {len(items)} events, checking individually")
+            return {}
+        
+        answers = {}
+        for number, answer in _THEME_BATCH_RE.findall(response):
+            number = int(number)
+            if 1 <= number <= len(items):
+                answers[number] = answer.upper() == "YES"
+        return answers
+    
+    async def check_theme_alignment_async(
+        self,
+        title: str,
+        objectives: str,
+        learning_outcomes: str,
+        theme: str
+    ) -> bool:
+        """Async variant of check_theme_alignment."""
+        prompt = self._theme_alignment_prompt(title, objectives, learning_outcomes, theme)
+        match_key = self._theme_alignment_match_key(title, objectives, learning_outcomes, theme)
+        cached_response = _gemini_response_cache.get(match_key)
+        if cached_response is not None:
+            return "YES" in cached_response.upper()
+        
+        response = await self._call_gemini_async(prompt, use_cache=True)
         if response:
-            return "YES" in response.upper()
+            aligned = "YES" in response.upper()
+            _gemini_response_cache.set(match_key, "YES" if aligned else "NO")
+            return aligned
         
+        return await self._theme_alignment_fallback_async(prompt, title, objectives, learning_outcomes, theme)
+    
+    def _theme_alignment_fallback(
+        self,
+        prompt: str,
+        title: str,
+        objectives: str,
+        learning_outcomes: str,
+        theme: str
+    ) -> bool:
+        """Race a Gemini retry against Groq after the primary theme check failed."""
         # Fallback: If Gemini fails, try both Gemini retry and Groq simultaneously
         logger.warning("Gemini theme alignment failed, attempting parallel fallback (Gemini retry + Groq)")
         
@@ -422,49 +1198,97 @@ Respond with ONLY one word: "YES" if aligned, "NO" if not aligned."""
                 logger.debug(f"Gemini retry failed: {e}")
                 return None
         
-        def try_groq() -> Optional[bool]:
-            """Try Groq as fallback."""
-            if not self.groq_client or not hasattr(self.groq_client, 'check_theme_alignment'):
-                return None
+        # Execute both fallbacks in parallel
+        futures = {
+            _FALLBACK_POOL.submit(try_gemini_retry): 'gemini',
+            _FALLBACK_POOL.submit(self._groq_theme_alignment, title, objectives, learning_outcomes, theme): 'groq'
+        }
+        
+        # Wait for first successful response
+        for future in as_completed(futures):
+            source = futures[future]
             try:
-                logger.debug("Trying Groq as parallel fallback")
-                return self.groq_client.check_theme_alignment(title, objectives, learning_outcomes, theme)
+                result = future.result(timeout=30)  # 30 second timeout per call
+                if result is not None:
+                    if source == 'gemini':
+                        # Gemini returns string response
+                        if isinstance(result, str) and result:
+                            aligned = "YES" in result.upper()
+                            logger.info(f"Theme alignment: Gemini retry succeeded")
+                            return aligned
+                    elif source == 'groq':
+                        # Groq returns boolean directly
+                        if isinstance(result, bool):
+                            logger.info(f"Theme alignment: Groq fallback succeeded")
+                            return result
             except Exception as e:
-                logger.debug(f"Groq fallback failed: {e}")
-                return None
-        
-        # Execute both fallbacks in parallel
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            futures = {
-                executor.submit(try_gemini_retry): 'gemini',
-                executor.submit(try_groq): 'groq'
-            }
-            
-            # Wait for first successful response
-            for future in as_completed(futures):
-                source = futures[future]
-                try:
-                    result = future.result(timeout=30)  # 30 second timeout per call
-                    if result is not None:
-                        if source == 'gemini':
-                            # Gemini returns string response
-                            if isinstance(result, str) and result:
-                                aligned = "YES" in result.upper()
-                                logger.info(f"Theme alignment: Gemini retry succeeded")
-                                return aligned
-                        elif source == 'groq':
-                            # Groq returns boolean directly
-                            if isinstance(result, bool):
-                                logger.info(f"Theme alignment: Groq fallback succeeded")
-                                return result
-                except Exception as e:
-                    logger.debug(f"Fallback call from {source} failed: {e}")
-                    continue
+                logger.debug(f"Fallback call from {source} failed: {e}")
+                continue
         
         # If all fallbacks failed
         logger.warning("All theme alignment checks failed (Gemini primary, Gemini retry, Groq fallback), defaulting to False")
         return False
     
+    async def _theme_alignment_fallback_async(
+        self,
+        prompt: str,
+        title: str,
+        objectives: str,
+        learning_outcomes: str,
+        theme: str
+    ) -> bool:
+        """Async variant of _theme_alignment_fallback: first usable answer wins, the other is cancelled."""
+        logger.warning("Gemini theme alignment failed, attempting parallel fallback (Gemini retry + Groq)")
+        
+        tasks = {
+            asyncio.ensure_future(self._call_gemini_async(prompt, use_cache=False)): 'gemini',
+            # Groq's SDK client is synchronous
+            asyncio.ensure_future(asyncio.to_thread(
+                self._groq_theme_alignment, title, objectives, learning_outcomes, theme
+            )): 'groq'
+        }
+        
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    source = tasks[task]
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.debug(f"Fallback call from {source} failed: {e}")
+                        continue
+                    if source == 'gemini' and isinstance(result, str) and result:
+                        logger.info(f"Theme alignment: Gemini retry succeeded")
+                        return "YES" in result.upper()
+                    if source == 'groq' and isinstance(result, bool):
+                        logger.info(f"Theme alignment: Groq fallback succeeded")
+                        return result
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        logger.warning("All theme alignment checks failed (Gemini primary, Gemini retry, Groq fallback), defaulting to False")
+        return False
+    
+    def _groq_theme_alignment(
+        self,
+        title: str,
+        objectives: str,
+        learning_outcomes: str,
+        theme: str
+    ) -> Optional[bool]:
+        """Theme check on Groq for the fallback race (None if unavailable or failed)."""
+        if not self.groq_client or not hasattr(self.groq_client, 'check_theme_alignment'):
+            return None
+        try:
+            logger.debug("Trying Groq as parallel fallback")
+            return self.groq_client.check_theme_alignment(title, objectives, learning_outcomes, theme)
+        except Exception as e:
+            logger.debug(f"Groq fallback failed: {e}")
+            return None
+    
     def check_pdf_consistency(
         self,
         pdf_text: str,
@@ -477,17 +1301,27 @@ Respond with ONLY one word: "YES" if aligned, "NO" if not aligned."""
         Check PDF text for consistency with expected values.
         Returns dict with keys: title_match, objectives_match, learning_match, participants_valid
         """
-        results = {
-            "title_match": False,
-            "objectives_match": False,
-            "learning_match": False,
-            "participants_valid": False
-        }
-        
-        prompt = f"""You are a validation system. Analyze the following PDF text and check consistency.
+        prompt = self._pdf_consistency_prompt(
+            pdf_text, expected_title, expected_objectives, expected_learning_outcomes, expected_participants
+        )
+        response = self._call_gemini(prompt)
+        if not response:
+            logger.warning("PDF consistency check failed (Gemini and Groq fallback)")
+        return self._parse_pdf_consistency_response(response)
+    
+    @staticmethod
+    def _pdf_consistency_prompt(
+        pdf_text: str,
+        expected_title: Optional[str],
+        expected_objectives: Optional[str],
+        expected_learning_outcomes: Optional[str],
+        expected_participants: Optional[int]
+    ) -> str:
+        """Prompt for check_pdf_consistency."""
+        return f"""You are a validation system. Analyze the following PDF text and check consistency.
 
 PDF Text:
-{pdf_text[:3000]}  # Limit text length
+{_truncate_to_tokens(pdf_text, PDF_PROMPT_TOKENS)}
 
 Expected Title: {expected_title or 'Not provided'}
 Expected Objectives: {expected_objectives or 'Not provided'}
@@ -505,25 +1339,20 @@ TITLE_MATCH: YES or NO
 OBJECTIVES_MATCH: YES or NO
 LEARNING_MATCH: YES or NO
 PARTICIPANTS_VALID: YES or NO"""
+    
+    def _parse_pdf_consistency_response(self, response: Optional[str]) -> Dict[str, bool]:
+        """Parse the PDF consistency response (all False if the call failed)."""
+        results = {
+            "title_match": False,
+            "objectives_match": False,
+            "learning_match": False,
+            "participants_valid": False
+        }
         
-        response = self._call_gemini(prompt)
         if not response:
-            logger.warning("PDF consistency check failed (Gemini and Groq fallback)")
             return results
         
-        # Parse response
-        for line in response.split('\n'):
-            line = line.strip()
-            if 'TITLE_MATCH:' in line:
-                results["title_match"] = "YES" in line.upper()
-            elif 'OBJECTIVES_MATCH:' in line:
-                results["objectives_match"] = "YES" in line.upper()
-            elif 'LEARNING_MATCH:' in line:
-                results["learning_match"] = "YES" in line.upper()
-            elif 'PARTICIPANTS_VALID:' in line:
-                results["participants_valid"] = "YES" in line.upper()
-        
-        return results
+        return parse_pdf_consistency(response, results)
     
     def validate_pdf_comprehensive(
         self,
@@ -547,22 +1376,20 @@ PARTICIPANTS_VALID: YES or NO"""
         - reasoning: str
         """
         # Generate cache key using PDF content hash if provided
-        cache_key = None
-        if pdf_hash:
-            cache_key = self._get_cache_key(
-                f"pdf_validation:{expected_title}:{expected_objectives}:{expected_learning_outcomes}:{expected_participants}",
-                model=self.text_model,
-                pdf_hash=pdf_hash
-            )
+        cache_key = self._pdf_validation_cache_key(
+            expected_title, expected_objectives, expected_learning_outcomes, expected_participants, pdf_hash
+        )
+        if cache_key:
             # Check cache first (both raw response and parsed results)
-            if cache_key in _gemini_parsed_cache:
+            parsed_results = _gemini_parsed_cache.get(cache_key)
+            if parsed_results is not None:
                 logger.debug("PDF validation cache hit (parsed results)")
-                return _gemini_parsed_cache[cache_key]
-            elif cache_key in _gemini_response_cache:
+                return parsed_results
+            cached_response = _gemini_response_cache.get(cache_key)
+            if cached_response is not None:
                 logger.debug("PDF validation cache hit (raw response)")
-                cached_response = _gemini_response_cache[cache_key]
                 parsed_results = self._parse_pdf_validation_response(cached_response)
-                _gemini_parsed_cache[cache_key] = parsed_results
+                _gemini_parsed_cache.set(cache_key, parsed_results)
                 return parsed_results
         
         results = {
@@ -577,8 +1404,8 @@ PARTICIPANTS_VALID: YES or NO"""
         # Single comprehensive prompt for all PDF validations
         prompt = f"""You are validating a PDF report for an event submission. Analyze the PDF text and return ALL validation results in a single response.
 
-PDF Text (first 4000 characters):
-{pdf_text[:4000]}
+PDF Text (excerpt):
+{_truncate_to_tokens(pdf_text, PDF_VALIDATION_PROMPT_TOKENS)}
 
 Expected Metadata:
 - Title: {expected_title or 'Not specified'}
@@ -593,15 +1420,10 @@ Task: Validate ALL of the following in ONE analysis:
 4. Do the objectives in the PDF match the expected objectives? (semantic alignment)
 5. Does the PDF contain participant information indicating 15+ participants? (Look for participant count, attendance, number of attendees)
 
-Respond in this EXACT format (one line per check):
-TITLE_MATCH: YES or NO
-EXPERT_DETAILS: YES or NO
-LEARNING_OUTCOMES_ALIGN: YES or NO
-OBJECTIVES_MATCH: YES or NO
-PARTICIPANTS_VALID: YES or NO
-REASONING: <brief explanation of your findings>"""
+Respond with ONLY a JSON object in this exact shape:
+{{"title_match": true/false, "expert_details_present": true/false, "learning_outcomes_align": true/false, "objectives_match": true/false, "participants_valid": true/false, "reasoning": "<brief explanation of your findings>"}}"""
         
-        response = self._call_gemini(prompt, use_cache=True)
+        response = self._call_gemini(prompt, use_cache=True, response_schema=_PDF_VALIDATION_SCHEMA)
         if not response:
             logger.warning("Comprehensive PDF validation failed (Gemini and Groq fallback)")
             return results
@@ -609,14 +1431,55 @@ REASONING: <brief explanation of your findings>"""
         # Parse and cache the response
         parsed_results = self._parse_pdf_validation_response(response)
         if cache_key:
-            _gemini_response_cache[cache_key] = response
-            _gemini_parsed_cache[cache_key] = parsed_results
+            _gemini_response_cache.set(cache_key, response)
+            _gemini_parsed_cache.set(cache_key, parsed_results)
             logger.debug(f"Cached PDF validation results with key: {cache_key[:16]}...")
         
         return parsed_results
     
+    def _pdf_validation_cache_key(
+        self,
+        expected_title: Optional[str],
+        expected_objectives: Optional[str],
+        expected_learning_outcomes: Optional[str],
+        expected_participants: Optional[int],
+        pdf_hash: Optional[str]
+    ) -> Optional[str]:
+        """Cache key for validate_pdf_comprehensive results (None without a PDF hash)."""
+        if not pdf_hash:
+            return None
+        return self._get_cache_key(
+            f"pdf_validation:{expected_title}:{expected_objectives}:{expected_learning_outcomes}:{expected_participants}",
+            model=self.text_model,
+            pdf_hash=pdf_hash
+        )
+    
+    @staticmethod
+    def _parse_json_object(response: Optional[str]) -> Optional[Dict[str, Any]]:
+        """The JSON object in a response (fences and surrounding text ignored), or None."""
+        match = _JSON_OBJECT_RE.search(response or "")
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    
+    @staticmethod
+    def _json_flag(value: Any) -> bool:
+        """A JSON boolean field, also accepting "YES"/"true" strings."""
+        return value if isinstance(value, bool) else str(value).upper() in ("YES", "TRUE")
+    
+    @classmethod
+    def _pdf_validation_from_json(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        """validate_pdf_comprehensive results from a parsed JSON answer."""
+        results = {name: cls._json_flag(data.get(name)) for name in PDF_VALIDATION_FLAGS.values()}
+        results["reasoning"] = str(data.get("reasoning") or "")
+        return results
+    
     def _parse_pdf_validation_response(self, response: str) -> Dict[str, Any]:
-        """Parse the unified PDF validation response."""
+        """Parse the unified PDF validation response (JSON, or `KEY: YES/NO` lines)."""
         results = {
             "title_match": False,
             "expert_details_present": False,
@@ -626,22 +1489,12 @@ REASONING: <brief explanation of your findings>"""
             "reasoning": ""
         }
         
-        for line in response.split('\n'):
-            line = line.strip()
-            if 'TITLE_MATCH:' in line:
-                results["title_match"] = "YES" in line.upper()
-            elif 'EXPERT_DETAILS:' in line:
-                results["expert_details_present"] = "YES" in line.upper()
-            elif 'LEARNING_OUTCOMES_ALIGN:' in line:
-                results["learning_outcomes_align"] = "YES" in line.upper()
-            elif 'OBJECTIVES_MATCH:' in line:
-                results["objectives_match"] = "YES" in line.upper()
-            elif 'PARTICIPANTS_VALID:' in line:
-                results["participants_valid"] = "YES" in line.upper()
-            elif 'REASONING:' in line:
-                results["reasoning"] = line.split(':', 1)[1].strip() if ':' in line else ""
+        data = self._parse_json_object(response)
+        if data is not None:
+            return self._pdf_validation_from_json(data)
         
-        return results
+        # Not JSON (e.g. a Groq fallback answer or an older cached response): `KEY: YES/NO` lines
+        return parse_pdf_validation(response, results)
     
     def analyze_image(
         self,
@@ -663,16 +1516,6 @@ REASONING: <brief explanation of your findings>"""
             Dict with keys: has_banner, is_real_event, mode_matches, has_15_plus_participants,
             banner_text_matches, participant_count_estimate, detailed_reasoning
         """
-        results = {
-            "has_banner": False,
-            "is_real_event": False,
-            "mode_matches": False,
-            "has_15_plus_participants": False,
-            "banner_text_matches": False,
-            "participant_count_estimate": 0,
-            "detailed_reasoning": ""
-        }
-        
         # Ensure image_path is a Path object
         if not isinstance(image_path, Path):
             image_path = Path(image_path)
@@ -680,86 +1523,300 @@ REASONING: <brief explanation of your findings>"""
         # Check if file exists
         if not image_path.exists():
             logger.error(f"Image file does not exist: {image_path}")
-            return results
+            return self._empty_image_results()
+        
+        # Same image content and event context: reuse the earlier result (Gemini or Groq)
+        result_key = self._image_result_key(image_path, event_mode, event_title, event_theme)
+        cached_results = self._get_cached_image_results(result_key)
+        if cached_results is not None:
+            return cached_results
         
         # If Gemini client not available, try Groq fallback immediately
         if not self.client:
-            logger.warning("Gemini client not available for image analysis, trying Groq fallback...")
-            if self.groq_client and hasattr(self.groq_client, 'client') and self.groq_client.client:
+            results = self._image_groq_fallback(image_path, event_mode, event_title, event_theme, gemini_failed=False)
+        else:
+            prompt = self._image_analysis_prompt(event_mode, event_title, event_theme)
+            if self._can_race_image_analysis():
+                results = self._race_image_analysis(prompt, image_path, event_mode, event_title, event_theme)
+            else:
+                response = self._call_gemini(prompt, image_path=image_path, use_cache=False)
+                if response:
+                    results = self._parse_image_analysis_response(response)
+                else:
+                    results = self._image_groq_fallback(image_path, event_mode, event_title, event_theme, gemini_failed=True)
+        
+        self._cache_image_results(result_key, results)
+        return results
+    
+    async def analyze_image_async(
+        self,
+        image_path: Path,
+        event_mode: Optional[str] = None,
+        event_title: Optional[str] = None,
+        event_theme: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Async variant of analyze_image."""
+        if not isinstance(image_path, Path):
+            image_path = Path(image_path)
+        
+        if not image_path.exists():
+            logger.error(f"Image file does not exist: {image_path}")
+            return self._empty_image_results()
+        
+        result_key = await asyncio.to_thread(self._image_result_key, image_path, event_mode, event_title, event_theme)
+        cached_results = self._get_cached_image_results(result_key)
+        if cached_results is not None:
+            return cached_results
+        
+        if not self.client:
+            results = await asyncio.to_thread(
+                self._image_groq_fallback, image_path, event_mode, event_title, event_theme, False
+            )
+        else:
+            prompt = self._image_analysis_prompt(event_mode, event_title, event_theme)
+            if self._can_race_image_analysis():
+                results = await self._race_image_analysis_async(prompt, image_path, event_mode, event_title, event_theme)
+            else:
+                response = await self._call_gemini_async(prompt, image_path=image_path, use_cache=False)
+                if response:
+                    results = self._parse_image_analysis_response(response)
+                else:
+                    results = await asyncio.to_thread(
+                        self._image_groq_fallback, image_path, event_mode, event_title, event_theme, True
+                    )
+        
+        self._cache_image_results(result_key, results)
+        return results
+    
+    def _can_race_image_analysis(self) -> bool:
+        """Whether slow Gemini image analyses are raced against Groq."""
+        return (
+            self.image_race_after > 0
+            and self.groq_client is not None
+            and getattr(self.groq_client, 'client', None) is not None
+        )
+    
+    def _race_image_analysis(
+        self,
+        prompt: str,
+        image_path: Path,
+        event_mode: Optional[str],
+        event_title: Optional[str],
+        event_theme: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Run Gemini, and start Groq too if Gemini hasn't answered within image_race_after seconds.
+        
+        The first usable result wins. A Groq request that hasn't started yet is
+        cancelled; a running one finishes in the background (its answer is dropped).
+        """
+        gemini = _FALLBACK_POOL.submit(self._call_gemini, prompt, image_path=image_path, use_cache=False)
+        try:
+            response = gemini.result(timeout=self.image_race_after)
+        except FutureTimeoutError:
+            pass
+        except Exception as e:
+            logger.warning(f"Gemini image analysis failed: {e}")
+            return self._image_groq_fallback(image_path, event_mode, event_title, event_theme, gemini_failed=True)
+        else:
+            if response:
+                return self._parse_image_analysis_response(response)
+            return self._image_groq_fallback(image_path, event_mode, event_title, event_theme, gemini_failed=True)
+        
+        logger.info(f"Gemini image analysis slower than {self.image_race_after}s, racing Groq")
+        groq = _FALLBACK_POOL.submit(self._groq_image_analysis, image_path, event_mode, event_title, event_theme, False)
+        
+        pending = {gemini, groq}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
                 try:
-                    groq_results = self.groq_client.analyze_image(image_path, event_mode, event_title, event_theme)
-                    if groq_results and any(groq_results.values()):
-                        logger.info("Groq fallback succeeded for image analysis")
-                        return groq_results
+                    result = future.result()
                 except Exception as e:
-                    logger.warning(f"Groq fallback for image analysis failed: {e}")
-            logger.warning("Both Gemini and Groq clients unavailable for image analysis")
-            return results
+                    logger.debug(f"Raced image analysis call failed: {e}")
+                    continue
+                if future is gemini and result:
+                    groq.cancel()
+                    return self._parse_image_analysis_response(result)
+                if future is groq and result:
+                    logger.info("Groq won the image analysis race")
+                    gemini.cancel()
+                    return result
+        
+        logger.warning("Both Gemini and Groq image analysis failed")
+        return self._empty_image_results()
+    
+    async def _race_image_analysis_async(
+        self,
+        prompt: str,
+        image_path: Path,
+        event_mode: Optional[str],
+        event_title: Optional[str],
+        event_theme: Optional[str]
+    ) -> Dict[str, Any]:
+        """Async variant of _race_image_analysis; the losing request is cancelled."""
+        gemini = asyncio.ensure_future(self._call_gemini_async(prompt, image_path=image_path, use_cache=False))
+        done, _ = await asyncio.wait({gemini}, timeout=self.image_race_after)
+        if done:
+            try:
+                response = gemini.result()
+            except Exception as e:
+                logger.warning(f"Gemini image analysis failed: {e}")
+                response = None
+            if response:
+                return self._parse_image_analysis_response(response)
+            return await asyncio.to_thread(
+                self._image_groq_fallback, image_path, event_mode, event_title, event_theme, True
+            )
         
-        # Build comprehensive prompt for vision analysis
-        prompt = f"""You are analyzing an event photograph for validation purposes.
+        logger.info(f"Gemini image analysis slower than {self.image_race_after}s, racing Groq")
+        # Groq's SDK client is synchronous
+        groq = asyncio.ensure_future(asyncio.to_thread(
+            self._groq_image_analysis, image_path, event_mode, event_title, event_theme, False
+        ))
+        
+        pending = {gemini, groq}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.debug(f"Raced image analysis call failed: {e}")
+                        continue
+                    if task is gemini and result:
+                        return self._parse_image_analysis_response(result)
+                    if task is groq and result:
+                        logger.info("Groq won the image analysis race")
+                        return result
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        logger.warning("Both Gemini and Groq image analysis failed")
+        return self._empty_image_results()
+    
+    def _image_result_key(
+        self,
+        image_path: Path,
+        event_mode: Optional[str],
+        event_title: Optional[str],
+        event_theme: Optional[str]
+    ) -> Optional[str]:
+        """Cache key for analyze_image results: image content hash plus event context (None if unreadable)."""
+        image_data = self._read_image(image_path)
+        if image_data is None:
+            return None
+        try:
+            image_hash = self._compute_image_hash(image_data)
+        finally:
+            if isinstance(image_data, mmap.mmap):
+                image_data.close()
+        return self._get_cache_key(
+            f"image_analysis:{event_mode}:{event_title}:{event_theme}",
+            model=self.vision_model,
+            image_hash=image_hash
+        )
+    
+    def _get_cached_image_results(self, result_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Cached analyze_image results (a fresh dict), or None."""
+        if result_key is None:
+            return None
+        cached = _gemini_response_cache.get(result_key)
+        if cached is None:
+            return None
+        try:
+            results = json.loads(cached)
+        except ValueError:
+            return None
+        logger.debug(f"Image analysis cache hit with key: {result_key[:16]}...")
+        return results
+    
+    def _cache_image_results(self, result_key: Optional[str], results: Dict[str, Any]):
+        """Store analyze_image results persistently, unless every check failed."""
+        if result_key is not None and results != self._empty_image_results():
+            _gemini_response_cache.set(result_key, json.dumps(results))
+    
+    @staticmethod
+    def _empty_image_results() -> Dict[str, Any]:
+        """Default (all failed) image analysis results."""
+        return {
+            "has_banner": False,
+            "is_real_event": False,
+            "mode_matches": False,
+            "has_15_plus_participants": False,
+            "banner_text_matches": False,
+            "participant_count_estimate": 0,
+            "detailed_reasoning": ""
+        }
+    
+    @staticmethod
+    def _image_analysis_prompt(
+        event_mode: Optional[str],
+        event_title: Optional[str],
+        event_theme: Optional[str]
+    ) -> str:
+        """Build comprehensive prompt for vision analysis (static instructions first, event context last)."""
+        return f"""{GeminiClient._IMAGE_PROMPT_PREFIX}
 
 Event Context:
 - Title: {event_title or 'Not specified'}
 - Theme: {event_theme or 'Not specified'}
-- Expected Mode: {event_mode or 'Not specified'}
-
-Task: Analyze the image and determine:
-1. Does the image show a banner or poster with text? If yes, does the banner text match the event title/theme?
-2. Does the image depict a real event/activity (not stock photo, not staged, not just a poster)?
-3. Does the event mode (online/offline) match what's visible in the image?
-   - Online: screens, video calls, virtual backgrounds, remote participants
-   - Offline: physical venue, in-person attendees, physical setup
-4. How many participants are visible? Provide an estimate.
-5. Is this clearly a real event scene with actual activity?
-
-Respond in this exact format:
-HAS_BANNER: YES or NO
-BANNER_TEXT_MATCHES: YES or NO
-IS_REAL_EVENT: YES or NO
-MODE_MATCHES: YES or NO
-PARTICIPANT_COUNT: <number>
-HAS_15_PLUS_PARTICIPANTS: YES or NO
-REASONING: <brief explanation>"""
-        
-        response = self._call_gemini(prompt, image_path=image_path, use_cache=False)
-        if not response:
+- Expected Mode: {event_mode or 'Not specified'}"""
+    
+    def _image_groq_fallback(
+        self,
+        image_path: Path,
+        event_mode: Optional[str],
+        event_title: Optional[str],
+        event_theme: Optional[str],
+        gemini_failed: bool
+    ) -> Dict[str, Any]:
+        """Analyze the image with Groq when Gemini is unavailable or failed."""
+        if gemini_failed:
             logger.warning("Gemini image analysis failed, trying Groq fallback...")
-            # Fallback to Groq for image analysis
-            if self.groq_client and hasattr(self.groq_client, 'client') and self.groq_client.client:
-                try:
-                    groq_results = self.groq_client.analyze_image(image_path, event_mode, event_title, event_theme)
-                    if groq_results and (any(groq_results.values()) or groq_results.get("detailed_reasoning")):
-                        logger.info("Groq fallback succeeded for image analysis")
-                        return groq_results
-                except Exception as e:
-                    logger.warning(f"Groq fallback for image analysis failed: {e}")
-            logger.warning("Both Gemini and Groq image analysis failed")
-            return results
+        else:
+            logger.warning("Gemini client not available for image analysis, trying Groq fallback...")
         
-        # Parse response
-        for line in response.split('\n'):
-            line = line.strip()
-            if 'HAS_BANNER:' in line:
-                results["has_banner"] = "YES" in line.upper()
-            elif 'BANNER_TEXT_MATCHES:' in line:
-                results["banner_text_matches"] = "YES" in line.upper()
-            elif 'IS_REAL_EVENT:' in line:
-                results["is_real_event"] = "YES" in line.upper()
-            elif 'MODE_MATCHES:' in line:
-                results["mode_matches"] = "YES" in line.upper()
-            elif 'PARTICIPANT_COUNT:' in line:
-                try:
-                    count_str = line.split(':')[1].strip()
-                    results["participant_count_estimate"] = int(count_str)
-                except (ValueError, IndexError):
-                    pass
-            elif 'HAS_15_PLUS_PARTICIPANTS:' in line:
-                results["has_15_plus_participants"] = "YES" in line.upper()
-            elif 'REASONING:' in line:
-                results["detailed_reasoning"] = line.split(':', 1)[1].strip() if ':' in line else ""
+        groq_results = self._groq_image_analysis(image_path, event_mode, event_title, event_theme, gemini_failed)
+        if groq_results is not None:
+            logger.info("Groq fallback succeeded for image analysis")
+            return groq_results
         
-        return results
+        if gemini_failed:
+            logger.warning("Both Gemini and Groq image analysis failed")
+        else:
+            logger.warning("Both Gemini and Groq clients unavailable for image analysis")
+        return self._empty_image_results()
+    
+    def _groq_image_analysis(
+        self,
+        image_path: Path,
+        event_mode: Optional[str],
+        event_title: Optional[str],
+        event_theme: Optional[str],
+        gemini_failed: bool
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Image analysis on Groq (None if unavailable, failed or empty).
+        
+        With gemini_failed, a result that only carries reasoning is accepted too.
+        """
+        if not (self.groq_client and hasattr(self.groq_client, 'client') and self.groq_client.client):
+            return None
+        try:
+            groq_results = self.groq_client.analyze_image(image_path, event_mode, event_title, event_theme)
+        except Exception as e:
+            logger.warning(f"Groq fallback for image analysis failed: {e}")
+            return None
+        if groq_results and (any(groq_results.values()) or (gemini_failed and groq_results.get("detailed_reasoning"))):
+            return groq_results
+        return None
+    
+    def _parse_image_analysis_response(self, response: str) -> Dict[str, Any]:
+        """Parse the image analysis response."""
+        return parse_image_analysis(response, self._empty_image_results())
     
     def analyze_pdf_with_vision(
         self,
@@ -782,6 +1839,45 @@ REASONING: <brief explanation>"""
         Returns:
             Dict with validation results and detailed reasoning
         """
+        prompt = self._pdf_vision_prompt(pdf_text, expected_title, expected_objectives, expected_learning_outcomes, theme)
+        response = self._call_gemini(prompt)
+        return self._parse_pdf_vision_response(response)
+    
+    async def analyze_pdf_with_vision_async(
+        self,
+        pdf_text: str,
+        expected_title: Optional[str],
+        expected_objectives: Optional[str],
+        expected_learning_outcomes: Optional[str],
+        theme: Optional[str]
+    ) -> Dict[str, Any]:
+        """Async variant of analyze_pdf_with_vision."""
+        prompt = self._pdf_vision_prompt(pdf_text, expected_title, expected_objectives, expected_learning_outcomes, theme)
+        response = await self._call_gemini_async(prompt)
+        return self._parse_pdf_vision_response(response)
+    
+    @staticmethod
+    def _pdf_vision_prompt(
+        pdf_text: str,
+        expected_title: Optional[str],
+        expected_objectives: Optional[str],
+        expected_learning_outcomes: Optional[str],
+        theme: Optional[str]
+    ) -> str:
+        """Prompt for analyze_pdf_with_vision (static instructions first, PDF excerpt last)."""
+        return f"""{GeminiClient._PDF_PROMPT_PREFIX}
+
+Expected Context:
+- Title: {expected_title or 'Not specified'}
+- Objectives: {expected_objectives or 'Not specified'}
+- Learning Outcomes: {expected_learning_outcomes or 'Not specified'}
+- Theme: {theme or 'Not specified'}
+
+PDF Content (excerpt):
+{_truncate_to_tokens(pdf_text, PDF_PROMPT_TOKENS)}"""
+    
+    def _parse_pdf_vision_response(self, response: Optional[str]) -> Dict[str, Any]:
+        """Parse the PDF analysis response (all False if the call failed)."""
         results = {
             "title_match": False,
             "objectives_match": False,
@@ -792,55 +1888,98 @@ REASONING: <brief explanation>"""
             "detailed_reasoning": ""
         }
         
-        prompt = f"""You are validating a PDF report for an event submission.
+        if not response:
+            logger.warning("PDF vision analysis failed (Gemini and Groq fallback)")
+            return results
+        
+        return parse_pdf_vision(response, results)
+    
+    def validate_event_all(
+        self,
+        title: str,
+        objectives: str,
+        learning_outcomes: str,
+        theme: str,
+        pdf_text: str,
+        expected_title: Optional[str],
+        expected_objectives: Optional[str],
+        expected_learning_outcomes: Optional[str],
+        expected_participants: Optional[int],
+        pdf_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Run check_theme_alignment and validate_pdf_comprehensive for one event in
+        a single Gemini call with a JSON-schema response.
+        
+        Answers are stored under the individual methods' cache keys, so later
+        check_theme_alignment / validate_pdf_comprehensive calls for the same
+        event are cache hits. If either part is already cached (or the combined
+        answer is unusable), that part goes through its individual method.
+        
+        Returns:
+            validate_pdf_comprehensive's dict plus theme_aligned: bool
+        """
+        theme_prompt = self._theme_alignment_prompt(title, objectives, learning_outcomes, theme)
+        theme_key = self._get_cache_key(theme_prompt, self.text_model)
+        match_key = self._theme_alignment_match_key(title, objectives, learning_outcomes, theme)
+        pdf_key = self._pdf_validation_cache_key(
+            expected_title, expected_objectives, expected_learning_outcomes, expected_participants, pdf_hash
+        )
+        theme_cached = _gemini_response_cache.get(theme_key) is not None or _gemini_response_cache.get(match_key) is not None
+        pdf_cached = pdf_key is not None and (
+            _gemini_parsed_cache.get(pdf_key) is not None or _gemini_response_cache.get(pdf_key) is not None
+        )
+        
+        data = None
+        if not (theme_cached or pdf_cached):
+            prompt = f"""You are validating one event submission: its theme alignment and its PDF report. Return ALL results in a single response.
 
-Expected Context:
+Theme: {theme}
+
+Event Title: {title}
+Objectives: {objectives}
+Learning Outcomes: {learning_outcomes}
+
+PDF Text (excerpt):
+{_truncate_to_tokens(pdf_text, PDF_VALIDATION_PROMPT_TOKENS)}
+
+Expected PDF Metadata:
 - Title: {expected_title or 'Not specified'}
 - Objectives: {expected_objectives or 'Not specified'}
 - Learning Outcomes: {expected_learning_outcomes or 'Not specified'}
-- Theme: {theme or 'Not specified'}
-
-PDF Content (first 3000 characters):
-{pdf_text[:3000]}
+- Expected Participants: {expected_participants or 'Not specified (needs 15+)'}
 
-Task: Validate the PDF content and determine:
-1. Does the PDF title match the expected title (fuzzy match acceptable)?
-2. Do the PDF objectives align with expected objectives?
-3. Do the PDF learning outcomes align with expected learning outcomes?
-4. Are expert details present (name, designation, affiliation)?
-5. Does the PDF contain participant information indicating 15+ participants?
-6. Does the overall content align with the declared theme?
+Task: Determine ALL of the following in ONE analysis:
+1. Are the event title, objectives, and learning outcomes semantically aligned with the theme?
+2. Does the PDF title match the expected title? (fuzzy/semantic match acceptable)
+3. Are expert details present? (Look for: expert name, designation, affiliation, speaker, facilitator, resource person, keynote speaker, presenter)
+4. Do the learning outcomes in the PDF align with the expected learning outcomes? (semantic alignment)
+5. Do the objectives in the PDF match the expected objectives? (semantic alignment)
+6. Does the PDF contain participant information indicating 15+ participants? (Look for participant count, attendance, number of attendees)
 
-Respond in this exact format:
-TITLE_MATCH: YES or NO
-OBJECTIVES_MATCH: YES or NO
-LEARNING_MATCH: YES or NO
-EXPERT_DETAILS: YES or NO
-PARTICIPANTS_VALID: YES or NO
-THEME_ALIGNMENT: YES or NO
-REASONING: <detailed explanation>"""
+Respond with ONLY a JSON object in this exact shape:
+{{"theme_aligned": true/false, "title_match": true/false, "expert_details_present": true/false, "learning_outcomes_align": true/false, "objectives_match": true/false, "participants_valid": true/false, "reasoning": "<brief explanation of your findings>"}}"""
+            
+            response = self._call_gemini(prompt, use_cache=True, response_schema=_EVENT_ALL_SCHEMA)
+            data = self._parse_json_object(response)
+            if data is None or "theme_aligned" not in data:
+                logger.warning("Combined event validation failed, falling back to separate calls")
+                data = None
         
-        response = self._call_gemini(prompt)
-        if not response:
-            logger.warning("PDF vision analysis failed (Gemini and Groq fallback)")
+        if data is None:
+            results = dict(self.validate_pdf_comprehensive(
+                pdf_text, expected_title, expected_objectives, expected_learning_outcomes, expected_participants, pdf_hash
+            ))
+            results["theme_aligned"] = self.check_theme_alignment(title, objectives, learning_outcomes, theme)
             return results
         
-        # Parse response
-        for line in response.split('\n'):
-            line = line.strip()
-            if 'TITLE_MATCH:' in line:
-                results["title_match"] = "YES" in line.upper()
-            elif 'OBJECTIVES_MATCH:' in line:
-                results["objectives_match"] = "YES" in line.upper()
-            elif 'LEARNING_MATCH:' in line:
-                results["learning_match"] = "YES" in line.upper()
-            elif 'EXPERT_DETAILS:' in line:
-                results["expert_details_present"] = "YES" in line.upper()
-            elif 'PARTICIPANTS_VALID:' in line:
-                results["participants_valid"] = "YES" in line.upper()
-            elif 'THEME_ALIGNMENT:' in line:
-                results["theme_alignment"] = "YES" in line.upper()
-            elif 'REASONING:' in line:
-                results["detailed_reasoning"] = line.split(':', 1)[1].strip() if ':' in line else ""
+        results = self._pdf_validation_from_json(data)
+        results["theme_aligned"] = self._json_flag(data["theme_aligned"])
+        
+        answer = "YES" if results["theme_aligned"] else "NO"
+        _gemini_response_cache.set(theme_key, answer)
+        _gemini_response_cache.set(match_key, answer)
+        if pdf_key:
+            _gemini_parsed_cache.set(pdf_key, {k: v for k, v in results.items() if k != "theme_aligned"})
         
         return results
@@ -5,13 +5,14 @@ import os
 import time
 import re
 import base64
-import hashlib
 import threading
 from pathlib import Path
 from dotenv import load_dotenv
 from event_validator.utils.rate_limiter import get_groq_rate_limiter
 from event_validator.utils.circuit_breaker import get_groq_circuit_breaker
 from event_validator.utils.concurrency import groq_concurrency_guard
+from event_validator.utils.response_cache import get_response_cache, content_digest
+from event_validator.utils.response_parsing import parse_image_analysis, parse_pdf_consistency, parse_pdf_vision
 
 # Load environment variables from .env file
 load_dotenv()
@@ -23,8 +24,8 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-# Global cache for Groq API responses (keyed by content hash)
-_groq_response_cache: Dict[str, str] = {}
+# Cache for Groq API responses (keyed by content hash), shared with the Gemini client
+_groq_response_cache = get_response_cache()
 
 # Note: Concurrency control moved to utils/concurrency.py with groq_concurrency_guard
 # Default GROQ_MAX_CONCURRENT is now 1 to prevent burst 429s
@@ -61,7 +62,7 @@ class GroqClient:
     def _get_cache_key(self, prompt: str, model: Optional[str] = None) -> str:
         """Generate cache key for prompt and model."""
         content = f"{model or self.text_model}:{prompt}"
-        return hashlib.md5(content.encode()).hexdigest()
+        return content_digest(content.encode())
     
     def _call_groq(
         self,
@@ -87,9 +88,10 @@ class GroqClient:
         # Check cache first
         if use_cache:
             cache_key = self._get_cache_key(prompt, model)
-            if cache_key in _groq_response_cache:
+            cached_response = _groq_response_cache.get(cache_key)
+            if cached_response is not None:
                 logger.debug(f"Cache hit for prompt (model: {model})")
-                return _groq_response_cache[cache_key]
+                return cached_response
         
         # Check circuit breaker before making request
         circuit_breaker = get_groq_circuit_breaker()
@@ -138,7 +140,7 @@ class GroqClient:
                         # Cache response
                         if use_cache:
                             cache_key = self._get_cache_key(prompt, model)
-                            _groq_response_cache[cache_key] = response_text
+                            _groq_response_cache.set(cache_key, response_text)
                         return response_text
                     elif hasattr(message, 'text'):
                         response_text = message.text.strip()
@@ -147,7 +149,7 @@ class GroqClient:
                         # Cache response
                         if use_cache:
                             cache_key = self._get_cache_key(prompt, model)
-                            _groq_response_cache[cache_key] = response_text
+                            _groq_response_cache.set(cache_key, response_text)
                         return response_text
                 
                 return None
@@ -307,19 +309,7 @@ PARTICIPANTS_VALID: YES or NO"""
             logger.warning("Groq PDF consistency check failed")
             return results
         
-        # Parse response
-        for line in response.split('\n'):
-            line = line.strip()
-            if 'TITLE_MATCH:' in line:
-                results["title_match"] = "YES" in line.upper()
-            elif 'OBJECTIVES_MATCH:' in line:
-                results["objectives_match"] = "YES" in line.upper()
-            elif 'LEARNING_MATCH:' in line:
-                results["learning_match"] = "YES" in line.upper()
-            elif 'PARTICIPANTS_VALID:' in line:
-                results["participants_valid"] = "YES" in line.upper()
-        
-        return results
+        return parse_pdf_consistency(response, results)
     
     def _encode_image_to_base64(self, image_path: Path) -> Optional[str]:
         """Encode image file to base64 string."""
@@ -410,29 +400,7 @@ REASONING: <brief explanation>"""
             logger.warning("Groq image analysis failed")
             return results
         
-        # Parse response
-        for line in response.split('\n'):
-            line = line.strip()
-            if 'HAS_BANNER:' in line:
-                results["has_banner"] = "YES" in line.upper()
-            elif 'BANNER_TEXT_MATCHES:' in line:
-                results["banner_text_matches"] = "YES" in line.upper()
-            elif 'IS_REAL_EVENT:' in line:
-                results["is_real_event"] = "YES" in line.upper()
-            elif 'MODE_MATCHES:' in line:
-                results["mode_matches"] = "YES" in line.upper()
-            elif 'PARTICIPANT_COUNT:' in line:
-                try:
-                    count_str = line.split(':')[1].strip()
-                    results["participant_count_estimate"] = int(count_str)
-                except (ValueError, IndexError):
-                    pass
-            elif 'HAS_15_PLUS_PARTICIPANTS:' in line:
-                results["has_15_plus_participants"] = "YES" in line.upper()
-            elif 'REASONING:' in line:
-                results["detailed_reasoning"] = line.split(':', 1)[1].strip() if ':' in line else ""
-        
-        return results
+        return parse_image_analysis(response, results)
     
     def analyze_pdf_with_vision(
         self,
@@ -498,23 +466,5 @@ REASONING: <detailed explanation>"""
             logger.warning("Groq PDF vision analysis failed")
             return results
         
-        # Parse response
-        for line in response.split('\n'):
-            line = line.strip()
-            if 'TITLE_MATCH:' in line:
-                results["title_match"] = "YES" in line.upper()
-            elif 'OBJECTIVES_MATCH:' in line:
-                results["objectives_match"] = "YES" in line.upper()
-            elif 'LEARNING_MATCH:' in line:
-                results["learning_match"] = "YES" in line.upper()
-            elif 'EXPERT_DETAILS:' in line:
-                results["expert_details_present"] = "YES" in line.upper()
-            elif 'PARTICIPANTS_VALID:' in line:
-                results["participants_valid"] = "YES" in line.upper()
-            elif 'THEME_ALIGNMENT:' in line:
-                results["theme_alignment"] = "YES" in line.upper()
-            elif 'REASONING:' in line:
-                results["detailed_reasoning"] = line.split(':', 1)[1].strip() if ':' in line else ""
-        
-        return results
+        return parse_pdf_vision(response, results)
 
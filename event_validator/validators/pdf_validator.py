@@ -1,6 +1,6 @@
 """PDF validation using hardcoded rules and Gemini."""
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 import hashlib
 
 from event_validator.types import ValidationResult, EventSubmission
@@ -240,24 +240,13 @@ def validate_participant_info_match(
         )
 
 
-def validate_pdf(submission: EventSubmission, gemini_client: GeminiClient) -> List[ValidationResult]:
+def pdf_validation_inputs(submission: EventSubmission) -> Optional[Dict[str, Any]]:
     """
-    OPTIMIZED: Run all PDF validations using a single unified API call.
-    This replaces 5 separate calls with 1 call, providing ~3-4x speedup.
+    Keyword arguments of GeminiClient.validate_pdf_comprehensive for a submission,
+    or None if no PDF text was extracted.
     """
-    results = []
-    
-    # Pre-check: If PDF data is missing, return all failures immediately (pre-scoring gate)
     if not submission.pdf_data or not submission.pdf_data.text:
-        logger.warning("PDF text not extracted - skipping all PDF validations")
-        for rule_name, points in PDF_RULES:
-            results.append(ValidationResult(
-                criterion=rule_name,
-                passed=False,
-                points_awarded=0,
-                message="PDF text not extracted"
-            ))
-        return results
+        return None
     
     # Get expected values from submission
     row_data = submission.row_data
@@ -275,6 +264,46 @@ def validate_pdf(submission: EventSubmission, gemini_client: GeminiClient) -> Li
     pdf_text = submission.pdf_data.text
     pdf_hash = hashlib.sha256(pdf_text.encode('utf-8')).hexdigest()[:16]  # Use first 16 chars for cache key
     
+    return {
+        "pdf_text": pdf_text,
+        "expected_title": expected_title if expected_title else None,
+        "expected_objectives": expected_objectives if expected_objectives else None,
+        "expected_learning_outcomes": expected_learning_outcomes if expected_learning_outcomes else None,
+        "expected_participants": expected_participants,
+        "pdf_hash": pdf_hash
+    }
+
+
+def validate_pdf(
+    submission: EventSubmission,
+    gemini_client: GeminiClient,
+    validation_results: Optional[Dict[str, Any]] = None
+) -> List[ValidationResult]:
+    """
+    OPTIMIZED: Run all PDF validations using a single unified API call.
+    This replaces 5 separate calls with 1 call, providing ~3-4x speedup.
+    
+    validation_results: validate_pdf_comprehensive-style results already fetched
+    for this submission (e.g. by GeminiClient.validate_event_all); skips the API call.
+    """
+    results = []
+    
+    # Pre-check: If PDF data is missing, return all failures immediately (pre-scoring gate)
+    inputs = pdf_validation_inputs(submission)
+    if inputs is None:
+        logger.warning("PDF text not extracted - skipping all PDF validations")
+        for rule_name, points in PDF_RULES:
+            results.append(ValidationResult(
+                criterion=rule_name,
+                passed=False,
+                points_awarded=0,
+                message="PDF text not extracted"
+            ))
+        return results
+    
+    expected_title = inputs["expected_title"] or ''
+    pdf_text = inputs["pdf_text"]
+    
     # Pre-scoring gate: Quick heuristic checks before AI call
     # If basic keywords are missing, we can skip some validations
     pdf_text_lower = pdf_text.lower()
@@ -284,15 +313,9 @@ def validate_pdf(submission: EventSubmission, gemini_client: GeminiClient) -> Li
     ])
     
     # Single unified API call for all PDF validations
-    logger.info("Running unified PDF validation (single API call for all 5 checks)")
-    validation_results = gemini_client.validate_pdf_comprehensive(
-        pdf_text=pdf_text,
-        expected_title=expected_title if expected_title else None,
-        expected_objectives=expected_objectives if expected_objectives else None,
-        expected_learning_outcomes=expected_learning_outcomes if expected_learning_outcomes else None,
-        expected_participants=expected_participants,
-        pdf_hash=pdf_hash
-    )
+    if validation_results is None:
+        logger.info("Running unified PDF validation (single API call for all 5 checks)")
+        validation_results = gemini_client.validate_pdf_comprehensive(**inputs)
     
     # Map unified results to individual validation results
     # Rule 0: PDF title matches metadata (7 points)
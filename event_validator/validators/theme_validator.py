@@ -1,6 +1,6 @@
 """Theme validation using hardcoded rules and Gemini."""
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 from event_validator.types import ValidationResult, EventSubmission
@@ -16,19 +16,8 @@ from event_validator.utils.title_generator import (
 logger = logging.getLogger(__name__)
 
 
-def validate_theme_alignment(
-    submission: EventSubmission,
-    gemini_client: GeminiClient
-) -> ValidationResult:
-    """
-    Check if title/objectives/learning align to theme.
-    
-    Uses event-driven title policy:
-    - event_driven 1, 2, 4: Validates against canonical title
-    - event_driven 3: Validates user-provided title against theme
-    """
-    rule_name, points = THEME_RULES[0]
-    
+def _theme_alignment_fields(submission: EventSubmission) -> Dict[str, Any]:
+    """Submission fields used by the theme alignment check (expected_title is None without a theme)."""
     row_data = submission.row_data
     theme = row_data.get('Theme', '').strip()
     objectives = row_data.get('Objectives', '').strip()
@@ -44,6 +33,78 @@ def validate_theme_alignment(
     activity_name = original_data.get('activity_name', '').strip()
     user_title = row_data.get('Title', '').strip() or activity_name  # Use activity_name if Title is empty
     
+    fields = {
+        "theme": theme,
+        "objectives": objectives,
+        "learning_outcomes": learning_outcomes,
+        "event_driven": event_driven,
+        "activity_name": activity_name,
+        "user_title": user_title,
+        "expected_title": None,
+        "event_title_for_check": None,
+    }
+    if not theme:
+        return fields
+    
+    # Get expected title based on event_driven policy
+    # Use activity_name as the user_title since it's the primary event title field
+    title_for_expected = activity_name or user_title
+    fields["expected_title"] = get_expected_title(
+        event_driven=event_driven,
+        user_title=title_for_expected,
+        event_type=event_type,
+        theme=theme,
+        objectives=objectives,
+        learning_outcomes=learning_outcomes
+    )
+    
+    # Use activity_name (event title) for theme alignment check
+    # activity_name is the primary field containing the event title
+    fields["event_title_for_check"] = activity_name or user_title or fields["expected_title"]
+    return fields
+
+
+def theme_alignment_inputs(submission: EventSubmission) -> Optional[Dict[str, str]]:
+    """
+    Keyword arguments (title, objectives, learning_outcomes, theme) of
+    GeminiClient.check_theme_alignment for a submission, or None if the theme is missing.
+    """
+    fields = _theme_alignment_fields(submission)
+    if not fields["theme"]:
+        return None
+    return {
+        "title": fields["event_title_for_check"],
+        "objectives": fields["objectives"],
+        "learning_outcomes": fields["learning_outcomes"],
+        "theme": fields["theme"],
+    }
+
+
+def validate_theme_alignment(
+    submission: EventSubmission,
+    gemini_client: GeminiClient,
+    aligned: Optional[bool] = None
+) -> ValidationResult:
+    """
+    Check if title/objectives/learning align to theme.
+    
+    Uses event-driven title policy:
+    - event_driven 1, 2, 4: Validates against canonical title
+    - event_driven 3: Validates user-provided title against theme
+    
+    aligned: Theme check answer already fetched for this submission (e.g. by
+    GeminiClient.validate_event_all); skips the API call.
+    """
+    rule_name, points = THEME_RULES[0]
+    
+    fields = _theme_alignment_fields(submission)
+    theme = fields["theme"]
+    objectives = fields["objectives"]
+    learning_outcomes = fields["learning_outcomes"]
+    event_driven = fields["event_driven"]
+    activity_name = fields["activity_name"]
+    user_title = fields["user_title"]
+    
     logger.info(f"Checking: {rule_name} ({points} points)")
     logger.debug(f"  Theme: {theme}")
     logger.debug(f"  Event Driven: {event_driven}")
@@ -61,32 +122,20 @@ def validate_theme_alignment(
             message="Theme missing — cannot validate alignment"
         )
     
-    # Get expected title based on event_driven policy
-    # Use activity_name as the user_title since it's the primary event title field
-    title_for_expected = activity_name or user_title
-    expected_title = get_expected_title(
-        event_driven=event_driven,
-        user_title=title_for_expected,
-        event_type=event_type,
-        theme=theme,
-        objectives=objectives,
-        learning_outcomes=learning_outcomes
-    )
-    
-    # Use activity_name (event title) for theme alignment check
-    # activity_name is the primary field containing the event title
-    event_title_for_check = activity_name or user_title or expected_title
+    expected_title = fields["expected_title"]
+    event_title_for_check = fields["event_title_for_check"]
     
     # Use Gemini for semantic alignment check (optimized: Gemini has higher capacity than Groq)
-    logger.debug("  Calling API for theme alignment check (using Gemini for better throughput)...")
-    logger.debug(f"  Using event title for theme check: {event_title_for_check[:100] if event_title_for_check else 'N/A'}")
-    aligned = gemini_client.check_theme_alignment(
-        title=event_title_for_check,
-        objectives=objectives,
-        learning_outcomes=learning_outcomes,
-        theme=theme,
-        prefer_groq=False  # Use Gemini (150 RPM) instead of Groq (25 RPM) for better throughput
-    )
+    if aligned is None:
+        logger.debug("  Calling API for theme alignment check (using Gemini for better throughput)...")
+        logger.debug(f"  Using event title for theme check: {event_title_for_check[:100] if event_title_for_check else 'N/A'}")
+        aligned = gemini_client.check_theme_alignment(
+            title=event_title_for_check,
+            objectives=objectives,
+            learning_outcomes=learning_outcomes,
+            theme=theme,
+            prefer_groq=False  # Use Gemini (150 RPM) instead of Groq (25 RPM) for better throughput
+        )
     
     if aligned:
         logger.info(f"  PASS: Theme alignment confirmed | Points: {points}")
@@ -359,11 +408,19 @@ def validate_year_alignment(
             )
 
 
-def validate_theme(submission: EventSubmission, gemini_client: GeminiClient) -> List[ValidationResult]:
-    """Run all theme validations."""
+def validate_theme(
+    submission: EventSubmission,
+    gemini_client: GeminiClient,
+    theme_aligned: Optional[bool] = None
+) -> List[ValidationResult]:
+    """
+    Run all theme validations.
+    
+    theme_aligned: Theme check answer already fetched (see validate_theme_alignment).
+    """
     results = []
     
-    results.append(validate_theme_alignment(submission, gemini_client))
+    results.append(validate_theme_alignment(submission, gemini_client, theme_aligned))
     results.append(validate_level_duration(submission))
     results.append(validate_participants_reported(submission))
     # Year alignment validation is DISABLED per user request